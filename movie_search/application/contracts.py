@@ -1,8 +1,12 @@
-from collections.abc import Callable
-from typing import Protocol
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+from contextlib import AbstractContextManager
+from typing import Protocol, runtime_checkable
 
 from movie_search.domain.models import Movie
 from movie_search.infra.index_store import StoredIndex
+from movie_search.search.bm25 import IndexStatistics
+from movie_search.search.postings import PositionList, PostingList
+from movie_search.search.segments import Segment
 
 Tokenizer = Callable[[str, set[str]], list[str]]
 
@@ -10,12 +14,55 @@ Tokenizer = Callable[[str, set[str]], list[str]]
 class MovieRepository(Protocol):
     def load_movies(self) -> list[Movie]: ...
 
+    def iter_movies(self) -> Iterator[Movie]: ...
+
 
 class StopwordsProvider(Protocol):
     def load_stopwords(self) -> set[str]: ...
 
 
 class IndexStore(Protocol):
-    def save(self, index: dict[str, set[int]], docmap: dict[int, str]) -> None: ...
+    def save(
+        self,
+        index: Mapping[str, PostingList],
+        docmap: Mapping[int, int],
+        average_document_length: float,
+        fingerprints: Mapping[int, int],
+        statistics: IndexStatistics | None = None,
+        positions: Mapping[str, PositionList] | None = None,
+    ) -> None: ...
 
     def load(self) -> StoredIndex: ...
+
+
+@runtime_checkable
+class SegmentStore(IndexStore, Protocol):
+    def save_segments(
+        self,
+        segments: Sequence[Segment],
+        average_document_length: float,
+        statistics: IndexStatistics | None = None,
+        term_count: int | None = None,
+        compute_statistics: Callable[[Segment], IndexStatistics] | None = None,
+    ) -> None: ...
+
+    def merge(
+        self,
+        force: bool = False,
+        compute_statistics: Callable[[Segment], IndexStatistics] | None = None,
+    ) -> int: ...
+
+
+@runtime_checkable
+class VersionedStore(Protocol):
+    """Store whose ``version`` changes whenever its data on disk is rewritten."""
+
+    def version(self) -> Hashable: ...
+
+
+class DocumentStore(Protocol):
+    def writer(self) -> AbstractContextManager[Callable[[Movie], None]]: ...
+
+    def update(self, upserts: Iterable[Movie], deleted: Iterable[int]) -> None: ...
+
+    def load(self) -> Mapping[int, Movie]: ...
@@ -1,11 +1,24 @@
+import time
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+
 from movie_search.application.contracts import (
+    DocumentStore,
     IndexStore,
     MovieRepository,
+    SegmentStore,
     StopwordsProvider,
     Tokenizer,
+    VersionedStore,
 )
+from movie_search.application.metrics import METRICS, SearchMetrics
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.domain.models import Movie
+from movie_search.domain.query import PHRASES_NEED_POSITIONS, parse_query
 from movie_search.domain.tokenization import tokenize
-from movie_search.search.inverted_index import InvertedIndex
+from movie_search.profiling import stage
+from movie_search.search.bm25 import BM25SearchEngine, IndexStatistics
+from movie_search.search.inverted_index import InvertedIndex, content_fingerprint
+from movie_search.search.segments import Segment
 
 
 class IndexService:
@@ -16,29 +29,267 @@ class IndexService:
         index_store: IndexStore,
         tokenizer: Tokenizer = tokenize,
         index: InvertedIndex | None = None,
+        engine: BM25SearchEngine | None = None,
+        document_store: DocumentStore | None = None,
+        metrics: SearchMetrics | None = None,
     ) -> None:
         self._movie_repository = movie_repository
         self._stopwords_repository = stopwords_repository
         self._index_store = index_store
         self._tokenizer = tokenizer
         self._index = index or InvertedIndex()
+        self._engine = engine or BM25SearchEngine()
+        self._document_store = document_store
+        self._metrics = metrics or METRICS
+        # Movie records to write to the document store on save; None deletes one.
+        self._pending_documents: dict[int, Movie | None] = {}
+        # Whether statistics recomputed after a merge include score-ordered postings.
+        self._impact_ordered = False
+
+    def build(
+        self, workers: int = 1, impact_ordered: bool = False, positions: bool = False
+    ) -> None:
+        """Index the catalog and precompute BM25 statistics for ``engine``'s config.
 
-    def build(self) -> None:
-        movies = self._movie_repository.load_movies()
+        With ``impact_ordered`` every posting list is also stored in score order,
+        which answers single-term and short queries from the head of the lists.
+        With ``positions`` token positions are recorded for phrase queries.
+        The document store is rewritten from the same pass over the catalog.
+        """
+        start = time.perf_counter()
         stopwords = self._stopwords_repository.load_stopwords()
-        self._index.build(movies=movies, stopwords=stopwords, tokenizer=self._tokenizer)
+        movies = self._movie_repository.iter_movies()
+        self._pending_documents.clear()
+        with stage("build_index"):
+            if self._document_store is None:
+                self._index.build(
+                    movies=movies,
+                    stopwords=stopwords,
+                    tokenizer=self._tokenizer,
+                    workers=workers,
+                    positions=positions,
+                )
+            else:
+                with self._document_store.writer() as add_document:
+                    self._index.build(
+                        movies=_recorded(movies, add_document),
+                        stopwords=stopwords,
+                        tokenizer=self._tokenizer,
+                        workers=workers,
+                        positions=positions,
+                    )
+        self._impact_ordered = impact_ordered
+        self._compute_statistics(impact_ordered)
+        self._metrics.observe_index_build(time.perf_counter() - start, self._index.document_count())
+
+    def upsert(self, movies: Iterable[Movie]) -> list[int]:
+        stopwords = self._stopwords_repository.load_stopwords()
+        latest = {movie.id: movie for movie in movies}
+        replaced = [
+            movie.id
+            for movie in latest.values()
+            if self._index.fingerprint(movie.id) not in (None, content_fingerprint(movie))
+        ]
+        changed = self._index.upsert(
+            movies=latest.values(),
+            stopwords=stopwords,
+            tokenizer=self._tokenizer,
+            previous_tokens=self._indexed_tokens(replaced, stopwords),
+        )
+        self._pending_documents.update((doc_id, latest[doc_id]) for doc_id in changed)
+        return changed
+
+    def delete(self, doc_ids: Iterable[int]) -> list[int]:
+        doc_ids = list(doc_ids)
+        removed = self._index.delete(doc_ids, self._indexed_tokens(doc_ids))
+        self._pending_documents.update(dict.fromkeys(removed))
+        return removed
+
+    def _indexed_tokens(
+        self, doc_ids: Iterable[int], stopwords: set[str] | None = None
+    ) -> list[str] | None:
+        """Re-tokenize the indexed versions of ``doc_ids``, or return ``None`` if one is unknown.
+
+        A segmented index keeps its live term count from them instead of
+        scanning every segment after an update.
+        """
+        if self._index.segments() is None or self._index.term_count() is None:
+            return None
+        if stopwords is None:
+            stopwords = self._stopwords_repository.load_stopwords()
+        documents: Mapping[int, Movie] | None = None
+        tokens: list[str] = []
+        for doc_id in doc_ids:
+            if self._index.fingerprint(doc_id) is None:
+                continue
+            movie = self._pending_documents.get(doc_id)
+            if movie is None:
+                if self._document_store is None:
+                    return None
+                if documents is None:
+                    try:
+                        documents = self._document_store.load()
+                    except IndexStoreError:
+                        return None
+                movie = documents.get(doc_id)
+                if movie is None:
+                    return None
+            tokens.extend(self._tokenizer(f"{movie.title} {movie.description}", stopwords))
+        return tokens
+
+    def sync(self) -> dict[str, int]:
+        """Bring the loaded index in line with the current catalog without a rebuild.
+
+        Movies are compared by content fingerprint, so only new or edited
+        movies are re-tokenized and only movies missing from the catalog are
+        deleted.
+        """
+        seen: set[int] = set()
+        changed: list[Movie] = []
+        added = 0
+        for movie in self._movie_repository.iter_movies():
+            seen.add(movie.id)
+            indexed = self._index.fingerprint(movie.id)
+            if indexed != content_fingerprint(movie):
+                changed.append(movie)
+                if indexed is None:
+                    added += 1
+        upserted = self.upsert(changed)
+        deleted = self.delete(
+            [doc_id for doc_id in self._index.document_ids() if doc_id not in seen]
+        )
+        return {"added": added, "updated": len(upserted) - added, "deleted": len(deleted)}
 
     def lookup(self, term: str) -> list[int]:
+        """Return the documents containing every token of ``term`` and its quoted phrases."""
         stopwords = self._stopwords_repository.load_stopwords()
-        term_tokens = self._tokenizer(term, stopwords)
-        return self._index.lookup(term_tokens)
+        query = parse_query(term, stopwords, self._tokenizer)
+        index = self._index
+        if query.needs_positions() and not index.has_positions():
+            raise IndexStoreError(PHRASES_NEED_POSITIONS)
+        return index.lookup(list(query.tokens), query.phrases)
 
     def save(self) -> None:
-        self._index_store.save(index=self._index.export_index(), docmap=self._index.export_docmap())
+        # Records go first, so a saved index never refers to a missing movie.
+        self._save_documents()
+        segments = self._index.segments()
+        if not isinstance(self._index_store, SegmentStore):
+            self._save_all()
+            return
+
+        # Only new segments and changed tombstones are written. Reloading picks
+        # up the names the store assigned and any merge it ran, so later updates
+        # are appended as segments too.
+        if segments is None:
+            self._save_all()
+        else:
+            with stage("save_index"):
+                self._index_store.save_segments(
+                    segments,
+                    self._index.average_document_length(),
+                    term_count=self._index.term_count(),
+                    compute_statistics=self._segment_statistics,
+                )
+        self.load()
+
+    def _segment_statistics(self, segment: Segment) -> IndexStatistics:
+        # Called by the store when a merge leaves one segment holding the whole index.
+        index = InvertedIndex()
+        index.import_segments([segment])
+        return self._engine.compute_statistics(index, index.terms(), impacts=self._impact_ordered)
+
+    def _save_documents(self) -> None:
+        if self._document_store is not None and self._pending_documents:
+            pending = self._pending_documents
+            with stage("save_documents"):
+                self._document_store.update(
+                    upserts=[movie for movie in pending.values() if movie is not None],
+                    deleted=[doc_id for doc_id, movie in pending.items() if movie is None],
+                )
+        self._pending_documents.clear()
+
+    def _save_all(self) -> None:
+        with stage("save_index"):
+            self._index_store.save(
+                index=self._index.export_index(),
+                docmap=self._index.export_docmap(),
+                average_document_length=self._index.average_document_length(),
+                fingerprints=self._index.export_fingerprints(),
+                statistics=self._index.statistics(),
+                positions=self._index.export_positions(),
+            )
 
     def load(self) -> None:
+        start = time.perf_counter()
+        with stage("load_index"):
+            self._load()
+        self._metrics.observe_index_load(time.perf_counter() - start, self._index.document_count())
+
+    def version(self) -> Hashable:
+        """Return the version of the stored index, or ``None`` if the store does not report one."""
+        store = self._index_store
+        return store.version() if isinstance(store, VersionedStore) else None
+
+    def _load(self) -> None:
+        # A new index replaces the old one in one assignment, so readers in other
+        # threads see either state but never one that is half imported.
         stored = self._index_store.load()
-        self._index.import_data(index=stored.index, docmap=stored.docmap)
+        if stored.statistics is not None:
+            self._impact_ordered = stored.statistics.impacts is not None
+        index = InvertedIndex()
+        if stored.segments is not None:
+            index.import_segments(
+                stored.segments,
+                stored.average_document_length,
+                stored.statistics,
+                stored.term_count,
+            )
+        else:
+            index.import_data(
+                index=stored.index,
+                docmap=stored.docmap,
+                average_document_length=stored.average_document_length,
+                fingerprints=stored.fingerprints,
+                statistics=stored.statistics,
+                positions=stored.positions,
+            )
+        self._index = index
 
-    def stats(self) -> dict[str, int]:
+    def compact(self, impact_ordered: bool = False) -> int:
+        """Merge every stored segment into one, returning how many were merged.
+
+        Incremental updates drop the precomputed BM25 statistics until a merge
+        leaves one segment, so they are recomputed and stored with the merged
+        segment, with score-ordered postings if ``impact_ordered``.
+        """
+        if not isinstance(self._index_store, SegmentStore):
+            return 0
+        self.load()
+        segments = self._index.segments() or []
+        merged = (
+            len(segments)
+            if len(segments) > 1 or any(segment.deleted for segment in segments)
+            else 0
+        )
+        statistics = self._index.statistics()
+        if merged or statistics is None or (impact_ordered and statistics.impacts is None):
+            self._compute_statistics(impact_ordered)
+            self._save_all()
+            self.load()
+        return merged
+
+    def _compute_statistics(self, impact_ordered: bool = False) -> None:
+        with stage("compute_statistics"):
+            statistics = self._engine.compute_statistics(
+                self._index, self._index.terms(), impacts=impact_ordered
+            )
+        self._index.set_statistics(statistics)
+
+    def stats(self) -> dict[str, int | float]:
         return self._index.stats()
+
+
+def _recorded(movies: Iterable[Movie], record: Callable[[Movie], None]) -> Iterator[Movie]:
+    for movie in movies:
+        record(movie)
+        yield movie
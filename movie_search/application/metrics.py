@@ -0,0 +1,259 @@
+"""Running counters and histograms of the search and index services.
+
+Services record into the process-wide ``METRICS`` unless given their own
+``SearchMetrics``, and ``render`` writes everything in the Prometheus text
+exposition format (version 0.0.4), including the stem cache and process memory.
+"""
+
+import os
+import sys
+import threading
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from movie_search.domain.tokenization import stem_cache_info
+from movie_search.search.bm25 import RankCounters
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, safe to share between threads."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._buckets = tuple(buckets)
+        self._counts = [0] * len(self._buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            for position, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[position] += 1
+                    break
+            self._sum += value
+            self._count += 1
+
+    def samples(self, name: str) -> list[tuple[str, float]]:
+        """Return the ``_bucket``, ``_sum`` and ``_count`` samples of metric ``name``."""
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        samples: list[tuple[str, float]] = []
+        cumulative = 0
+        for bound, bucket_count in zip(self._buckets, counts, strict=True):
+            cumulative += bucket_count
+            samples.append((f'{name}_bucket{{le="{_number(bound)}"}}', cumulative))
+        samples.append((f'{name}_bucket{{le="+Inf"}}', count))
+        samples.append((f"{name}_sum", total))
+        samples.append((f"{name}_count", count))
+        return samples
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    """One single-valued metric; a ``None`` value is left out of the output."""
+
+    name: str
+    kind: str
+    help: str
+    value: float | None
+
+
+class SearchMetrics:
+    """Query latency and work, cache hit rates and index loads and builds."""
+
+    def __init__(self) -> None:
+        self.query_seconds = Histogram(LATENCY_BUCKETS)
+        self.query_postings = Histogram(COUNT_BUCKETS)
+        self.query_scored = Histogram(COUNT_BUCKETS)
+        self._lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._index_loads = 0
+        self._index_load_seconds = 0.0
+        self._index_builds = 0
+        self._index_build_seconds = 0.0
+        self._index_documents: int | None = None
+
+    def observe_query(self, seconds: float) -> None:
+        self.query_seconds.observe(seconds)
+
+    def observe_ranking(self, counters: RankCounters) -> None:
+        self.query_postings.observe(counters.postings)
+        self.query_scored.observe(counters.scored)
+
+    def observe_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+
+    def observe_index_load(self, seconds: float, documents: int) -> None:
+        with self._lock:
+            self._index_loads += 1
+            self._index_load_seconds = seconds
+            self._index_documents = documents
+
+    def observe_index_build(self, seconds: float, documents: int) -> None:
+        with self._lock:
+            self._index_builds += 1
+            self._index_build_seconds = seconds
+            self._index_documents = documents
+
+    def render(self, extra: Iterable[Sample] = ()) -> str:
+        """Return every metric, plus ``extra`` ones, in the Prometheus text format."""
+        lines: list[str] = []
+        for name, kind, help_text, histogram in (
+            (
+                "movie_search_query_duration_seconds",
+                "histogram",
+                "Search latency, including result cache lookups.",
+                self.query_seconds,
+            ),
+            (
+                "movie_search_query_postings",
+                "histogram",
+                "Posting entries read per ranked query.",
+                self.query_postings,
+            ),
+            (
+                "movie_search_query_scored_documents",
+                "histogram",
+                "Documents scored per ranked query.",
+                self.query_scored,
+            ),
+        ):
+            lines += _header(name, kind, help_text)
+            lines += (f"{sample} {_number(value)}" for sample, value in histogram.samples(name))
+        for sample in (*self._samples(), *extra):
+            if sample.value is not None:
+                lines += _header(sample.name, sample.kind, sample.help)
+                lines.append(f"{sample.name} {_number(sample.value)}")
+        return "\n".join(lines) + "\n"
+
+    def _samples(self) -> list[Sample]:
+        with self._lock:
+            cache_hits, cache_misses = self._cache_hits, self._cache_misses
+            index_loads, index_load_seconds = self._index_loads, self._index_load_seconds
+            index_builds, index_build_seconds = self._index_builds, self._index_build_seconds
+            index_documents = self._index_documents
+        stems = stem_cache_info()
+        return [
+            Sample(
+                "movie_search_result_cache_hits_total",
+                "counter",
+                "Searches answered from the result cache.",
+                cache_hits,
+            ),
+            Sample(
+                "movie_search_result_cache_misses_total",
+                "counter",
+                "Searches the result cache had to rank.",
+                cache_misses,
+            ),
+            Sample(
+                "movie_search_result_cache_hit_ratio",
+                "gauge",
+                "Share of result cache lookups that hit.",
+                _ratio(cache_hits, cache_misses),
+            ),
+            Sample(
+                "movie_search_stem_cache_hits_total",
+                "counter",
+                "Tokens stemmed from the stem cache.",
+                stems["hits"],
+            ),
+            Sample(
+                "movie_search_stem_cache_misses_total",
+                "counter",
+                "Tokens the stemmer had to process.",
+                stems["misses"],
+            ),
+            Sample(
+                "movie_search_stem_cache_hit_ratio",
+                "gauge",
+                "Share of stem cache lookups that hit.",
+                _ratio(stems["hits"], stems["misses"]),
+            ),
+            Sample(
+                "movie_search_stem_cache_entries",
+                "gauge",
+                "Stems held by the stem cache.",
+                stems["size"],
+            ),
+            Sample("movie_search_index_loads_total", "counter", "Index loads.", index_loads),
+            Sample(
+                "movie_search_index_load_duration_seconds",
+                "gauge",
+                "Duration of the last index load.",
+                index_load_seconds if index_loads else None,
+            ),
+            Sample(
+                "movie_search_index_builds_total", "counter", "Full index builds.", index_builds
+            ),
+            Sample(
+                "movie_search_index_build_duration_seconds",
+                "gauge",
+                "Duration of the last full index build.",
+                index_build_seconds if index_builds else None,
+            ),
+            Sample(
+                "movie_search_index_documents",
+                "gauge",
+                "Documents in the last loaded or built index.",
+                index_documents,
+            ),
+            Sample(
+                "process_resident_memory_bytes",
+                "gauge",
+                "Resident memory size in bytes.",
+                resident_memory_bytes(),
+            ),
+            Sample(
+                "movie_search_peak_resident_memory_bytes",
+                "gauge",
+                "Peak resident memory size in bytes.",
+                peak_rss_bytes(),
+            ),
+        ]
+
+
+METRICS = SearchMetrics()
+
+
+def resident_memory_bytes() -> int | None:
+    """Return this process's current resident set size, or ``None`` off Linux."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> int | None:
+    """Return this process's peak resident set size, or ``None`` where it is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _header(name: str, kind: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _ratio(hits: int, misses: int) -> float:
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry[V]:
+    value: V
+    generation: Hashable
+    stored_at: float
+
+
+class ResultCache[V]:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds or on a new generation.
+
+    Callers pass the generation of the data a result was computed from, so a
+    rebuilt or updated index never serves results ranked against the old one.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry[V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, generation: Hashable) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.generation != generation or (
+                self._ttl is not None and self._clock() - entry.stored_at >= self._ttl
+            ):
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, generation: Hashable, value: V) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(value, generation, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+            }
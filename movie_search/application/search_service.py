@@ -1,7 +1,24 @@
-from movie_search.application.contracts import MovieRepository, StopwordsProvider, Tokenizer
+import time
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from itertools import islice
+
+from movie_search.application.contracts import (
+    DocumentStore,
+    IndexStore,
+    MovieRepository,
+    StopwordsProvider,
+    Tokenizer,
+    VersionedStore,
+)
+from movie_search.application.metrics import METRICS, SearchMetrics
+from movie_search.application.result_cache import ResultCache
+from movie_search.domain.exceptions import IndexStoreError
 from movie_search.domain.models import Movie
+from movie_search.domain.query import PHRASES_NEED_POSITIONS, Query, parse_query
 from movie_search.domain.tokenization import tokenize
-from movie_search.search.bm25 import BM25SearchEngine
+from movie_search.profiling import stage
+from movie_search.search.bm25 import BM25SearchEngine, RankCounters
+from movie_search.search.inverted_index import InvertedIndex
 
 
 class SearchService:
@@ -11,32 +28,225 @@ class SearchService:
         stopwords_repository: StopwordsProvider,
         tokenizer: Tokenizer = tokenize,
         engine: BM25SearchEngine | None = None,
+        index_store: IndexStore | None = None,
+        result_cache: ResultCache[list[Movie]] | None = None,
+        document_store: DocumentStore | None = None,
+        metrics: SearchMetrics | None = None,
     ) -> None:
         self._movie_repository = movie_repository
         self._stopwords_repository = stopwords_repository
         self._tokenizer = tokenizer
         self._engine = engine or BM25SearchEngine()
+        self._index_store = index_store
+        self._result_cache = result_cache
+        self._document_store = document_store
+        self._metrics = metrics or METRICS
+        self._corpus_generation = 0
+        # Version of the stored data as of the last (re)load; cached results
+        # are only reused while it is the one they were ranked against.
+        self._version = self.version()
+        self._stopwords: set[str] | None = None
+        self._index: InvertedIndex | None = None
+        self._corpus: tuple[list[Movie], list[list[str]]] | None = None
+        self._documents: Mapping[int, Movie] | None = None
 
     def search(self, query: str, limit: int = 5) -> list[Movie]:
         if limit <= 0:
             return []
 
-        movies = self._movie_repository.load_movies()
-        stopwords = self._stopwords_repository.load_stopwords()
-        query_tokens = self._tokenizer(query, stopwords)
+        stopwords = self._load_stopwords()
+        with stage("parse_query"):
+            parsed = parse_query(query, stopwords, self._tokenizer)
+        return self._search_query(query, parsed, limit, stopwords)
+
+    def search_many(
+        self, queries: Iterable[str], limit: int = 5
+    ) -> Iterator[tuple[str, list[Movie]]]:
+        """Search a stream of queries, yielding ``(query, movies)`` pairs in input order.
+
+        Stopwords, the corpus and the index are loaded once for the whole batch,
+        and queries that normalize to the same tokens and phrases are ranked
+        only once.
+        """
+        stopwords = self._load_stopwords()
+        ranked_by_query: dict[Query, list[Movie]] = {}
+        for query in queries:
+            if limit <= 0:
+                yield query, []
+                continue
+            with stage("parse_query"):
+                parsed = parse_query(query, stopwords, self._tokenizer)
+            if not parsed.tokens:
+                yield query, self._search_query(query, parsed, limit, stopwords)
+            elif parsed in ranked_by_query:
+                yield query, list(ranked_by_query[parsed])
+            else:
+                movies = self._search_query(query, parsed, limit, stopwords)
+                ranked_by_query[parsed] = movies
+                yield query, list(movies)
+
+    def analyze(self, query: str) -> Query:
+        """Return the tokens and phrases a query is ranked by; equal ones give equal results."""
+        return parse_query(query, self._load_stopwords(), self._tokenizer)
+
+    def warm(self) -> None:
+        """Load stopwords, the catalog and the index now instead of on the first search."""
+        stopwords = self._load_stopwords()
+        if self._index_store is not None:
+            self._load_documents()
+            self._load_index(self._index_store)
+        else:
+            self._load_corpus(stopwords)
+
+    def reload(self) -> None:
+        """Drop the loaded catalog and index so the next search reads them again."""
+        self._version = self.version()
+        self._stopwords = None
+        self._corpus = None
+        self._documents = None
+        self._index = None
+        self._corpus_generation += 1
+
+    def version(self) -> Hashable:
+        """Return the version of the stored index, or of the catalog without one.
+
+        It changes when another process rewrites the store, and is ``None`` for
+        stores that do not report versions.
+        """
+        store = self._index_store if self._index_store is not None else self._movie_repository
+        return store.version() if isinstance(store, VersionedStore) else None
+
+    def cache_stats(self) -> dict[str, int | float]:
+        return self._result_cache.stats() if self._result_cache is not None else {}
+
+    def _search_query(
+        self, query: str, parsed: Query, limit: int, stopwords: set[str]
+    ) -> list[Movie]:
+        start = time.perf_counter()
+        with stage("query"):
+            movies = self._cached_query(query, parsed, limit, stopwords)
+        self._metrics.observe_query(time.perf_counter() - start)
+        return movies
+
+    def _cached_query(
+        self, query: str, parsed: Query, limit: int, stopwords: set[str]
+    ) -> list[Movie]:
+        if self._result_cache is None or not parsed.tokens:
+            return self._rank(query, parsed, limit, stopwords)
 
-        if not query_tokens:
+        # Queries that normalize to the same tokens and phrases rank
+        # identically, so they share an entry, e.g. "The Matrix!" and "matrix".
+        key = (parsed, limit, self._engine.config)
+        generation = self._generation()
+        cached = self._result_cache.get(key, generation)
+        self._metrics.observe_cache(hit=cached is not None)
+        if cached is None:
+            cached = self._rank(query, parsed, limit, stopwords)
+            self._result_cache.put(key, generation, cached)
+        return list(cached)
+
+    def _generation(self) -> Hashable:
+        if self._index_store is not None:
+            return self._version, self._load_index(self._index_store).generation()
+        return self._version, self._corpus_generation
+
+    def _rank(self, query: str, parsed: Query, limit: int, stopwords: set[str]) -> list[Movie]:
+        if self._index_store is not None:
+            return self._search_index(query, parsed, limit, self._index_store)
+
+        movies, corpus_tokens = self._load_corpus(stopwords)
+        if not parsed.tokens:
             if query.strip() == "":
                 return movies[:limit]
             return []
 
-        corpus_tokens = [
-            self._tokenizer(f"{movie.title} {movie.description}", stopwords) for movie in movies
-        ]
+        counters = RankCounters()
         ranked = self._engine.rank(
             movies=movies,
             corpus_tokens=corpus_tokens,
-            query_tokens=query_tokens,
+            query_tokens=list(parsed.tokens),
             limit=limit,
+            phrases=parsed.phrases,
+            counters=counters,
         )
+        self._metrics.observe_ranking(counters)
         return [item.movie for item in ranked]
+
+    def _search_index(
+        self, query: str, parsed: Query, limit: int, index_store: IndexStore
+    ) -> list[Movie]:
+        documents = self._load_documents()
+        if not parsed.tokens:
+            if query.strip() == "":
+                return list(islice(documents.values(), limit))
+            return []
+
+        index = self._load_index(index_store)
+        if parsed.needs_positions() and not index.has_positions():
+            raise IndexStoreError(PHRASES_NEED_POSITIONS)
+        counters = RankCounters()
+        with stage("score"):
+            if not parsed.phrases:
+                ranked = self._engine.rank_index(
+                    index=index, query_tokens=list(parsed.tokens), limit=limit, counters=counters
+                )
+            else:
+                ranked = self._engine.rank_phrases(
+                    index=index,
+                    query_tokens=list(parsed.tokens),
+                    phrases=parsed.phrases,
+                    limit=limit,
+                    counters=counters,
+                )
+        self._metrics.observe_ranking(counters)
+        with stage("fetch_documents"):
+            return [documents[item.doc_id] for item in ranked if item.doc_id in documents]
+
+    def _load_stopwords(self) -> set[str]:
+        if self._stopwords is None:
+            with stage("load_stopwords"):
+                self._stopwords = self._stopwords_repository.load_stopwords()
+        return self._stopwords
+
+    def _load_corpus(self, stopwords: set[str]) -> tuple[list[Movie], list[list[str]]]:
+        # Tokenized once per service so repeated searches reuse it, and engines
+        # that precompute per-corpus structures see the same corpus object.
+        if self._corpus is None:
+            with stage("load_catalog"):
+                movies = self._movie_repository.load_movies()
+            with stage("tokenize_corpus"):
+                corpus_tokens = [
+                    self._tokenizer(f"{movie.title} {movie.description}", stopwords)
+                    for movie in movies
+                ]
+            self._corpus = (movies, corpus_tokens)
+        return self._corpus
+
+    def _load_index(self, index_store: IndexStore) -> InvertedIndex:
+        if self._index is None:
+            start = time.perf_counter()
+            with stage("load_index"):
+                stored = index_store.load()
+                index = InvertedIndex()
+                index.import_data(
+                    index=stored.index,
+                    docmap=stored.docmap,
+                    average_document_length=stored.average_document_length,
+                    statistics=stored.statistics,
+                    positions=stored.positions,
+                )
+            self._metrics.observe_index_load(time.perf_counter() - start, index.document_count())
+            self._index = index
+        return self._index
+
+    def _load_documents(self) -> Mapping[int, Movie]:
+        # A document store is read lazily, so only the returned movies are decoded.
+        if self._documents is None:
+            with stage("load_documents"):
+                if self._document_store is not None:
+                    self._documents = self._document_store.load()
+                else:
+                    self._documents = {
+                        movie.id: movie for movie in self._movie_repository.load_movies()
+                    }
+        return self._documents
@@ -0,0 +1 @@
+"""Synthetic catalogs and timed runs for tracking performance."""
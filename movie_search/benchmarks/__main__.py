@@ -0,0 +1,189 @@
+import argparse
+import json
+import subprocess
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from movie_search.benchmarks.compare import DEFAULT_TOLERANCE, compare_results
+from movie_search.benchmarks.corpus import SyntheticCorpus, parse_scale
+from movie_search.benchmarks.runner import (
+    DEFAULT_MAX_SCAN_DOCUMENTS,
+    DEFAULT_QUERY_COUNT,
+    run_benchmarks,
+)
+from movie_search.benchmarks.startup import (
+    DEFAULT_DOCUMENTS,
+    DEFAULT_REPEAT,
+    STARTUP_COMMANDS,
+    run_startup,
+)
+from movie_search.benchmarks.tokenizers import DEFAULT_PASSES, DEFAULT_TEXTS, run_tokenizers
+from movie_search.domain.tokenization import TOKENIZERS
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Movie search benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Benchmark synthetic catalogs")
+    run_parser.add_argument(
+        "--scale",
+        dest="scales",
+        type=_scale,
+        action="append",
+        help="Catalog size: 10k, 100k, 1m or a count like 25k (repeatable; default 10k)",
+    )
+    run_parser.add_argument(
+        "--queries", type=_positive_int, default=DEFAULT_QUERY_COUNT, help="Queries per run"
+    )
+    run_parser.add_argument("--seed", type=int, default=0, help="Corpus and query seed")
+    run_parser.add_argument(
+        "--max-scan-documents",
+        type=int,
+        default=DEFAULT_MAX_SCAN_DOCUMENTS,
+        help="Skip the corpus-scan search above this many documents",
+    )
+    run_parser.add_argument("--output", help="Write the JSON results to this file")
+    _add_baseline_arguments(run_parser, required=False)
+
+    startup_parser = subparsers.add_parser(
+        "startup", help="Measure the import time of CLI commands with -X importtime"
+    )
+    startup_parser.add_argument(
+        "--command",
+        dest="commands",
+        choices=list(STARTUP_COMMANDS),
+        action="append",
+        help="Command to measure (repeatable; default all)",
+    )
+    startup_parser.add_argument(
+        "--documents", type=_scale, default=DEFAULT_DOCUMENTS, help="Catalog size"
+    )
+    startup_parser.add_argument(
+        "--repeat",
+        type=_positive_int,
+        default=DEFAULT_REPEAT,
+        help="Runs per command; the fastest is reported",
+    )
+    startup_parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    startup_parser.add_argument(
+        "--stemmer", choices=list(TOKENIZERS), default="nltk", help="MOVIE_SEARCH_STEMMER"
+    )
+    startup_parser.add_argument("--output", help="Write the JSON results to this file")
+    _add_baseline_arguments(startup_parser, required=False)
+
+    tokenizers_parser = subparsers.add_parser(
+        "tokenizers", help="Measure tokenizer throughput in tokens per second"
+    )
+    tokenizers_parser.add_argument(
+        "--documents", type=_scale, default=DEFAULT_TEXTS, help="Texts tokenized per pass"
+    )
+    tokenizers_parser.add_argument(
+        "--repeat",
+        type=_positive_int,
+        default=DEFAULT_PASSES,
+        help="Timed passes per tokenizer; the fastest is reported",
+    )
+    tokenizers_parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    tokenizers_parser.add_argument("--output", help="Write the JSON results to this file")
+    _add_baseline_arguments(tokenizers_parser, required=False)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results to a baseline")
+    compare_parser.add_argument("results", help="JSON results of a run")
+    _add_baseline_arguments(compare_parser, required=True)
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="Write a synthetic catalog as JSON Lines"
+    )
+    generate_parser.add_argument("output", help="Catalog path")
+    generate_parser.add_argument("--scale", type=_scale, default=10_000, help="Catalog size")
+    generate_parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    return parser
+
+
+def run(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "generate":
+        SyntheticCorpus(args.seed).write_catalog(Path(args.output), args.scale)
+        return 0
+
+    if args.command == "compare":
+        return _check(_read(args.results), args.baseline, args.tolerance)
+
+    if args.command == "startup":
+        results = run_startup(
+            args.commands or STARTUP_COMMANDS,
+            documents=args.documents,
+            repeat=args.repeat,
+            seed=args.seed,
+            stemmer=args.stemmer,
+        )
+    elif args.command == "tokenizers":
+        results = run_tokenizers(args.documents, repeat=args.repeat, seed=args.seed)
+    else:
+        results = run_benchmarks(
+            args.scales or [10_000],
+            queries=args.queries,
+            seed=args.seed,
+            max_scan_documents=args.max_scan_documents,
+        )
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(f"{text}\n", encoding="utf-8")
+    else:
+        print(text)
+    return _check(results, args.baseline, args.tolerance) if args.baseline else 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        return run(argv=argv)
+    except (OSError, ValueError, subprocess.CalledProcessError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+
+def _check(results: dict[str, Any], baseline_path: str, tolerance: float) -> int:
+    regressions = compare_results(results, _read(baseline_path), tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _read(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as file:
+        results: dict[str, Any] = json.load(file)
+    return results
+
+
+def _add_baseline_arguments(parser: argparse.ArgumentParser, required: bool) -> None:
+    parser.add_argument(
+        "--baseline", required=required, help="Baseline JSON results to check for regressions"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown before a metric counts as a regression",
+    )
+
+
+def _scale(value: str) -> int:
+    try:
+        return parse_scale(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
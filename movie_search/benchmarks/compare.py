@@ -0,0 +1,63 @@
+"""Regression checks of benchmark results against a stored baseline."""
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_TOLERANCE = 0.25
+
+_HIGHER_IS_BETTER = ("_per_second",)
+_LOWER_IS_BETTER = ("seconds", "_ms", "_bytes")
+
+
+@dataclass(frozen=True, slots=True)
+class Regression:
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change from the baseline, e.g. ``0.3`` for 30% higher."""
+        return self.current / self.baseline - 1
+
+    def __str__(self) -> str:
+        return f"{self.metric}: {self.baseline:.6g} -> {self.current:.6g} ({self.change:+.1%})"
+
+
+def compare_results(
+    current: Mapping[str, Any],
+    baseline: Mapping[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[Regression]:
+    """Return the metrics of ``current`` worse than ``baseline`` by more than ``tolerance``.
+
+    Metrics are compared by name, e.g. ``scales.10000.search.index.p99_ms``.
+    Throughputs (``*_per_second``) regress when they drop; times and sizes when
+    they grow. Metrics missing from either side or zero in the baseline are skipped.
+    """
+    baseline_metrics = dict(flatten_metrics(baseline))
+    regressions = []
+    for metric, value in flatten_metrics(current):
+        reference = baseline_metrics.get(metric)
+        if not reference:
+            continue
+        if metric.endswith(_HIGHER_IS_BETTER):
+            regressed = value < reference * (1 - tolerance)
+        elif metric.endswith(_LOWER_IS_BETTER):
+            regressed = value > reference * (1 + tolerance)
+        else:
+            continue
+        if regressed:
+            regressions.append(Regression(metric, reference, value))
+    return regressions
+
+
+def flatten_metrics(results: Mapping[str, Any], prefix: str = "") -> Iterator[tuple[str, float]]:
+    """Yield the ``(dotted.name, value)`` pairs of every number in nested results."""
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, Mapping):
+            yield from flatten_metrics(value, f"{name}.")
+        elif isinstance(value, int | float) and not isinstance(value, bool):
+            yield name, float(value)
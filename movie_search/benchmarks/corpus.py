@@ -0,0 +1,86 @@
+"""Deterministic synthetic movie catalogs for benchmarks.
+
+Words are drawn from a generated vocabulary with Zipfian frequencies, so a few
+terms appear in most movies and the long tail in very few, as in real text.
+The same ``seed`` always yields the same catalog and queries.
+"""
+
+import json
+import random
+from collections.abc import Iterator
+from itertools import accumulate
+from pathlib import Path
+
+from movie_search.domain.models import Movie
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+DEFAULT_VOCABULARY_SIZE = 50_000
+DEFAULT_ZIPF_EXPONENT = 1.07
+
+_ONSETS = ("", *"b br c ch d dr f g gr h k l m n p pr qu r s sh st t th tr v w z".split())
+_NUCLEI = ("a", "e", "i", "o", "u", "ai", "ea", "io", "ou")
+_CODAS = ("", "", "", "n", "r", "s", "t", "l", "m", "nd", "st", "x")
+
+
+def parse_scale(value: str) -> int:
+    """Return the document count of a named scale or a count like ``"250"`` or ``"20k"``."""
+    name = value.strip().lower()
+    if name in SCALES:
+        return SCALES[name]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(name[-1:], 1)
+    digits = name[:-1] if multiplier > 1 else name
+    if not digits.isdigit() or int(digits) <= 0:
+        raise ValueError(f"Unknown benchmark scale: {value}")
+    return int(digits) * multiplier
+
+
+class SyntheticCorpus:
+    """Movies and queries over one Zipf-distributed vocabulary."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        vocabulary_size: int = DEFAULT_VOCABULARY_SIZE,
+        zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    ) -> None:
+        self._seed = seed
+        self.vocabulary = _vocabulary(random.Random(seed), vocabulary_size)
+        self._cumulative_weights = list(
+            accumulate(1.0 / rank**zipf_exponent for rank in range(1, vocabulary_size + 1))
+        )
+
+    def movies(self, count: int) -> Iterator[Movie]:
+        """Yield ``count`` movies with 1-4 title words and 5-60 description words."""
+        rng = random.Random(f"{self._seed}:movies")
+        for doc_id in range(1, count + 1):
+            title = self._words(rng, rng.randint(1, 4))
+            description = self._words(rng, rng.randint(5, 60))
+            yield Movie(doc_id, title.title(), description.capitalize())
+
+    def queries(self, count: int) -> list[str]:
+        """Return ``count`` queries of 1-3 words drawn from the same distribution."""
+        rng = random.Random(f"{self._seed}:queries")
+        return [self._words(rng, rng.choice((1, 1, 2, 2, 2, 3))) for _ in range(count)]
+
+    def write_catalog(self, path: Path, count: int) -> None:
+        """Write ``count`` movies as JSON Lines, a format the catalog loader streams."""
+        with path.open("w", encoding="utf-8") as file:
+            for movie in self.movies(count):
+                file.write(json.dumps(movie.to_dict()))
+                file.write("\n")
+
+    def _words(self, rng: random.Random, count: int) -> str:
+        return " ".join(rng.choices(self.vocabulary, cum_weights=self._cumulative_weights, k=count))
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    words: dict[str, None] = {}
+    while len(words) < size:
+        syllables = rng.choice((1, 2, 2, 2, 3, 3, 4))
+        word = "".join(
+            rng.choice(_ONSETS) + rng.choice(_NUCLEI) + rng.choice(_CODAS) for _ in range(syllables)
+        )
+        if len(word) > 2:
+            words[word] = None
+    return list(words)
@@ -0,0 +1,175 @@
+"""Timed runs of the build, persistence and search paths over synthetic catalogs.
+
+Each scale writes its catalog to a scratch directory, builds and saves the
+index the way ``index build`` does, and then times every query against a
+loaded index and, for catalogs up to ``max_scan_documents``, a corpus scan.
+"""
+
+import math
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from movie_search.application.index_service import IndexService
+from movie_search.application.metrics import peak_rss_bytes
+from movie_search.application.search_service import SearchService
+from movie_search.benchmarks.corpus import SyntheticCorpus
+from movie_search.infra.document_store import BinaryDocumentStore
+from movie_search.infra.json_repository import JsonLinesMovieRepository
+from movie_search.infra.segmented_index_store import SegmentedIndexStore
+from movie_search.infra.stopwords_repository import StopwordsRepository
+from movie_search.settings import STOPWORDS_PATH
+
+RESULTS_VERSION = 1
+
+DEFAULT_QUERY_COUNT = 200
+DEFAULT_LIMIT = 10
+DEFAULT_MAX_SCAN_DOCUMENTS = 100_000
+
+
+def run_benchmarks(
+    scales: Iterable[int],
+    queries: int = DEFAULT_QUERY_COUNT,
+    seed: int = 0,
+    max_scan_documents: int = DEFAULT_MAX_SCAN_DOCUMENTS,
+    isolate: bool = True,
+) -> dict[str, Any]:
+    """Benchmark each catalog size and return the results as a JSON-ready mapping.
+
+    With ``isolate`` every scale runs in a fresh process, so its peak RSS is
+    not inflated by the larger or earlier scales.
+    """
+    results: dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "queries": queries,
+        "scales": {},
+    }
+    for documents in scales:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(
+                    run_scale, documents, queries, seed, max_scan_documents
+                ).result()
+        else:
+            result = run_scale(documents, queries, seed, max_scan_documents)
+        results["scales"][str(documents)] = result
+    return results
+
+
+def run_scale(
+    documents: int,
+    queries: int = DEFAULT_QUERY_COUNT,
+    seed: int = 0,
+    max_scan_documents: int = DEFAULT_MAX_SCAN_DOCUMENTS,
+) -> dict[str, Any]:
+    corpus = SyntheticCorpus(seed)
+    query_texts = corpus.queries(queries)
+    work_dir = Path(tempfile.mkdtemp(prefix="movie-search-bench-"))
+    try:
+        catalog_path = work_dir / "movies.jsonl"
+        corpus.write_catalog(catalog_path, documents)
+        cache_dir = work_dir / "cache"
+        repository = JsonLinesMovieRepository(catalog_path)
+        stopwords = StopwordsRepository(STOPWORDS_PATH)
+
+        load_seconds = _seconds(repository.load_movies)
+
+        index_service = IndexService(
+            movie_repository=repository,
+            stopwords_repository=stopwords,
+            index_store=SegmentedIndexStore(cache_dir),
+            document_store=BinaryDocumentStore(cache_dir),
+        )
+        build_seconds = _seconds(index_service.build)
+        save_seconds = _seconds(index_service.save)
+        tokens = documents * float(index_service.stats()["average_document_length"])
+        del index_service
+
+        indexed = SearchService(
+            movie_repository=repository,
+            stopwords_repository=stopwords,
+            index_store=SegmentedIndexStore(cache_dir),
+            document_store=BinaryDocumentStore(cache_dir),
+        )
+        open_seconds = _seconds(indexed.warm)
+        result: dict[str, Any] = {
+            "documents": documents,
+            "catalog": {
+                "load_seconds": load_seconds,
+                "size_bytes": catalog_path.stat().st_size,
+            },
+            "build": {
+                "seconds": build_seconds,
+                "documents_per_second": documents / build_seconds,
+                "tokens_per_second": tokens / build_seconds,
+                "save_seconds": save_seconds,
+            },
+            "index": {
+                "open_seconds": open_seconds,
+                "size_bytes": _directory_size(cache_dir, exclude="documents.bin"),
+                "documents_size_bytes": (cache_dir / "documents.bin").stat().st_size,
+            },
+            "search": {"index": _query_latencies(indexed.search, query_texts)},
+        }
+        del indexed
+
+        if documents <= max_scan_documents:
+            scan = SearchService(movie_repository=repository, stopwords_repository=stopwords)
+            warm_seconds = _seconds(scan.warm)
+            result["search"]["scan"] = {
+                "warm_seconds": warm_seconds,
+                **_query_latencies(scan.search, query_texts),
+            }
+            del scan
+
+        result["peak_rss_bytes"] = peak_rss_bytes()
+        return result
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _query_latencies(
+    search: Callable[[str, int], object], queries: Sequence[str]
+) -> dict[str, float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, DEFAULT_LIMIT)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+def _seconds(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _directory_size(path: Path, exclude: str) -> int:
+    return sum(
+        file.stat().st_size for file in path.rglob("*") if file.is_file() and file.name != exclude
+    )
@@ -0,0 +1,145 @@
+"""Import cost of each CLI command, measured with ``python -X importtime``.
+
+Every command runs in a fresh interpreter against a small synthetic catalog and
+index in a scratch directory, so a command's numbers cover the modules it
+imports while running as well as at startup. The fastest of ``repeat`` runs is
+reported, with the slowest top-level imports of that run.
+"""
+
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from movie_search.benchmarks.corpus import SyntheticCorpus
+from movie_search.settings import PROJECT_ROOT
+
+RESULTS_VERSION = 1
+
+DEFAULT_DOCUMENTS = 1_000
+DEFAULT_REPEAT = 5
+SLOWEST_IMPORTS = 5
+
+# "{query}" is replaced by a word of the synthetic catalog.
+STARTUP_COMMANDS: dict[str, tuple[str, ...]] = {
+    "help": ("--help",),
+    "search": ("search", "{query}"),
+    "search --use-index": ("search", "{query}", "--use-index"),
+    "index build": ("index", "build"),
+    "index lookup": ("index", "lookup", "{query}"),
+    "index stats": ("index", "stats"),
+}
+
+# Heavy modules whose presence in a command's imports is reported.
+TRACKED_MODULES = ("nltk", "asyncio", "numpy", "urllib.request")
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Return the imports listed in ``-X importtime`` output, ignoring other lines."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        # CPython indents each nested import by two more spaces after "| ".
+        name = name[1:]
+        module = name.lstrip()
+        imports.append(
+            ImportTime(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(module)) // 2,
+            )
+        )
+    return imports
+
+
+def run_startup(
+    commands: Iterable[str] = STARTUP_COMMANDS,
+    documents: int = DEFAULT_DOCUMENTS,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    stemmer: str = "nltk",
+) -> dict[str, Any]:
+    """Time the imports of each named command and return JSON-ready results."""
+    results: dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "documents": documents,
+        "repeat": repeat,
+        "stemmer": stemmer,
+        "commands": {},
+    }
+    corpus = SyntheticCorpus(seed)
+    with tempfile.TemporaryDirectory(prefix="movie-search-startup-") as scratch:
+        catalog = Path(scratch) / "movies.jsonl"
+        corpus.write_catalog(catalog, documents)
+        env = _environment(catalog, Path(scratch) / "cache", stemmer)
+        query = corpus.queries(1)[0].split()[0]
+        # Builds the index the other commands read and compiles every module once.
+        _run([*_cli(), "index", "build"], env)
+        for name in commands:
+            argv = [argument.format(query=query) for argument in STARTUP_COMMANDS[name]]
+            runs = [_measure(argv, env) for _ in range(repeat)]
+            results["commands"][name] = min(runs, key=lambda run: run["import_ms"])
+    return results
+
+
+def _measure(argv: Sequence[str], env: Mapping[str, str]) -> dict[str, Any]:
+    start = time.perf_counter()
+    completed = _run([*_cli("-X", "importtime"), *argv], env)
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = parse_importtime(completed.stderr)
+    modules = {entry.module for entry in imports}
+    roots = sorted(
+        (entry for entry in imports if entry.depth == 0),
+        key=lambda entry: entry.cumulative_us,
+        reverse=True,
+    )
+    return {
+        "wall_ms": wall_ms,
+        "import_ms": sum(entry.self_us for entry in imports) / 1000,
+        "modules": len(modules),
+        "loaded": {module: module in modules for module in TRACKED_MODULES},
+        "slowest_imports": {
+            entry.module: entry.cumulative_us / 1000 for entry in roots[:SLOWEST_IMPORTS]
+        },
+    }
+
+
+def _cli(*options: str) -> list[str]:
+    return [sys.executable, *options, "-m", "movie_search"]
+
+
+def _run(argv: Sequence[str], env: Mapping[str, str]) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(argv, env=env, capture_output=True, text=True, check=True)
+
+
+def _environment(catalog: Path, cache_dir: Path, stemmer: str) -> dict[str, str]:
+    env = {name: value for name, value in os.environ.items() if name != "MOVIE_SEARCH_SERVER"}
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (str(PROJECT_ROOT), env.get("PYTHONPATH")) if path
+    )
+    env["MOVIE_SEARCH_MOVIES_PATH"] = str(catalog)
+    env["MOVIE_SEARCH_CACHE_DIR"] = str(cache_dir)
+    env["MOVIE_SEARCH_STEMMER"] = stemmer
+    return env
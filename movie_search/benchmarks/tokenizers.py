@@ -0,0 +1,100 @@
+"""Tokenizer throughput over synthetic catalog text, in tokens per second.
+
+``tokenize``, the tokenizer the CLI uses by default, is timed against
+``TokenizerPipeline`` configurations on the same documents and stopwords,
+once with ASCII punctuation after some words and once with typographic
+punctuation mixed in. A first pass warms the stem caches, and the fastest of
+``repeat`` passes is reported.
+"""
+
+import platform
+import random
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from movie_search.application.contracts import Tokenizer
+from movie_search.benchmarks.corpus import SyntheticCorpus
+from movie_search.domain.tokenization import (
+    STEMMERS,
+    TokenizerPipeline,
+    tokenize,
+    tokenize_builtin,
+)
+from movie_search.infra.stopwords_repository import StopwordsRepository
+from movie_search.settings import STOPWORDS_PATH
+
+RESULTS_VERSION = 1
+
+DEFAULT_TEXTS = 20_000
+DEFAULT_PASSES = 5
+BASELINE = "tokenize"
+
+_ASCII_SUFFIXES = ("", "", "", "", ",", ".", "!", "'s", ":")
+_SUFFIXES = {"ascii": _ASCII_SUFFIXES, "unicode": (*_ASCII_SUFFIXES, "’s", " —", "…")}
+
+
+def tokenizers() -> dict[str, Tokenizer]:
+    """Return the benchmarked tokenizers by name, the baseline first."""
+    return {
+        BASELINE: tokenize,
+        "tokenize_builtin": tokenize_builtin,
+        "pipeline_nltk": TokenizerPipeline(STEMMERS["nltk"]),
+        "pipeline_builtin": TokenizerPipeline(STEMMERS["builtin"]),
+        "pipeline_unstemmed": TokenizerPipeline(stemmer=None),
+    }
+
+
+def benchmark_texts(documents: int, seed: int = 0, kind: str = "ascii") -> list[str]:
+    """Return ``documents`` synthetic movie texts with ``kind`` punctuation after some words."""
+    suffixes = _SUFFIXES[kind]
+    rng = random.Random(f"{seed}:punctuation")
+    texts = []
+    for movie in SyntheticCorpus(seed).movies(documents):
+        words = f"{movie.title} {movie.description}".split()
+        texts.append(" ".join(word + rng.choice(suffixes) for word in words))
+    return texts
+
+
+def run_tokenizers(
+    documents: int = DEFAULT_TEXTS, repeat: int = DEFAULT_PASSES, seed: int = 0
+) -> dict[str, Any]:
+    """Time every tokenizer over both kinds of texts and return JSON-ready results."""
+    stopwords = StopwordsRepository(STOPWORDS_PATH).load_stopwords()
+    results: dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "documents": documents,
+        "repeat": repeat,
+        "texts": {},
+    }
+    for kind in _SUFFIXES:
+        texts = benchmark_texts(documents, seed, kind)
+        timings: dict[str, Any] = {}
+        for name, tokenizer in tokenizers().items():
+            tokens = _tokenize_all(tokenizer, texts, stopwords)
+            seconds = min(_timed(tokenizer, texts, stopwords) for _ in range(repeat))
+            timings[name] = {
+                "tokens": tokens,
+                "seconds": seconds,
+                "tokens_per_second": tokens / seconds,
+                "documents_per_second": documents / seconds,
+                "speedup": timings.get(BASELINE, {}).get("seconds", seconds) / seconds,
+            }
+        results["texts"][kind] = {
+            "characters": sum(len(text) for text in texts),
+            "tokenizers": timings,
+        }
+    return results
+
+
+def _tokenize_all(tokenizer: Tokenizer, texts: Sequence[str], stopwords: set[str]) -> int:
+    return sum(len(tokenizer(text, stopwords)) for text in texts)
+
+
+def _timed(tokenizer: Tokenizer, texts: Sequence[str], stopwords: set[str]) -> float:
+    start = time.perf_counter()
+    _tokenize_all(tokenizer, texts, stopwords)
+    return time.perf_counter() - start
@@ -1,23 +1,77 @@
 import argparse
 import json
+import os
 import sys
-from collections.abc import Sequence
-
-from movie_search.application.index_service import IndexService
-from movie_search.application.search_service import SearchService
-from movie_search.domain.exceptions import MovieSearchError
-from movie_search.infra.index_store import PickleIndexStore
-from movie_search.infra.json_repository import JsonMovieRepository
-from movie_search.infra.stopwords_repository import StopwordsRepository
-from movie_search.settings import CACHE_DIR, MOVIES_PATH, STOPWORDS_PATH
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from movie_search.application.result_cache import DEFAULT_MAX_ENTRIES, ResultCache
+from movie_search.domain.exceptions import (
+    DataAccessError,
+    DataFormatError,
+    DependencyError,
+    MovieSearchError,
+)
+from movie_search.domain.models import Movie
+from movie_search.profiling import Profiler
+from movie_search.settings import (
+    CACHE_DIR,
+    DEFAULT_HOST,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_PENDING,
+    DEFAULT_PORT,
+    MOVIES_PATH,
+    SERVER_ADDRESS,
+    STEMMER,
+    STOPWORDS_PATH,
+    TOKENIZER,
+)
+
+# Services, stores, the server and the client are imported by the commands that
+# use them, so every command starts without loading the rest.
+if TYPE_CHECKING:
+    from movie_search.application.contracts import MovieRepository, Tokenizer
+    from movie_search.application.index_service import IndexService
+    from movie_search.application.search_service import SearchService
+    from movie_search.client import SearchClient
+    from movie_search.search.bm25 import BM25SearchEngine
+    from movie_search.server import QueryApi, QueryServer
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Movie keyword search CLI")
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Write per-stage wall time, call counts and allocations as JSON to stderr",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write cProfile statistics to FILE (read them with 'python -m pstats FILE')",
+    )
+    parser.add_argument(
+        "--trace-allocations",
+        metavar="FILE",
+        help="Trace allocations with tracemalloc and write the final snapshot to FILE",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="Write query, cache and index metrics in Prometheus text format to FILE on exit",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     search_parser = subparsers.add_parser("search", help="Search movies using BM25")
-    search_parser.add_argument("query", help="Query to search")
+    search_parser.add_argument("query", nargs="?", help="Query to search")
+    search_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Read JSON Lines queries from FILE ('-' for stdin) and write JSON Lines results",
+    )
     search_parser.add_argument(
         "--limit", type=int, default=5, help="Maximum number of movies to return"
     )
@@ -28,11 +82,82 @@ def build_parser() -> argparse.ArgumentParser:
         default="text",
         help="Output format",
     )
+    search_parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="Rank using the persisted inverted index cache instead of scanning the corpus",
+    )
+    search_parser.add_argument(
+        "--engine",
+        choices=("bm25", "numpy"),
+        default="bm25",
+        help="Ranking engine for corpus scans (numpy requires the 'numpy' extra)",
+    )
+    _add_server_argument(search_parser)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Keep the catalog and index loaded and answer queries over HTTP"
+    )
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    serve_parser.add_argument(
+        "--socket", dest="socket_path", help="Listen on a Unix domain socket instead of TCP"
+    )
+    serve_parser.add_argument(
+        "--max-concurrency",
+        type=_positive_int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="Number of queries ranked at the same time",
+    )
+    serve_parser.add_argument(
+        "--max-pending",
+        type=_non_negative_int,
+        default=DEFAULT_MAX_PENDING,
+        help="Queries allowed to wait for a slot before new ones are rejected with 503",
+    )
+    serve_parser.add_argument(
+        "--cache-size",
+        type=_non_negative_int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Number of ranked results kept in the query result cache (0 disables it)",
+    )
+    serve_parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Expire cached results after this many seconds (default: only on index changes)",
+    )
+    serve_parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="Rank using the persisted inverted index cache instead of scanning the corpus",
+    )
+    serve_parser.add_argument(
+        "--engine",
+        choices=("bm25", "numpy"),
+        default="bm25",
+        help="Ranking engine for corpus scans (numpy requires the 'numpy' extra)",
+    )
 
     index_parser = subparsers.add_parser("index", help="Inverted index operations")
     index_subparsers = index_parser.add_subparsers(dest="index_command", required=True)
 
-    index_subparsers.add_parser("build", help="Build and persist the inverted index")
+    index_build_parser = index_subparsers.add_parser(
+        "build", help="Build and persist the inverted index"
+    )
+    index_build_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Number of processes used to tokenize movies",
+    )
+    _add_impact_ordered_argument(index_build_parser)
+    index_build_parser.add_argument(
+        "--positions",
+        action="store_true",
+        help='Record token positions so queries can match "quoted phrases"',
+    )
 
     lookup_parser = index_subparsers.add_parser("lookup", help="Lookup documents for a term")
     lookup_parser.add_argument("term", help="Term to look up")
@@ -43,6 +168,28 @@ def build_parser() -> argparse.ArgumentParser:
         default="text",
         help="Output format",
     )
+    _add_server_argument(lookup_parser)
+
+    upsert_parser = index_subparsers.add_parser(
+        "upsert", help="Add or update one movie in the cached index"
+    )
+    upsert_parser.add_argument("--id", dest="movie_id", type=int, required=True, help="Movie ID")
+    upsert_parser.add_argument("--title", required=True, help="Movie title")
+    upsert_parser.add_argument("--description", default="", help="Movie description")
+
+    delete_parser = index_subparsers.add_parser(
+        "delete", help="Remove movies from the cached index"
+    )
+    delete_parser.add_argument("movie_ids", nargs="+", type=int, help="Movie IDs to remove")
+
+    index_subparsers.add_parser(
+        "sync", help="Apply the difference between the movies file and the cached index"
+    )
+
+    compact_parser = index_subparsers.add_parser(
+        "compact", help="Merge all index segments into one"
+    )
+    _add_impact_ordered_argument(compact_parser)
 
     stats_parser = index_subparsers.add_parser("stats", help="Show index statistics")
     stats_parser.add_argument(
@@ -52,46 +199,264 @@ def build_parser() -> argparse.ArgumentParser:
         default="text",
         help="Output format",
     )
+    _add_server_argument(stats_parser)
 
     return parser
 
 
-def create_search_service() -> SearchService:
-    movie_repo = JsonMovieRepository(MOVIES_PATH)
+def _add_server_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--server",
+        metavar="ADDRESS",
+        default=SERVER_ADDRESS,
+        help="Send the request to a running 'serve' daemon (http://HOST:PORT or unix:PATH); "
+        "defaults to $MOVIE_SEARCH_SERVER",
+    )
+
+
+def _add_impact_ordered_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--impact-ordered",
+        action="store_true",
+        help="Also store postings in BM25 score order to answer single-term and short "
+        "queries from the top of each list",
+    )
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer, got {value}")
+    return number
+
+
+def create_engine(name: str) -> "BM25SearchEngine":
+    if name == "numpy":
+        try:
+            from movie_search.search.numpy_bm25 import NumpyBM25SearchEngine
+        except ImportError as exc:
+            raise DependencyError(
+                "The numpy engine requires numpy; install the 'numpy' extra."
+            ) from exc
+        return NumpyBM25SearchEngine()
+    from movie_search.search.bm25 import BM25SearchEngine
+
+    return BM25SearchEngine()
+
+
+def create_tokenizer() -> "Tokenizer":
+    from movie_search.domain.tokenization import STEMMERS, TOKENIZERS, TokenizerPipeline
+
+    if STEMMER not in STEMMERS:
+        raise DataFormatError(
+            f"Unknown stemmer {STEMMER!r} in MOVIE_SEARCH_STEMMER; "
+            f"expected one of: {', '.join(STEMMERS)}."
+        )
+    if TOKENIZER == "unicode":
+        return TokenizerPipeline(STEMMERS[STEMMER])
+    if TOKENIZER != "ascii":
+        raise DataFormatError(
+            f"Unknown tokenizer {TOKENIZER!r} in MOVIE_SEARCH_TOKENIZER; "
+            "expected one of: ascii, unicode."
+        )
+    return TOKENIZERS[STEMMER]
+
+
+def create_movie_repository() -> "MovieRepository":
+    from movie_search.infra.json_repository import JsonLinesMovieRepository, JsonMovieRepository
+
+    if MOVIES_PATH.suffix == ".jsonl":
+        return JsonLinesMovieRepository(MOVIES_PATH)
+    return JsonMovieRepository(MOVIES_PATH)
+
+
+def create_search_service(
+    engine: "BM25SearchEngine | None" = None,
+    result_cache: ResultCache[list[Movie]] | None = None,
+) -> "SearchService":
+    from movie_search.application.search_service import SearchService
+    from movie_search.infra.stopwords_repository import StopwordsRepository
+
+    movie_repo = create_movie_repository()
+    stopwords_repo = StopwordsRepository(STOPWORDS_PATH)
+    return SearchService(
+        movie_repository=movie_repo,
+        stopwords_repository=stopwords_repo,
+        tokenizer=create_tokenizer(),
+        engine=engine,
+        result_cache=result_cache,
+    )
+
+
+def create_indexed_search_service(
+    engine: "BM25SearchEngine | None" = None,
+    result_cache: ResultCache[list[Movie]] | None = None,
+) -> "SearchService":
+    from movie_search.application.search_service import SearchService
+    from movie_search.infra.document_store import BinaryDocumentStore
+    from movie_search.infra.segmented_index_store import SegmentedIndexStore
+    from movie_search.infra.stopwords_repository import StopwordsRepository
+
+    movie_repo = create_movie_repository()
     stopwords_repo = StopwordsRepository(STOPWORDS_PATH)
-    return SearchService(movie_repository=movie_repo, stopwords_repository=stopwords_repo)
+    store = SegmentedIndexStore(CACHE_DIR)
+    return SearchService(
+        movie_repository=movie_repo,
+        stopwords_repository=stopwords_repo,
+        tokenizer=create_tokenizer(),
+        engine=engine,
+        index_store=store,
+        result_cache=result_cache,
+        document_store=BinaryDocumentStore(CACHE_DIR),
+    )
+
 
+def create_index_service() -> "IndexService":
+    from movie_search.application.index_service import IndexService
+    from movie_search.infra.document_store import BinaryDocumentStore
+    from movie_search.infra.segmented_index_store import SegmentedIndexStore
+    from movie_search.infra.stopwords_repository import StopwordsRepository
 
-def create_index_service() -> IndexService:
-    movie_repo = JsonMovieRepository(MOVIES_PATH)
+    movie_repo = create_movie_repository()
     stopwords_repo = StopwordsRepository(STOPWORDS_PATH)
-    store = PickleIndexStore(CACHE_DIR)
+    store = SegmentedIndexStore(CACHE_DIR)
     return IndexService(
-        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+        movie_repository=movie_repo,
+        stopwords_repository=stopwords_repo,
+        index_store=store,
+        tokenizer=create_tokenizer(),
+        document_store=BinaryDocumentStore(CACHE_DIR),
     )
 
 
+def create_search_client(address: str) -> "SearchClient":
+    from movie_search.client import SearchClient
+
+    return SearchClient(address)
+
+
 def run(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    try:
+        if not (args.timings or args.profile or args.trace_allocations):
+            return _run_command(parser, args)
+        with _instrumented(args):
+            return _run_command(parser, args)
+    finally:
+        if args.metrics_file:
+            _write_metrics(Path(args.metrics_file))
+
 
+def _run_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
     if args.command == "search":
-        return _run_search(args.query, args.limit, args.output_format)
+        if (args.query is None) == (args.batch is None):
+            parser.error("search requires exactly one of QUERY or --batch FILE")
+        if args.batch is not None:
+            return _run_search_batch(
+                args.batch, args.limit, args.use_index, args.engine, args.server
+            )
+        return _run_search(
+            args.query, args.limit, args.output_format, args.use_index, args.engine, args.server
+        )
+
+    if args.command == "serve":
+        socket_path = Path(args.socket_path) if args.socket_path else None
+        return _run_serve(
+            args.host,
+            args.port,
+            socket_path,
+            args.use_index,
+            args.engine,
+            args.max_concurrency,
+            args.max_pending,
+            args.cache_size,
+            args.cache_ttl,
+        )
 
     if args.command == "index":
         if args.index_command == "build":
-            return _run_index_build()
+            return _run_index_build(args.workers, args.impact_ordered, args.positions)
         if args.index_command == "lookup":
-            return _run_index_lookup(args.term, args.output_format)
+            return _run_index_lookup(args.term, args.output_format, args.server)
+        if args.index_command == "upsert":
+            return _run_index_upsert(Movie(args.movie_id, args.title, args.description))
+        if args.index_command == "delete":
+            return _run_index_delete(args.movie_ids)
+        if args.index_command == "sync":
+            return _run_index_sync()
+        if args.index_command == "compact":
+            return _run_index_compact(args.impact_ordered)
         if args.index_command == "stats":
-            return _run_index_stats(args.output_format)
+            return _run_index_stats(args.output_format, args.server)
 
     parser.print_help()
     return 2
 
 
-def _run_search(query: str, limit: int, output_format: str) -> int:
-    service = create_search_service()
+@contextmanager
+def _instrumented(args: argparse.Namespace) -> Iterator[None]:
+    """Profile the command, then write the requested timings, profile and snapshot."""
+    import cProfile
+
+    command = " ".join(
+        name for name in (args.command, getattr(args, "index_command", None)) if name
+    )
+    profile = cProfile.Profile() if args.profile else None
+    if args.trace_allocations:
+        tracemalloc.start()
+    try:
+        with Profiler() as profiler, profile if profile is not None else nullcontext():
+            yield
+        report = {"command": command, **profiler.report()}
+        if args.timings:
+            print(json.dumps(report), file=sys.stderr)
+        _write_output(args.profile, profile.dump_stats if profile is not None else None)
+        if args.trace_allocations:
+            _write_output(args.trace_allocations, tracemalloc.take_snapshot().dump)
+    finally:
+        if args.trace_allocations:
+            tracemalloc.stop()
+
+
+def _write_metrics(path: Path) -> None:
+    # Replaced atomically, so a collector polling the file never reads half of it.
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    from movie_search.application.metrics import METRICS
+
+    try:
+        temporary_path.write_text(METRICS.render(), encoding="utf-8")
+        os.replace(temporary_path, path)
+    except OSError as exc:
+        temporary_path.unlink(missing_ok=True)
+        raise DataAccessError(f"Unable to write metrics file: {path}") from exc
+
+
+def _write_output(path: str | None, write: Callable[[str], None] | None) -> None:
+    if path is None or write is None:
+        return
+    try:
+        write(path)
+    except OSError as exc:
+        raise DataAccessError(f"Unable to write profiling output: {path}") from exc
+
+
+def _run_search(
+    query: str,
+    limit: int,
+    output_format: str,
+    use_index: bool,
+    engine_name: str,
+    server: str | None,
+) -> int:
+    service = _create_searcher(use_index, engine_name, server)
     movies = service.search(query=query, limit=limit)
 
     if output_format == "json":
@@ -108,19 +473,125 @@ def _run_search(query: str, limit: int, output_format: str) -> int:
     return 0
 
 
-def _run_index_build() -> int:
+def _run_search_batch(
+    batch: str, limit: int, use_index: bool, engine_name: str, server: str | None
+) -> int:
+    service = _create_searcher(use_index, engine_name, server)
+
+    if batch == "-":
+        return _write_batch_results(service, sys.stdin, limit)
+    try:
+        with open(batch, encoding="utf-8") as batch_file:
+            return _write_batch_results(service, batch_file, limit)
+    except FileNotFoundError as exc:
+        raise DataAccessError(f"Batch file not found: {batch}") from exc
+    except OSError as exc:
+        raise DataAccessError(f"Unable to read batch file: {batch}") from exc
+
+
+def _create_searcher(
+    use_index: bool, engine_name: str, server: str | None
+) -> "SearchService | SearchClient":
+    if server is not None:
+        return create_search_client(server)
+    factory = create_indexed_search_service if use_index else create_search_service
+    return factory(engine=create_engine(engine_name))
+
+
+def _write_batch_results(
+    service: "SearchService | SearchClient", lines: Iterable[str], limit: int
+) -> int:
+    for query, movies in service.search_many(_read_batch_queries(lines), limit=limit):
+        payload = {"query": query, "results": [movie.to_dict() for movie in movies]}
+        print(json.dumps(payload, ensure_ascii=False), flush=True)
+    return 0
+
+
+def _read_batch_queries(lines: Iterable[str]) -> Iterator[str]:
+    """Yield queries from JSON Lines holding either a string or ``{"query": ...}``."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise DataFormatError(f"Malformed JSON on batch line {line_number}.") from exc
+        if isinstance(item, dict):
+            item = item.get("query")
+        if not isinstance(item, str):
+            raise DataFormatError(
+                f"Batch line {line_number} must be a string or an object with a 'query' string."
+            )
+        yield item
+
+
+def _run_serve(
+    host: str,
+    port: int,
+    socket_path: Path | None,
+    use_index: bool,
+    engine_name: str,
+    max_concurrency: int,
+    max_pending: int,
+    cache_size: int,
+    cache_ttl: float | None,
+) -> int:
+    import asyncio
+
+    from movie_search.server import QueryApi
+
+    factory = create_indexed_search_service if use_index else create_search_service
+    api = QueryApi(
+        search_service=factory(
+            engine=create_engine(engine_name),
+            result_cache=ResultCache(max_entries=cache_size, ttl=cache_ttl),
+        ),
+        index_service=create_index_service(),
+        max_concurrency=max_concurrency,
+        max_pending=max_pending,
+    )
+    api.warm()
+    server = create_server(api, host=host, port=port, socket_path=socket_path)
+    try:
+        asyncio.run(_serve(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+    return 0
+
+
+def create_server(api: "QueryApi", host: str, port: int, socket_path: Path | None) -> "QueryServer":
+    from movie_search.server import QueryServer
+
+    return QueryServer(api, host=host, port=port, socket_path=socket_path)
+
+
+async def _serve(server: "QueryServer") -> None:
+    try:
+        await server.start()
+    except OSError as exc:
+        raise DataAccessError(f"Unable to listen for queries: {exc}") from exc
+    print(f"Serving queries on {server.address}", flush=True)
+    await server.serve_forever()
+
+
+def _run_index_build(workers: int, impact_ordered: bool, positions: bool) -> int:
     service = create_index_service()
-    service.build()
+    service.build(workers=workers, impact_ordered=impact_ordered, positions=positions)
     service.save()
     stats = service.stats()
     print(f"Indexed {stats['document_count']} documents across {stats['token_count']} tokens.")
     return 0
 
 
-def _run_index_lookup(term: str, output_format: str) -> int:
-    service = create_index_service()
-    service.load()
-    doc_ids = service.lookup(term)
+def _run_index_lookup(term: str, output_format: str, server: str | None) -> int:
+    if server is not None:
+        doc_ids = create_search_client(server).lookup(term)
+    else:
+        service = create_index_service()
+        service.load()
+        doc_ids = service.lookup(term)
 
     if output_format == "json":
         print(json.dumps(doc_ids))
@@ -135,10 +606,51 @@ def _run_index_lookup(term: str, output_format: str) -> int:
     return 0
 
 
-def _run_index_stats(output_format: str) -> int:
+def _run_index_upsert(movie: Movie) -> int:
     service = create_index_service()
     service.load()
-    stats = service.stats()
+    changed = service.upsert([movie])
+    service.save()
+    print(f"Upserted {len(changed)} documents.")
+    return 0
+
+
+def _run_index_delete(movie_ids: list[int]) -> int:
+    service = create_index_service()
+    service.load()
+    removed = service.delete(movie_ids)
+    service.save()
+    print(f"Deleted {len(removed)} documents.")
+    return 0
+
+
+def _run_index_sync() -> int:
+    service = create_index_service()
+    service.load()
+    changes = service.sync()
+    service.save()
+    print(
+        f"Added {changes['added']}, updated {changes['updated']} "
+        f"and deleted {changes['deleted']} documents."
+    )
+    return 0
+
+
+def _run_index_compact(impact_ordered: bool) -> int:
+    service = create_index_service()
+    service.load()
+    merged = service.compact(impact_ordered=impact_ordered)
+    print(f"Merged {merged} segments.")
+    return 0
+
+
+def _run_index_stats(output_format: str, server: str | None) -> int:
+    if server is not None:
+        stats = create_search_client(server).stats()
+    else:
+        service = create_index_service()
+        service.load()
+        stats = service.stats()
 
     if output_format == "json":
         print(json.dumps(stats))
@@ -146,6 +658,7 @@ def _run_index_stats(output_format: str) -> int:
 
     print(f"Documents: {stats['document_count']}")
     print(f"Tokens: {stats['token_count']}")
+    print(f"Average document length: {stats['average_document_length']:.2f}")
     return 0
 
 
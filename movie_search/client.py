@@ -0,0 +1,96 @@
+import http.client
+import json
+import socket
+from collections.abc import Iterable, Iterator
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+from movie_search.domain.exceptions import ServerError
+from movie_search.domain.models import Movie
+
+
+class SearchClient:
+    """Client for the query server started by ``movie-search serve``.
+
+    ``address`` is either ``http://host:port`` or ``unix:/path/to/socket``.
+    The connection is kept open and reused across requests.
+    """
+
+    def __init__(self, address: str, timeout: float = 10.0) -> None:
+        self._address = address
+        self._timeout = timeout
+        self._connection: http.client.HTTPConnection | None = None
+
+    def search(self, query: str, limit: int = 5) -> list[Movie]:
+        payload = self._get("/search", {"q": query, "limit": limit})
+        return [Movie.from_mapping(item) for item in payload.get("results", [])]
+
+    def search_many(
+        self, queries: Iterable[str], limit: int = 5
+    ) -> Iterator[tuple[str, list[Movie]]]:
+        for query in queries:
+            yield query, self.search(query, limit)
+
+    def lookup(self, term: str) -> list[int]:
+        return [int(doc_id) for doc_id in self._get("/lookup", {"term": term}).get("doc_ids", [])]
+
+    def stats(self) -> dict[str, int | float]:
+        return dict(self._get("/stats", {}))
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get(self, path: str, params: dict[str, str | int]) -> dict[str, Any]:
+        target = f"{path}?{urlencode(params)}" if params else path
+        try:
+            connection = self._connect()
+            connection.request("GET", target)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            self.close()
+            raise ServerError(f"Unable to reach search server at {self._address}") from exc
+
+        try:
+            payload = json.loads(body)
+        except ValueError as exc:
+            raise ServerError(f"Search server returned a malformed response for {path}") from exc
+        if response.status != 200:
+            message = payload.get("error") if isinstance(payload, dict) else None
+            raise ServerError(message or f"Search server returned HTTP {response.status}")
+        if not isinstance(payload, dict):
+            raise ServerError(f"Search server returned a malformed response for {path}")
+        return payload
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            if self._address.startswith("unix:"):
+                self._connection = _UnixHTTPConnection(
+                    self._address.removeprefix("unix:"), self._timeout
+                )
+            else:
+                url = urlsplit(self._address)
+                if url.scheme != "http" or url.hostname is None:
+                    raise ServerError(f"Unsupported search server address: {self._address}")
+                self._connection = http.client.HTTPConnection(
+                    url.hostname, url.port, timeout=self._timeout
+                )
+        return self._connection
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
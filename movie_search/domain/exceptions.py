@@ -12,3 +12,11 @@ class DataFormatError(MovieSearchError):
 
 class IndexStoreError(MovieSearchError):
     """Raised when index persistence operations fail."""
+
+
+class DependencyError(MovieSearchError):
+    """Raised when an optional dependency required by a feature is not installed."""
+
+
+class ServerError(MovieSearchError):
+    """Raised when the search server cannot be reached or rejects a request."""
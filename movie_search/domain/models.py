@@ -28,3 +28,9 @@ class Movie:
 class SearchResult:
     movie: Movie
     score: float
+
+
+@dataclass(frozen=True, slots=True)
+class DocumentScore:
+    doc_id: int
+    score: float
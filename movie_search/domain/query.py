@@ -0,0 +1,39 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+_PHRASE = re.compile(r'"([^"]*)"')
+
+PHRASES_NEED_POSITIONS = (
+    "Phrase queries need token positions; rebuild the index with 'index build --positions'."
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Query:
+    """The tokens a query is ranked by plus the tokens of each quoted phrase.
+
+    Equal queries rank identically, e.g. ``The "Star Wars"!`` and ``"star wars"``.
+    """
+
+    tokens: tuple[str, ...]
+    phrases: tuple[tuple[str, ...], ...] = ()
+
+    def needs_positions(self) -> bool:
+        return any(len(phrase) > 1 for phrase in self.phrases)
+
+
+def parse_query(
+    text: str, stopwords: set[str], tokenizer: Callable[[str, set[str]], list[str]]
+) -> Query:
+    """Split ``text`` into tokens and ``"quoted phrases"``.
+
+    Phrase tokens also count as query tokens. An unmatched quote is ignored,
+    and a phrase of only stopwords is dropped.
+    """
+    phrases = tuple(
+        tokens
+        for match in _PHRASE.finditer(text)
+        if (tokens := tuple(tokenizer(match[1], stopwords)))
+    )
+    return Query(tokens=tuple(tokenizer(text, stopwords)), phrases=tuple(dict.fromkeys(phrases)))
@@ -0,0 +1,229 @@
+"""Porter stemmer without third-party dependencies.
+
+Implements the Porter (1980) suffix-stripping algorithm with the same
+extensions as NLTK's default ``PorterStemmer`` mode (irregular forms, ``-ied``,
+``-alli``, ``-fulli`` and ``-logi`` rules, and ``y -> i`` only after a
+consonant), so both stem every word alike and share an index.
+"""
+
+_VOWELS = frozenset("aeiou")
+
+_IRREGULAR_FORMS = {
+    "skies": "sky",
+    "sky": "sky",
+    "dying": "die",
+    "lying": "lie",
+    "tying": "tie",
+    "news": "news",
+    "innings": "inning",
+    "inning": "inning",
+    "outings": "outing",
+    "outing": "outing",
+    "cannings": "canning",
+    "canning": "canning",
+    "howe": "howe",
+    "proceed": "proceed",
+    "exceed": "exceed",
+    "succeed": "succeed",
+}
+
+# Within a step the first suffix the word ends with decides: its rule applies
+# if the condition holds, and otherwise the word is left as it is.
+_STEP2 = (
+    ("ational", "ate"),
+    ("tional", "tion"),
+    ("enci", "ence"),
+    ("anci", "ance"),
+    ("izer", "ize"),
+    ("bli", "ble"),
+    ("alli", "al"),
+    ("entli", "ent"),
+    ("eli", "e"),
+    ("ousli", "ous"),
+    ("ization", "ize"),
+    ("ation", "ate"),
+    ("ator", "ate"),
+    ("alism", "al"),
+    ("iveness", "ive"),
+    ("fulness", "ful"),
+    ("ousness", "ous"),
+    ("aliti", "al"),
+    ("iviti", "ive"),
+    ("biliti", "ble"),
+    ("fulli", "ful"),
+    ("logi", "log"),
+)
+_STEP3 = (
+    ("icate", "ic"),
+    ("ative", ""),
+    ("alize", "al"),
+    ("iciti", "ic"),
+    ("ical", "ic"),
+    ("ful", ""),
+    ("ness", ""),
+)
+_STEP4 = (
+    "al",
+    "ance",
+    "ence",
+    "er",
+    "ic",
+    "able",
+    "ible",
+    "ant",
+    "ement",
+    "ment",
+    "ent",
+    "ion",
+    "ou",
+    "ism",
+    "ate",
+    "iti",
+    "ous",
+    "ive",
+    "ize",
+)
+
+
+def porter_stem(word: str) -> str:
+    """Return the Porter stem of a lowercase ``word``."""
+    if word in _IRREGULAR_FORMS:
+        return _IRREGULAR_FORMS[word]
+    if len(word) <= 2:
+        return word
+    word = _step1a(word)
+    word = _step1b(word)
+    word = _step1c(word)
+    word = _step2(word)
+    word = _step3(word)
+    word = _step4(word)
+    word = _step5a(word)
+    return _step5b(word)
+
+
+def _consonants(word: str) -> list[bool]:
+    # "y" is a consonant at the start of a word or after a vowel.
+    flags: list[bool] = []
+    previous = False
+    for position, letter in enumerate(word):
+        if letter in _VOWELS:
+            previous = False
+        elif letter == "y":
+            previous = position == 0 or not previous
+        else:
+            previous = True
+        flags.append(previous)
+    return flags
+
+
+def _measure(stem: str) -> int:
+    """Return the number of vowel-consonant sequences in ``stem``."""
+    flags = _consonants(stem)
+    return sum(1 for left, right in zip(flags, flags[1:], strict=False) if not left and right)
+
+
+def _contains_vowel(stem: str) -> bool:
+    return not all(_consonants(stem))
+
+
+def _ends_double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _consonants(word)[-1]
+
+
+def _ends_cvc(word: str) -> bool:
+    flags = _consonants(word)
+    if len(word) == 2:
+        return not flags[0] and flags[1]
+    return (
+        len(word) >= 3
+        and flags[-3]
+        and not flags[-2]
+        and flags[-1]
+        and word[-1] not in ("w", "x", "y")
+    )
+
+
+def _step1a(word: str) -> str:
+    if word.endswith("ies") and len(word) == 4:
+        return word[:-1]
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("ies"):
+        return word[:-2]
+    if word.endswith("ss"):
+        return word
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _step1b(word: str) -> str:
+    if word.endswith("ied"):
+        return word[:-1] if len(word) == 4 else word[:-2]
+    if word.endswith("eed"):
+        return word[:-1] if _measure(word[:-3]) > 0 else word
+
+    for suffix in ("ed", "ing"):
+        if word.endswith(suffix) and _contains_vowel(stem := word[: -len(suffix)]):
+            break
+    else:
+        return word
+
+    if stem.endswith(("at", "bl", "iz")):
+        return stem + "e"
+    if _ends_double_consonant(stem):
+        return stem if stem[-1] in ("l", "s", "z") else stem[:-1]
+    if _measure(stem) == 1 and _ends_cvc(stem):
+        return stem + "e"
+    return stem
+
+
+def _step1c(word: str) -> str:
+    if word.endswith("y") and len(word) > 2 and _consonants(word)[-2]:
+        return word[:-1] + "i"
+    return word
+
+
+def _step2(word: str) -> str:
+    if word.endswith("alli") and _measure(word[:-4]) > 0:
+        return _step2(word[:-4] + "al")
+    for suffix, replacement in _STEP2:
+        if word.endswith(suffix):
+            stem = word[: -len(suffix)]
+            # "-logi" is measured with its "l", so "-ologi" shortens after one syllable.
+            measured = stem + "l" if suffix == "logi" else stem
+            return stem + replacement if _measure(measured) > 0 else word
+    return word
+
+
+def _step3(word: str) -> str:
+    for suffix, replacement in _STEP3:
+        if word.endswith(suffix):
+            stem = word[: -len(suffix)]
+            return stem + replacement if _measure(stem) > 0 else word
+    return word
+
+
+def _step4(word: str) -> str:
+    for suffix in _STEP4:
+        if word.endswith(suffix):
+            stem = word[: -len(suffix)]
+            if _measure(stem) > 1 and (suffix != "ion" or stem.endswith(("s", "t"))):
+                return stem
+            return word
+    return word
+
+
+def _step5a(word: str) -> str:
+    if word.endswith("e"):
+        stem = word[:-1]
+        measure = _measure(stem)
+        if measure > 1 or (measure == 1 and not _ends_cvc(stem)):
+            return stem
+    return word
+
+
+def _step5b(word: str) -> str:
+    if word.endswith("ll") and _measure(word[:-1]) > 1:
+        return word[:-1]
+    return word
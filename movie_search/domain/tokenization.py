@@ -1,11 +1,136 @@
 import string
+import unicodedata
+from collections.abc import Callable, Collection, Iterable
+from functools import cache, lru_cache
 
-from nltk import PorterStemmer
+from movie_search.domain.stemming import porter_stem
 
 _TRANSLATOR = str.maketrans("", "", string.punctuation)
-_STEMMER = PorterStemmer()
+
+STEM_CACHE_SIZE = 1 << 16
+
+
+@cache
+def _nltk_stemmer() -> Callable[[str], str]:
+    # Importing nltk takes longer than most commands run, so it is only loaded
+    # once something is actually stemmed.
+    from nltk.stem.porter import PorterStemmer
+
+    stem: Callable[[str], str] = PorterStemmer().stem
+    return stem
+
+
+# Natural-language text repeats a small vocabulary, so most stems are cache
+# hits; least-recently-used entries are evicted once the cache is full.
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def _stem(token: str) -> str:
+    return _nltk_stemmer()(token)
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def _builtin_stem(token: str) -> str:
+    return porter_stem(token)
+
+
+# Cached stemmers for ``TokenizerPipeline``, by MOVIE_SEARCH_STEMMER name.
+STEMMERS: dict[str, Callable[[str], str]] = {"nltk": _stem, "builtin": _builtin_stem}
+
+
+class _NormalizationTable(dict[int, str | None]):
+    """``str.translate`` table that case-folds and deletes punctuation.
+
+    Latin-1 is mapped up front and any other character the first time it is
+    seen, since a full Unicode table would take longer to build than to use.
+    """
+
+    def __missing__(self, codepoint: int) -> str | None:
+        mapped = _normalized(chr(codepoint))
+        self[codepoint] = mapped
+        return mapped
+
+
+def _normalized(character: str) -> str | None:
+    if character in string.punctuation or unicodedata.category(character).startswith("P"):
+        return None
+    return character.casefold()
+
+
+_NORMALIZATION = _NormalizationTable(
+    (codepoint, _normalized(chr(codepoint))) for codepoint in range(256)
+)
+
+
+def normalize(text: str) -> str:
+    """Case-fold ``text`` and delete ASCII and Unicode punctuation in one pass.
+
+    ASCII text comes out as ``tokenize`` normalizes it.
+    """
+    return text.translate(_NORMALIZATION)
+
+
+class TokenizerPipeline:
+    """Normalize, drop stopwords and stem, with the ``Tokenizer`` call signature.
+
+    Normalization is a single ``str.translate`` (see ``normalize``), so there is
+    one copy of the text before it is split. ``stopwords`` are frozen and dropped
+    along with those passed per call; ``stemmer`` is any ``str -> str`` callable,
+    e.g. from ``STEMMERS``, or ``None`` to keep tokens unstemmed. Pipelines
+    pickle, so parallel index builds can use them, as long as ``stemmer`` does.
+    """
+
+    __slots__ = ("_stemmer", "_stopwords")
+
+    def __init__(
+        self,
+        stemmer: Callable[[str], str] | None = _builtin_stem,
+        stopwords: Iterable[str] = (),
+    ) -> None:
+        self._stemmer = stemmer
+        self._stopwords = frozenset(stopwords)
+
+    def __call__(self, text: str, stopwords: set[str]) -> list[str]:
+        tokens = text.translate(_NORMALIZATION).split()
+        excluded: Collection[str] = self._stopwords
+        if stopwords:
+            # Only a pipeline with stopwords of its own pays for a merged set.
+            excluded = self._stopwords.union(stopwords) if self._stopwords else stopwords
+        stem = self._stemmer
+        if stem is None:
+            return [token for token in tokens if token not in excluded]
+        return [stem(token) for token in tokens if token not in excluded]
 
 
 def tokenize(text: str, stopwords: set[str]) -> list[str]:
+    return _tokenize(text, stopwords, _stem)
+
+
+def tokenize_builtin(text: str, stopwords: set[str]) -> list[str]:
+    """Tokenize like ``tokenize`` with the dependency-free stemmer, which gives the same stems."""
+    return _tokenize(text, stopwords, _builtin_stem)
+
+
+TOKENIZERS: dict[str, Callable[[str, set[str]], list[str]]] = {
+    "nltk": tokenize,
+    "builtin": tokenize_builtin,
+}
+
+
+def _tokenize(text: str, stopwords: set[str], stem: Callable[[str], str]) -> list[str]:
     tokens = text.lower().translate(_TRANSLATOR).split()
-    return [_STEMMER.stem(token) for token in tokens if token not in stopwords]
+    return [stem(token) for token in tokens if token not in stopwords]
+
+
+def stem_cache_info() -> dict[str, int]:
+    """Return hits, misses and size summed over both stemmers, and the bound on each."""
+    infos = [_stem.cache_info(), _builtin_stem.cache_info()]
+    return {
+        "hits": sum(info.hits for info in infos),
+        "misses": sum(info.misses for info in infos),
+        "size": sum(info.currsize for info in infos),
+        "max_size": max(info.maxsize or 0 for info in infos),
+    }
+
+
+def clear_stem_cache() -> None:
+    _stem.cache_clear()
+    _builtin_stem.cache_clear()
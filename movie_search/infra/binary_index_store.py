@@ -0,0 +1,93 @@
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.infra.index_format import (
+    HAS_IMPACTS,
+    HAS_POSITIONS,
+    header_statistics,
+    read_doc_table,
+    read_header,
+    read_impacts,
+    read_positions,
+    read_postings,
+    read_term,
+    read_term_entry,
+    read_term_statistics,
+    write_index,
+)
+from movie_search.infra.index_store import StoredIndex
+from movie_search.infra.versions import FileVersion, file_version
+from movie_search.search.bm25 import IndexStatistics, TermStatistics
+from movie_search.search.postings import ImpactPostings, PositionList, PostingList
+
+
+class BinaryIndexStore:
+    """Index cache in the compact binary format described in ``index_format``."""
+
+    def __init__(self, cache_dir: Path, filename: str = "index.bin") -> None:
+        self._cache_dir = cache_dir
+        self._path = cache_dir / filename
+
+    def version(self) -> FileVersion | None:
+        return file_version(self._path)
+
+    def save(
+        self,
+        index: Mapping[str, PostingList],
+        docmap: Mapping[int, int],
+        average_document_length: float,
+        fingerprints: Mapping[int, int],
+        statistics: IndexStatistics | None = None,
+        positions: Mapping[str, PositionList] | None = None,
+    ) -> None:
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            write_index(
+                self._path,
+                index,
+                docmap,
+                average_document_length,
+                fingerprints,
+                statistics,
+                positions,
+            )
+        except (OSError, OverflowError, struct.error) as exc:
+            raise IndexStoreError(f"Unable to persist index cache at {self._cache_dir}") from exc
+
+    def load(self) -> StoredIndex:
+        try:
+            buffer = self._path.read_bytes()
+        except FileNotFoundError as exc:
+            raise IndexStoreError(f"Index cache not found in {self._cache_dir}") from exc
+        except OSError as exc:
+            raise IndexStoreError(f"Unable to load index cache from {self._cache_dir}") from exc
+
+        try:
+            header = read_header(buffer)
+            docmap, fingerprints = read_doc_table(buffer, header)
+            index: dict[str, PostingList] = {}
+            terms: dict[str, TermStatistics] = {}
+            impacts: dict[str, ImpactPostings] = {}
+            positions: dict[str, PositionList] = {}
+            for position in range(header.term_count):
+                entry = read_term_entry(buffer, header, position)
+                term = read_term(buffer, header, entry).decode("utf-8")
+                index[term] = read_postings(buffer, header, entry)
+                terms[term] = read_term_statistics(entry)
+                if header.flags & HAS_IMPACTS:
+                    impacts[term] = read_impacts(buffer, header, entry)
+                if header.flags & HAS_POSITIONS:
+                    positions[term] = read_positions(buffer, header, entry, index[term].doc_ids)
+        except (struct.error, UnicodeDecodeError) as exc:
+            raise IndexStoreError(f"Cached index file is corrupt: {self._path}") from exc
+
+        return StoredIndex(
+            index=index,
+            docmap=docmap,
+            average_document_length=header.average_document_length,
+            fingerprints=fingerprints,
+            statistics=header_statistics(header, terms, impacts),
+            positions=positions if header.flags & HAS_POSITIONS else None,
+        )
@@ -0,0 +1,201 @@
+"""Movie records stored apart from the index and read one at a time.
+
+The file is a fixed header, the records in catalog order, and a table of
+``(doc_id, record_offset)`` rows sorted by doc ID::
+
+    header | records | offset table
+
+Each record is ``(doc_id, title_length, description_length)`` followed by the
+UTF-8 title and description, so a movie is decoded from a single binary search
+and one slice of the mapped file.
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+
+from movie_search.domain.exceptions import DataFormatError, IndexStoreError
+from movie_search.domain.models import Movie
+
+MAGIC = b"MSDS"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHxxIQ")
+RECORD = struct.Struct("<III")
+OFFSET_ENTRY = struct.Struct("<IQ")
+
+
+class MappedDocuments(Mapping[int, Movie]):
+    """Movies of a memory-mapped document file, iterated in catalog order."""
+
+    def __init__(self, buffer: mmap.mmap, count: int, table_offset: int) -> None:
+        self._buffer = buffer
+        self._count = count
+        self._table_offset = table_offset
+
+    def __getitem__(self, doc_id: int) -> Movie:
+        offset = self._find(doc_id)
+        if offset is None:
+            raise KeyError(doc_id)
+        return self._read(offset)[0]
+
+    def __contains__(self, doc_id: object) -> bool:
+        return isinstance(doc_id, int) and self._find(doc_id) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        offset = HEADER.size
+        while offset < self._table_offset:
+            movie, end = self._read(offset)
+            # A repeated movie ID leaves an earlier record the table no longer points to.
+            if self._find(movie.id) == offset:
+                yield movie.id
+            offset = end
+
+    def records(self) -> Iterator[tuple[int, bytes]]:
+        """Yield the live ``(doc_id, encoded_record)`` pairs in file order."""
+        offset = HEADER.size
+        while offset < self._table_offset:
+            doc_id, title_length, description_length = RECORD.unpack_from(self._buffer, offset)
+            end = offset + RECORD.size + title_length + description_length
+            if self._find(doc_id) == offset:
+                yield doc_id, bytes(self._buffer[offset:end])
+            offset = end
+
+    def _find(self, doc_id: int) -> int | None:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            candidate, offset = OFFSET_ENTRY.unpack_from(
+                self._buffer, self._table_offset + middle * OFFSET_ENTRY.size
+            )
+            if candidate < doc_id:
+                low = middle + 1
+            elif candidate > doc_id:
+                high = middle
+            else:
+                return int(offset)
+        return None
+
+    def _read(self, offset: int) -> tuple[Movie, int]:
+        doc_id, title_length, description_length = RECORD.unpack_from(self._buffer, offset)
+        title_start = offset + RECORD.size
+        description_start = title_start + title_length
+        end = description_start + description_length
+        if end > self._table_offset:
+            raise IndexStoreError("Cached document record is truncated.")
+        try:
+            movie = Movie(
+                doc_id,
+                self._buffer[title_start:description_start].decode("utf-8"),
+                self._buffer[description_start:end].decode("utf-8"),
+            )
+        except UnicodeDecodeError as exc:
+            raise IndexStoreError("Cached document record is corrupt.") from exc
+        return movie, end
+
+
+class BinaryDocumentStore:
+    """Movie records in one file with an ID-sorted offset table, read on demand.
+
+    Loading maps the file without decoding it, so searches only materialize
+    the movies they return.
+    """
+
+    def __init__(self, cache_dir: Path, filename: str = "documents.bin") -> None:
+        self._cache_dir = cache_dir
+        self._path = cache_dir / filename
+
+    def save(self, movies: Iterable[Movie]) -> None:
+        with self.writer() as add:
+            for movie in movies:
+                add(movie)
+
+    @contextmanager
+    def writer(self) -> Iterator[Callable[[Movie], None]]:
+        """Stream movies into a new document file that replaces the old one on exit."""
+        with self._writing() as write:
+            yield lambda movie: write(movie.id, _encode(movie))
+
+    def update(self, upserts: Iterable[Movie], deleted: Iterable[int]) -> None:
+        """Rewrite the file with ``upserts`` applied in place and ``deleted`` removed.
+
+        Unchanged records are copied as raw bytes; new movies are appended.
+        """
+        replacements = {movie.id: movie for movie in upserts}
+        removed = set(deleted) - replacements.keys()
+        current = self.load()
+        with self._writing() as write:
+            for doc_id, record in current.records():
+                if doc_id in removed:
+                    continue
+                movie = replacements.pop(doc_id, None)
+                write(doc_id, record if movie is None else _encode(movie))
+            for movie in replacements.values():
+                write(movie.id, _encode(movie))
+
+    def load(self) -> MappedDocuments:
+        try:
+            with self._path.open("rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError as exc:
+            raise IndexStoreError(f"Document store not found in {self._cache_dir}") from exc
+        except (OSError, ValueError) as exc:
+            raise IndexStoreError(f"Unable to load document store from {self._cache_dir}") from exc
+
+        try:
+            magic, version, count, table_offset = HEADER.unpack_from(buffer, 0)
+        except struct.error as exc:
+            buffer.close()
+            raise IndexStoreError("Cached document file is truncated.") from exc
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or table_offset + count * OFFSET_ENTRY.size != len(buffer)
+        ):
+            buffer.close()
+            raise IndexStoreError(f"Cached document file has an unknown format: {self._path}")
+        return MappedDocuments(buffer, count, table_offset)
+
+    @contextmanager
+    def _writing(self) -> Iterator[Callable[[int, bytes], None]]:
+        offsets: dict[int, int] = {}
+        temporary_path = self._path.with_name(f"{self._path.name}.tmp")
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            with temporary_path.open("wb") as file:
+                file.write(bytes(HEADER.size))
+                position = HEADER.size
+
+                def write(doc_id: int, record: bytes) -> None:
+                    nonlocal position
+                    offsets[doc_id] = position
+                    file.write(record)
+                    position += len(record)
+
+                yield write
+                table = bytearray()
+                for doc_id, offset in sorted(offsets.items()):
+                    table += OFFSET_ENTRY.pack(doc_id, offset)
+                file.write(table)
+                file.seek(0)
+                file.write(HEADER.pack(MAGIC, VERSION, len(offsets), position))
+            os.replace(temporary_path, self._path)
+        except OSError as exc:
+            raise IndexStoreError(f"Unable to persist document store at {self._cache_dir}") from exc
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+
+def _encode(movie: Movie) -> bytes:
+    title = movie.title.encode("utf-8")
+    description = movie.description.encode("utf-8")
+    try:
+        return RECORD.pack(movie.id, len(title), len(description)) + title + description
+    except struct.error as exc:
+        raise DataFormatError("Movie IDs must be non-negative 32-bit integers.") from exc
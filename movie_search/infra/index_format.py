@@ -0,0 +1,389 @@
+"""Binary layout shared by the on-disk index stores.
+
+A file is a fixed header followed by four sections::
+
+    header | doc table | term table | term strings | postings
+
+The doc table holds fixed-width ``(doc_id, length, fingerprint)`` rows sorted by
+doc ID and
+the term table holds fixed-width rows sorted by the UTF-8 bytes of each term,
+so both can be binary searched in place. Each posting list stores delta-encoded
+doc IDs followed by term frequencies, each packed at the narrowest unsigned
+width (1, 2 or 4 bytes) that fits the list.
+
+When the header's statistics flag is set, each term row also carries its BM25
+IDF and maximum per-document score for the ``k1`` and ``b`` in the header.
+With the impacts flag, each posting list is followed by the same postings in
+score order: doc IDs (not delta-encoded), term frequencies and one quantized
+impact byte per posting. With the positions flag, each term then stores the end
+offset of every posting's encoded positions, packed like the frequencies, and
+the varint-encoded position gaps themselves.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import accumulate, chain
+from pathlib import Path
+
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.search.bm25 import BM25Config, IndexStatistics, TermStatistics
+from movie_search.search.postings import (
+    DOC_ID_TYPECODE,
+    FREQUENCY_TYPECODE,
+    POSITION_OFFSET_TYPECODE,
+    ImpactPostings,
+    PositionList,
+    PostingList,
+)
+
+MAGIC = b"MSIX"
+VERSION = 5
+
+HEADER = struct.Struct("<4sHBxIIdddQQQQ")
+DOC_ENTRY = struct.Struct("<IIQ")
+TERM_ENTRY = struct.Struct("<QIIQBBBBddQQ")
+
+HAS_STATISTICS = 1
+HAS_IMPACTS = 2
+HAS_POSITIONS = 4
+
+IndexBuffer = bytes | memoryview | mmap.mmap
+
+_WIDTH_TYPECODES = {1: "B", 2: "H", 4: "I"}
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+@dataclass(frozen=True, slots=True)
+class IndexHeader:
+    flags: int
+    doc_count: int
+    term_count: int
+    average_document_length: float
+    k1: float
+    b: float
+    doc_table_offset: int
+    term_table_offset: int
+    terms_offset: int
+    postings_offset: int
+
+    def statistics_config(self) -> BM25Config | None:
+        return BM25Config(k1=self.k1, b=self.b) if self.flags & HAS_STATISTICS else None
+
+
+@dataclass(frozen=True, slots=True)
+class TermEntry:
+    term_offset: int
+    term_length: int
+    doc_freq: int
+    postings_offset: int
+    doc_width: int
+    frequency_width: int
+    impact_doc_width: int
+    positions_width: int
+    idf: float
+    max_score: float
+    impact_offset: int
+    positions_offset: int
+
+
+def write_index(
+    path: Path,
+    index: Mapping[str, PostingList],
+    docmap: Mapping[int, int],
+    average_document_length: float,
+    fingerprints: Mapping[int, int],
+    statistics: IndexStatistics | None = None,
+    positions: Mapping[str, PositionList] | None = None,
+) -> None:
+    """Write an index file, including ``statistics`` if they describe this index.
+
+    ``positions`` are written only if they cover every posting.
+    """
+    encoded_terms = sorted(
+        (token.encode("utf-8"), token, postings) for token, postings in index.items()
+    )
+    doc_rows = sorted(docmap.items())
+    if statistics is not None and not (
+        statistics.document_count == len(doc_rows)
+        and statistics.average_document_length == average_document_length
+        and all(token in statistics.terms for _, token, _ in encoded_terms)
+        and (
+            statistics.impacts is None
+            or all(token in statistics.impacts for _, token, _ in encoded_terms)
+        )
+    ):
+        statistics = None
+    impacts = statistics.impacts if statistics is not None else None
+    if positions is not None and not all(
+        token in positions and len(positions[token]) == len(postings)
+        for _, token, postings in encoded_terms
+    ):
+        positions = None
+
+    doc_table_offset = HEADER.size
+    term_table_offset = doc_table_offset + DOC_ENTRY.size * len(doc_rows)
+    terms_offset = term_table_offset + TERM_ENTRY.size * len(encoded_terms)
+    postings_offset = terms_offset + sum(len(term) for term, _, _ in encoded_terms)
+
+    term_table = bytearray()
+    term_blob = bytearray()
+    postings_blob = bytearray()
+    for term, token, postings in encoded_terms:
+        deltas = _deltas(postings.doc_ids)
+        doc_width = _width(max(deltas, default=0))
+        frequency_width = _width(max(postings.frequencies, default=0))
+        term_statistics = statistics.terms[token] if statistics is not None else _NO_STATISTICS
+        postings_start = len(postings_blob)
+        postings_blob += _pack(deltas, doc_width)
+        postings_blob += _pack(postings.frequencies, frequency_width)
+        impact_offset = len(postings_blob)
+        impact_doc_width = 0
+        if impacts is not None:
+            ordered = impacts[token]
+            impact_doc_width = _width(max(ordered.doc_ids, default=0))
+            postings_blob += _pack(ordered.doc_ids, impact_doc_width)
+            postings_blob += _pack(ordered.frequencies, frequency_width)
+            postings_blob += _pack(ordered.impacts, 1)
+        positions_offset = len(postings_blob)
+        positions_width = 0
+        if positions is not None:
+            token_positions = positions[token]
+            ends = token_positions.offsets[1:]
+            positions_width = _width(max(ends, default=0))
+            postings_blob += _pack(ends, positions_width)
+            postings_blob += token_positions.data
+        term_table += TERM_ENTRY.pack(
+            len(term_blob),
+            len(term),
+            len(postings),
+            postings_start,
+            doc_width,
+            frequency_width,
+            impact_doc_width,
+            positions_width,
+            term_statistics.idf,
+            term_statistics.max_score,
+            impact_offset,
+            positions_offset,
+        )
+        term_blob += term
+
+    config = statistics.config if statistics is not None else _NO_CONFIG
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        (HAS_STATISTICS if statistics is not None else 0)
+        | (HAS_IMPACTS if impacts is not None else 0)
+        | (HAS_POSITIONS if positions is not None else 0),
+        len(doc_rows),
+        len(encoded_terms),
+        average_document_length,
+        config.k1,
+        config.b,
+        doc_table_offset,
+        term_table_offset,
+        terms_offset,
+        postings_offset,
+    )
+
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    with temporary_path.open("wb") as file:
+        file.write(header)
+        for doc_id, length in doc_rows:
+            file.write(DOC_ENTRY.pack(doc_id, length, fingerprints.get(doc_id, 0)))
+        file.write(term_table)
+        file.write(term_blob)
+        file.write(postings_blob)
+    os.replace(temporary_path, path)
+
+
+def read_header(buffer: IndexBuffer) -> IndexHeader:
+    try:
+        magic, version, *fields = HEADER.unpack_from(buffer, 0)
+    except struct.error as exc:
+        raise IndexStoreError("Cached index file is truncated.") from exc
+    if magic != MAGIC:
+        raise IndexStoreError("Cached index file has an unknown format.")
+    if version != VERSION:
+        raise IndexStoreError(f"Unsupported cached index version {version}.")
+    header = IndexHeader(*fields)
+    expected_terms_offset = header.term_table_offset + TERM_ENTRY.size * header.term_count
+    if (
+        header.doc_table_offset != HEADER.size
+        or header.term_table_offset != HEADER.size + DOC_ENTRY.size * header.doc_count
+        or header.terms_offset != expected_terms_offset
+        or header.postings_offset < header.terms_offset
+        or header.postings_offset > len(buffer)
+    ):
+        raise IndexStoreError("Cached index file has an inconsistent layout.")
+    return header
+
+
+def read_doc_table(
+    buffer: IndexBuffer, header: IndexHeader
+) -> tuple[dict[int, int], dict[int, int]]:
+    """Return the ``doc_id -> length`` and ``doc_id -> fingerprint`` columns."""
+    docmap: dict[int, int] = {}
+    fingerprints: dict[int, int] = {}
+    rows = buffer[header.doc_table_offset : header.term_table_offset]
+    for doc_id, length, fingerprint in DOC_ENTRY.iter_unpack(rows):
+        docmap[doc_id] = length
+        fingerprints[doc_id] = fingerprint
+    return docmap, fingerprints
+
+
+def read_doc_entry(buffer: IndexBuffer, header: IndexHeader, position: int) -> tuple[int, int, int]:
+    doc_id, length, fingerprint = DOC_ENTRY.unpack_from(
+        buffer, header.doc_table_offset + position * DOC_ENTRY.size
+    )
+    return doc_id, length, fingerprint
+
+
+def find_doc(buffer: IndexBuffer, header: IndexHeader, doc_id: int) -> int | None:
+    """Binary search the doc table, returning the row position of ``doc_id``."""
+    low, high = 0, header.doc_count
+    while low < high:
+        middle = (low + high) // 2
+        candidate = DOC_ENTRY.unpack_from(
+            buffer, header.doc_table_offset + middle * DOC_ENTRY.size
+        )[0]
+        if candidate < doc_id:
+            low = middle + 1
+        elif candidate > doc_id:
+            high = middle
+        else:
+            return middle
+    return None
+
+
+def read_term_entry(buffer: IndexBuffer, header: IndexHeader, position: int) -> TermEntry:
+    return TermEntry(
+        *TERM_ENTRY.unpack_from(buffer, header.term_table_offset + position * TERM_ENTRY.size)
+    )
+
+
+def read_term(buffer: IndexBuffer, header: IndexHeader, entry: TermEntry) -> bytes:
+    start = header.terms_offset + entry.term_offset
+    return bytes(buffer[start : start + entry.term_length])
+
+
+def read_postings(buffer: IndexBuffer, header: IndexHeader, entry: TermEntry) -> PostingList:
+    start = header.postings_offset + entry.postings_offset
+    middle = start + entry.doc_freq * entry.doc_width
+    end = middle + entry.doc_freq * entry.frequency_width
+    if end > len(buffer):
+        raise IndexStoreError("Cached index postings are truncated.")
+    deltas = _unpack(buffer[start:middle], entry.doc_width)
+    frequencies = _unpack(buffer[middle:end], entry.frequency_width)
+    return PostingList(
+        doc_ids=array(DOC_ID_TYPECODE, accumulate(deltas)),
+        frequencies=(
+            frequencies
+            if frequencies.typecode == FREQUENCY_TYPECODE
+            else array(FREQUENCY_TYPECODE, frequencies)
+        ),
+    )
+
+
+def read_impacts(buffer: IndexBuffer, header: IndexHeader, entry: TermEntry) -> ImpactPostings:
+    start = header.postings_offset + entry.impact_offset
+    frequencies_start = start + entry.doc_freq * entry.impact_doc_width
+    impacts_start = frequencies_start + entry.doc_freq * entry.frequency_width
+    end = impacts_start + entry.doc_freq
+    if end > len(buffer):
+        raise IndexStoreError("Cached index impacts are truncated.")
+    doc_ids = _unpack(buffer[start:frequencies_start], entry.impact_doc_width)
+    frequencies = _unpack(buffer[frequencies_start:impacts_start], entry.frequency_width)
+    return ImpactPostings(
+        doc_ids=doc_ids if doc_ids.typecode == DOC_ID_TYPECODE else array(DOC_ID_TYPECODE, doc_ids),
+        frequencies=(
+            frequencies
+            if frequencies.typecode == FREQUENCY_TYPECODE
+            else array(FREQUENCY_TYPECODE, frequencies)
+        ),
+        impacts=_unpack(buffer[impacts_start:end], 1),
+    )
+
+
+def read_positions(
+    buffer: IndexBuffer, header: IndexHeader, entry: TermEntry, doc_ids: array[int]
+) -> PositionList:
+    """Return a term's positions for its postings' ``doc_ids``, without decoding them."""
+    start = header.postings_offset + entry.positions_offset
+    data_start = start + entry.doc_freq * entry.positions_width
+    if data_start > len(buffer):
+        raise IndexStoreError("Cached index positions are truncated.")
+    offsets = array(
+        POSITION_OFFSET_TYPECODE,
+        chain((0,), _unpack(buffer[start:data_start], entry.positions_width)),
+    )
+    end = data_start + offsets[-1]
+    if end > len(buffer) or len(doc_ids) != entry.doc_freq:
+        raise IndexStoreError("Cached index positions are truncated.")
+    return PositionList(doc_ids=doc_ids, offsets=offsets, data=bytes(buffer[data_start:end]))
+
+
+def read_term_statistics(entry: TermEntry) -> TermStatistics:
+    return TermStatistics(idf=entry.idf, max_score=entry.max_score)
+
+
+def header_statistics(
+    header: IndexHeader,
+    terms: Mapping[str, TermStatistics],
+    impacts: Mapping[str, ImpactPostings],
+) -> IndexStatistics | None:
+    """Return the statistics stored with an index, or ``None`` if it has none."""
+    config = header.statistics_config()
+    if config is None:
+        return None
+    return IndexStatistics(
+        config,
+        header.doc_count,
+        header.average_document_length,
+        terms,
+        impacts if header.flags & HAS_IMPACTS else None,
+    )
+
+
+_NO_STATISTICS = TermStatistics(idf=0.0, max_score=0.0)
+_NO_CONFIG = BM25Config(k1=0.0, b=0.0)
+
+
+def _deltas(doc_ids: array[int]) -> list[int]:
+    previous = 0
+    deltas: list[int] = []
+    for doc_id in doc_ids:
+        deltas.append(doc_id - previous)
+        previous = doc_id
+    return deltas
+
+
+def _width(value: int) -> int:
+    if value < 1 << 8:
+        return 1
+    if value < 1 << 16:
+        return 2
+    return 4
+
+
+def _pack(values: list[int] | array[int], width: int) -> bytes:
+    packed = array(_WIDTH_TYPECODES[width], values)
+    if _BIG_ENDIAN:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(data: bytes | memoryview, width: int) -> array[int]:
+    typecode = _WIDTH_TYPECODES.get(width)
+    if typecode is None:
+        raise IndexStoreError(f"Cached index postings use an invalid width {width}.")
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
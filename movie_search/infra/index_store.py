@@ -1,15 +1,37 @@
 import pickle
+from array import array
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 from movie_search.domain.exceptions import IndexStoreError
+from movie_search.infra.versions import FileVersion, file_version
+from movie_search.search.bm25 import BM25Config, IndexStatistics, TermStatistics
+from movie_search.search.postings import (
+    DOC_ID_TYPECODE,
+    FREQUENCY_TYPECODE,
+    IMPACT_TYPECODE,
+    ImpactPostings,
+    PositionList,
+    PostingList,
+    decode_positions,
+    encode_positions,
+)
+from movie_search.search.segments import Segment
 
 
 @dataclass(frozen=True, slots=True)
 class StoredIndex:
-    index: dict[str, list[int]]
-    docmap: dict[int, str]
+    index: Mapping[str, PostingList]
+    docmap: Mapping[int, int]
+    average_document_length: float
+    fingerprints: Mapping[int, int]
+    segments: tuple[Segment, ...] | None = None
+    statistics: IndexStatistics | None = None
+    positions: Mapping[str, PositionList] | None = None
+    # Live terms of ``segments``, or a function that counts them on first use.
+    term_count: int | Callable[[], int] | None = None
 
 
 class PickleIndexStore:
@@ -18,24 +40,80 @@ class PickleIndexStore:
         cache_dir: Path,
         index_filename: str = "index.pkl",
         docmap_filename: str = "docmap.pkl",
+        corpus_filename: str = "corpus.pkl",
     ) -> None:
         self._cache_dir = cache_dir
         self._index_path = cache_dir / index_filename
         self._docmap_path = cache_dir / docmap_filename
+        self._corpus_path = cache_dir / corpus_filename
 
-    def save(self, index: dict[str, set[int]], docmap: dict[int, str]) -> None:
+    def version(self) -> tuple[FileVersion | None, ...]:
+        return tuple(
+            file_version(path) for path in (self._index_path, self._docmap_path, self._corpus_path)
+        )
+
+    def save(
+        self,
+        index: Mapping[str, PostingList],
+        docmap: Mapping[int, int],
+        average_document_length: float,
+        fingerprints: Mapping[int, int],
+        statistics: IndexStatistics | None = None,
+        positions: Mapping[str, PositionList] | None = None,
+    ) -> None:
         self._cache_dir.mkdir(parents=True, exist_ok=True)
         normalized_index = {
-            token: sorted(doc_ids)
-            for token, doc_ids in sorted(index.items(), key=lambda item: item[0])
+            token: postings.to_dict()
+            for token, postings in sorted(index.items(), key=lambda item: item[0])
         }
         normalized_docmap = dict(sorted(docmap.items(), key=lambda item: item[0]))
+        corpus = {
+            "document_count": len(docmap),
+            "average_document_length": average_document_length,
+            "fingerprints": dict(sorted(fingerprints.items(), key=lambda item: item[0])),
+            "statistics": (
+                {
+                    "k1": statistics.config.k1,
+                    "b": statistics.config.b,
+                    "document_count": statistics.document_count,
+                    "average_document_length": statistics.average_document_length,
+                    "terms": {
+                        token: (term.idf, term.max_score)
+                        for token, term in sorted(statistics.terms.items())
+                    },
+                    "impacts": (
+                        {
+                            token: (
+                                postings.doc_ids.tolist(),
+                                postings.frequencies.tolist(),
+                                postings.impacts.tobytes(),
+                            )
+                            for token, postings in sorted(statistics.impacts.items())
+                        }
+                        if statistics.impacts is not None
+                        else None
+                    ),
+                }
+                if statistics is not None
+                else None
+            ),
+            "positions": (
+                {
+                    token: {doc_id: decode_positions(run) for doc_id, run in token_positions.runs()}
+                    for token, token_positions in sorted(positions.items())
+                }
+                if positions is not None
+                else None
+            ),
+        }
 
         try:
             with self._index_path.open("wb") as index_file:
                 pickle.dump(normalized_index, index_file, protocol=pickle.HIGHEST_PROTOCOL)
             with self._docmap_path.open("wb") as docmap_file:
                 pickle.dump(normalized_docmap, docmap_file, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._corpus_path.open("wb") as corpus_file:
+                pickle.dump(corpus, corpus_file, protocol=pickle.HIGHEST_PROTOCOL)
         except (OSError, pickle.PickleError) as exc:
             raise IndexStoreError(f"Unable to persist index cache at {self._cache_dir}") from exc
 
@@ -45,38 +123,154 @@ class PickleIndexStore:
                 raw_index = pickle.load(index_file)
             with self._docmap_path.open("rb") as docmap_file:
                 raw_docmap = pickle.load(docmap_file)
+            with self._corpus_path.open("rb") as corpus_file:
+                raw_corpus = pickle.load(corpus_file)
         except FileNotFoundError as exc:
             raise IndexStoreError(f"Index cache not found in {self._cache_dir}") from exc
         except (OSError, pickle.PickleError) as exc:
             raise IndexStoreError(f"Unable to load index cache from {self._cache_dir}") from exc
 
+        docmap = self._validate_docmap(raw_docmap)
+        average_document_length, fingerprints = self._validate_corpus(raw_corpus, docmap)
         return StoredIndex(
             index=self._validate_index(raw_index),
-            docmap=self._validate_docmap(raw_docmap),
+            docmap=docmap,
+            average_document_length=average_document_length,
+            fingerprints=fingerprints,
+            statistics=self._validate_statistics(raw_corpus.get("statistics")),
+            positions=self._validate_positions(raw_corpus.get("positions")),
         )
 
-    def _validate_index(self, value: Any) -> dict[str, list[int]]:
+    def _validate_index(self, value: Any) -> dict[str, PostingList]:
         if not isinstance(value, dict):
             raise IndexStoreError("Cached index payload must be a dictionary.")
-        validated: dict[str, list[int]] = {}
-        for token, doc_ids in value.items():
+        validated: dict[str, PostingList] = {}
+        for token, postings in value.items():
             if not isinstance(token, str):
                 raise IndexStoreError("Cached index token keys must be strings.")
-            if not isinstance(doc_ids, list) or not all(
-                isinstance(doc_id, int) for doc_id in doc_ids
+            if not isinstance(postings, dict) or not all(
+                isinstance(doc_id, int) and isinstance(frequency, int)
+                for doc_id, frequency in postings.items()
             ):
-                raise IndexStoreError("Cached index values must be lists of document IDs.")
-            validated[token] = sorted(set(doc_ids))
+                raise IndexStoreError(
+                    "Cached index values must map document IDs to term frequencies."
+                )
+            try:
+                validated[token] = PostingList.from_pairs(postings.items())
+            except OverflowError as exc:
+                raise IndexStoreError("Cached index document IDs are out of range.") from exc
         return validated
 
-    def _validate_docmap(self, value: Any) -> dict[int, str]:
+    def _validate_docmap(self, value: Any) -> dict[int, int]:
         if not isinstance(value, dict):
             raise IndexStoreError("Cached docmap payload must be a dictionary.")
-        validated: dict[int, str] = {}
-        for doc_id, content in value.items():
+        validated: dict[int, int] = {}
+        for doc_id, length in value.items():
             if not isinstance(doc_id, int):
                 raise IndexStoreError("Cached docmap keys must be integer document IDs.")
-            if not isinstance(content, str):
-                raise IndexStoreError("Cached docmap values must be strings.")
-            validated[doc_id] = content
+            if not isinstance(length, int) or length < 0:
+                raise IndexStoreError("Cached docmap values must be document token lengths.")
+            validated[doc_id] = length
         return dict(sorted(validated.items(), key=lambda item: item[0]))
+
+    def _validate_corpus(self, value: Any, docmap: dict[int, int]) -> tuple[float, dict[int, int]]:
+        if not isinstance(value, dict):
+            raise IndexStoreError("Cached corpus statistics payload must be a dictionary.")
+        if value.get("document_count") != len(docmap):
+            raise IndexStoreError("Cached corpus statistics do not match the cached docmap.")
+        average = value.get("average_document_length")
+        if not isinstance(average, float | int):
+            raise IndexStoreError("Cached average document length must be a number.")
+        fingerprints = value.get("fingerprints", {})
+        if not isinstance(fingerprints, dict) or not all(
+            isinstance(doc_id, int) and isinstance(fingerprint, int)
+            for doc_id, fingerprint in fingerprints.items()
+        ):
+            raise IndexStoreError("Cached fingerprints must map document IDs to integers.")
+        return float(average), fingerprints
+
+    def _validate_statistics(self, value: Any) -> IndexStatistics | None:
+        if value is None:
+            return None
+        if (
+            not isinstance(value, dict)
+            or not isinstance(value.get("k1"), float | int)
+            or not isinstance(value.get("b"), float | int)
+            or not isinstance(value.get("document_count"), int)
+            or not isinstance(value.get("average_document_length"), float | int)
+            or not isinstance(value.get("terms"), dict)
+        ):
+            raise IndexStoreError("Cached BM25 statistics payload is malformed.")
+        terms: dict[str, TermStatistics] = {}
+        for token, term in value["terms"].items():
+            if (
+                not isinstance(token, str)
+                or not isinstance(term, tuple)
+                or len(term) != 2
+                or not all(isinstance(number, float) for number in term)
+            ):
+                raise IndexStoreError("Cached BM25 term statistics are malformed.")
+            terms[token] = TermStatistics(idf=term[0], max_score=term[1])
+        return IndexStatistics(
+            config=BM25Config(k1=value["k1"], b=value["b"]),
+            document_count=value["document_count"],
+            average_document_length=float(value["average_document_length"]),
+            terms=terms,
+            impacts=self._validate_impacts(value.get("impacts")),
+        )
+
+    def _validate_impacts(self, value: Any) -> dict[str, ImpactPostings] | None:
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            raise IndexStoreError("Cached impact-ordered postings are malformed.")
+        impacts: dict[str, ImpactPostings] = {}
+        for token, entry in value.items():
+            if (
+                not isinstance(token, str)
+                or not isinstance(entry, tuple)
+                or len(entry) != 3
+                or not isinstance(entry[0], list)
+                or not isinstance(entry[1], list)
+                or not isinstance(entry[2], bytes)
+                or not len(entry[0]) == len(entry[1]) == len(entry[2])
+            ):
+                raise IndexStoreError("Cached impact-ordered postings are malformed.")
+            try:
+                impacts[token] = ImpactPostings(
+                    doc_ids=array(DOC_ID_TYPECODE, entry[0]),
+                    frequencies=array(FREQUENCY_TYPECODE, entry[1]),
+                    impacts=array(IMPACT_TYPECODE, entry[2]),
+                )
+            except (OverflowError, TypeError) as exc:
+                raise IndexStoreError("Cached impact-ordered postings are malformed.") from exc
+        return impacts
+
+    def _validate_positions(self, value: Any) -> dict[str, PositionList] | None:
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            raise IndexStoreError("Cached token positions are malformed.")
+        positions: dict[str, PositionList] = {}
+        for token, by_document in value.items():
+            if (
+                not isinstance(token, str)
+                or not isinstance(by_document, dict)
+                or not all(
+                    isinstance(doc_id, int)
+                    and isinstance(document_positions, list)
+                    and all(isinstance(position, int) for position in document_positions)
+                    and document_positions == sorted(set(document_positions))
+                    and (not document_positions or document_positions[0] >= 0)
+                    for doc_id, document_positions in by_document.items()
+                )
+            ):
+                raise IndexStoreError("Cached token positions are malformed.")
+            try:
+                positions[token] = PositionList.from_runs(
+                    (doc_id, encode_positions(document_positions))
+                    for doc_id, document_positions in by_document.items()
+                )
+            except OverflowError as exc:
+                raise IndexStoreError("Cached index document IDs are out of range.") from exc
+        return positions
@@ -1,15 +1,25 @@
 import json
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 from movie_search.domain.exceptions import DataAccessError, DataFormatError
 from movie_search.domain.models import Movie
+from movie_search.infra.versions import FileVersion, file_version
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+# Characters that may follow a complete value; anything else may continue it.
+_DELIMITERS = frozenset(_WHITESPACE + ",]}:")
 
 
 class JsonMovieRepository:
     def __init__(self, path: Path) -> None:
         self._path = path
 
+    def version(self) -> FileVersion | None:
+        return file_version(self._path)
+
     def load_movies(self) -> list[Movie]:
         payload = self._read_payload()
         movies_raw = payload.get("movies", [])
@@ -19,6 +29,20 @@ class JsonMovieRepository:
             )
         return [Movie.from_mapping(item) for item in movies_raw if isinstance(item, dict)]
 
+    def iter_movies(self) -> Iterator[Movie]:
+        """Yield movies from ``{"movies": [...]}`` while reading the file in chunks.
+
+        Only one movie entry is decoded at a time, so memory stays bounded by the
+        largest entry rather than the whole catalog.
+        """
+        try:
+            with self._path.open("r", encoding="utf-8") as file:
+                yield from _StreamingMoviesParser(file, self._path).movies()
+        except FileNotFoundError as exc:
+            raise DataAccessError(f"Movies file not found: {self._path}") from exc
+        except OSError as exc:
+            raise DataAccessError(f"Unable to read movies file: {self._path}") from exc
+
     def _read_payload(self) -> dict[str, Any]:
         try:
             with self._path.open("r", encoding="utf-8") as file:
@@ -35,3 +59,142 @@ class JsonMovieRepository:
                 f"Expected movies payload to be an object, got {type(payload).__name__}."
             )
         return payload
+
+
+class JsonLinesMovieRepository:
+    """Movies stored one JSON object per line; blank and non-object lines are ignored."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def version(self) -> FileVersion | None:
+        return file_version(self._path)
+
+    def load_movies(self) -> list[Movie]:
+        return list(self.iter_movies())
+
+    def iter_movies(self) -> Iterator[Movie]:
+        try:
+            with self._path.open("r", encoding="utf-8") as file:
+                for line_number, line in enumerate(file, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        raise DataFormatError(
+                            f"Malformed JSON on line {line_number} of movies file: {self._path}"
+                        ) from exc
+                    if isinstance(item, dict):
+                        yield Movie.from_mapping(item)
+        except FileNotFoundError as exc:
+            raise DataAccessError(f"Movies file not found: {self._path}") from exc
+        except OSError as exc:
+            raise DataAccessError(f"Unable to read movies file: {self._path}") from exc
+
+
+class _StreamingMoviesParser:
+    def __init__(self, file: TextIO, path: Path) -> None:
+        self._file = file
+        self._path = path
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def movies(self) -> Iterator[Movie]:
+        first = self._peek()
+        if first != "{":
+            kind = "nothing" if first == "" else "a non-object value"
+            raise DataFormatError(f"Expected movies payload to be an object, got {kind}.")
+        self._position += 1
+
+        if self._peek() == "}":
+            self._position += 1
+        else:
+            while True:
+                key = self._decode_value()
+                if not isinstance(key, str):
+                    raise self._malformed()
+                self._expect(":")
+                if key == "movies" and self._peek() == "[":
+                    yield from self._movie_list()
+                else:
+                    value = self._decode_value()
+                    if key == "movies":
+                        raise DataFormatError(
+                            f"Expected 'movies' to be a list, got {type(value).__name__}."
+                        )
+                separator = self._peek()
+                self._position += 1
+                if separator == "}":
+                    break
+                if separator != ",":
+                    raise self._malformed()
+
+        if self._peek() != "":
+            raise self._malformed()
+
+    def _movie_list(self) -> Iterator[Movie]:
+        self._position += 1
+        if self._peek() == "]":
+            self._position += 1
+            return
+        while True:
+            item = self._decode_value()
+            if isinstance(item, dict):
+                yield Movie.from_mapping(item)
+            separator = self._peek()
+            self._position += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise self._malformed()
+
+    def _decode_value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                value, end = None, -1
+            # A value not followed by a delimiter may be cut off mid-token, e.g. a
+            # number the buffer ends inside, which decodes as a shorter number.
+            if end >= 0 and (self._eof or self._delimited(end)):
+                self._position = end
+                return value
+            if self._eof:
+                raise self._malformed()
+            self._fill()
+
+    def _delimited(self, end: int) -> bool:
+        return end < len(self._buffer) and self._buffer[end] in _DELIMITERS
+
+    def _expect(self, character: str) -> None:
+        if self._peek() != character:
+            raise self._malformed()
+        self._position += 1
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at end of file."""
+        while True:
+            while (
+                self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if self._eof:
+                return ""
+            self._fill()
+
+    def _fill(self) -> None:
+        chunk = self._file.read(_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+
+    def _malformed(self) -> DataFormatError:
+        return DataFormatError(f"Malformed JSON in movies file: {self._path}")
@@ -0,0 +1,170 @@
+import mmap
+from abc import abstractmethod
+from collections.abc import Collection, Iterator, Mapping
+from pathlib import Path
+
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.infra.binary_index_store import BinaryIndexStore
+from movie_search.infra.index_format import (
+    HAS_POSITIONS,
+    IndexHeader,
+    TermEntry,
+    find_doc,
+    header_statistics,
+    read_doc_entry,
+    read_header,
+    read_impacts,
+    read_positions,
+    read_postings,
+    read_term,
+    read_term_entry,
+    read_term_statistics,
+)
+from movie_search.infra.index_store import StoredIndex
+from movie_search.search.bm25 import IndexStatistics, TermStatistics
+from movie_search.search.postings import ImpactPostings, PositionList, PostingList
+
+
+class _MappedTermTable[V](Mapping[str, V]):
+    """Term dictionary that binary searches the mapped file on every access."""
+
+    def __init__(self, buffer: mmap.mmap, header: IndexHeader) -> None:
+        self._buffer = buffer
+        self._header = header
+
+    def __getitem__(self, token: str) -> V:
+        entry = self._find(token.encode("utf-8"))
+        if entry is None:
+            raise KeyError(token)
+        return self._value(entry)
+
+    def __contains__(self, token: object) -> bool:
+        return isinstance(token, str) and self._find(token.encode("utf-8")) is not None
+
+    def __len__(self) -> int:
+        return self._header.term_count
+
+    def __iter__(self) -> Iterator[str]:
+        for position in range(self._header.term_count):
+            entry = read_term_entry(self._buffer, self._header, position)
+            yield read_term(self._buffer, self._header, entry).decode("utf-8")
+
+    def _find(self, term: bytes) -> TermEntry | None:
+        low, high = 0, self._header.term_count
+        while low < high:
+            middle = (low + high) // 2
+            entry = read_term_entry(self._buffer, self._header, middle)
+            candidate = read_term(self._buffer, self._header, entry)
+            if candidate < term:
+                low = middle + 1
+            elif candidate > term:
+                high = middle
+            else:
+                return entry
+        return None
+
+    @abstractmethod
+    def _value(self, entry: TermEntry) -> V:
+        """Decode the value a term entry points to."""
+
+
+class MappedPostings(_MappedTermTable[PostingList]):
+    def _value(self, entry: TermEntry) -> PostingList:
+        return read_postings(self._buffer, self._header, entry)
+
+    def live_terms(self, deleted: Collection[int]) -> Iterator[str]:
+        """Yield the terms with a document outside ``deleted``.
+
+        Only postings no longer than ``deleted`` are decoded.
+        """
+        for position in range(self._header.term_count):
+            entry = read_term_entry(self._buffer, self._header, position)
+            if entry.doc_freq > len(deleted) or self._value(entry).without(deleted):
+                yield read_term(self._buffer, self._header, entry).decode("utf-8")
+
+
+class MappedTermStatistics(_MappedTermTable[TermStatistics]):
+    def _value(self, entry: TermEntry) -> TermStatistics:
+        return read_term_statistics(entry)
+
+
+class MappedImpacts(_MappedTermTable[ImpactPostings]):
+    def _value(self, entry: TermEntry) -> ImpactPostings:
+        return read_impacts(self._buffer, self._header, entry)
+
+
+class MappedPositions(_MappedTermTable[PositionList]):
+    def _value(self, entry: TermEntry) -> PositionList:
+        doc_ids = read_postings(self._buffer, self._header, entry).doc_ids
+        return read_positions(self._buffer, self._header, entry, doc_ids)
+
+
+def mapped_positions(buffer: mmap.mmap, header: IndexHeader) -> MappedPositions | None:
+    return MappedPositions(buffer, header) if header.flags & HAS_POSITIONS else None
+
+
+def mapped_statistics(buffer: mmap.mmap, header: IndexHeader) -> IndexStatistics | None:
+    return header_statistics(
+        header, MappedTermStatistics(buffer, header), MappedImpacts(buffer, header)
+    )
+
+
+class MappedDocColumn(Mapping[int, int]):
+    """One column of the mapped doc table, read by binary search on doc ID."""
+
+    LENGTH = 1
+    FINGERPRINT = 2
+
+    def __init__(self, buffer: mmap.mmap, header: IndexHeader, column: int) -> None:
+        self._buffer = buffer
+        self._header = header
+        self._column = column
+
+    def __getitem__(self, doc_id: int) -> int:
+        position = find_doc(self._buffer, self._header, doc_id)
+        if position is None:
+            raise KeyError(doc_id)
+        return read_doc_entry(self._buffer, self._header, position)[self._column]
+
+    def __len__(self) -> int:
+        return self._header.doc_count
+
+    def __iter__(self) -> Iterator[int]:
+        for position in range(self._header.doc_count):
+            yield read_doc_entry(self._buffer, self._header, position)[0]
+
+
+def map_index_file(path: Path) -> tuple[mmap.mmap, IndexHeader]:
+    """Memory-map an index file and validate its header."""
+    with path.open("rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return buffer, read_header(buffer)
+    except IndexStoreError:
+        buffer.close()
+        raise
+
+
+class MmapIndexStore(BinaryIndexStore):
+    """Binary index cache that is memory-mapped and decoded lazily on load.
+
+    Loading only validates the header, so it costs the same regardless of
+    index size; each posting list is decoded when a query first asks for it.
+    """
+
+    def load(self) -> StoredIndex:
+        try:
+            buffer, header = map_index_file(self._path)
+        except FileNotFoundError as exc:
+            raise IndexStoreError(f"Index cache not found in {self._cache_dir}") from exc
+        except (OSError, ValueError) as exc:
+            raise IndexStoreError(f"Unable to load index cache from {self._cache_dir}") from exc
+
+        return StoredIndex(
+            index=MappedPostings(buffer, header),
+            docmap=MappedDocColumn(buffer, header, MappedDocColumn.LENGTH),
+            average_document_length=header.average_document_length,
+            fingerprints=MappedDocColumn(buffer, header, MappedDocColumn.FINGERPRINT),
+            statistics=mapped_statistics(buffer, header),
+            positions=mapped_positions(buffer, header),
+        )
@@ -0,0 +1,440 @@
+"""Index cache split into immutable segments with tombstone bitmaps.
+
+The cache directory holds one binary index file per segment (see
+``index_format``), an optional tombstone bitmap per segment with one bit per
+row of its doc table, and ``manifest.json`` listing the live segments and
+how many distinct terms they hold, when updates could keep that count::
+
+    {"version": 1, "next_segment": 4, "average_document_length": 9.5, "terms": 812,
+     "segments": [{"name": "seg-000001", "documents": 120, "deleted": 2,
+                   "tombstones": "seg-000001.2.del"}, ...]}
+
+Segment files are never modified. An update writes new segment and tombstone
+files and then atomically replaces the manifest, so readers always see a
+consistent set of segments, including while a merge is running. Files the new
+manifest drops are removed right away; a reader that still finds them listed
+reads the manifest again.
+
+Precomputed BM25 statistics are kept only while a single segment without
+tombstones holds the whole index, i.e. after a full save, a compaction or a
+merge of every segment when the caller supplies a way to compute them.
+Token positions, when recorded, live in each segment file and survive merges.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, replace
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Any
+
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.infra.index_format import (
+    IndexHeader,
+    find_doc,
+    read_doc_entry,
+    write_index,
+)
+from movie_search.infra.index_store import StoredIndex
+from movie_search.infra.mmap_index_store import (
+    MappedDocColumn,
+    MappedPostings,
+    map_index_file,
+    mapped_positions,
+    mapped_statistics,
+)
+from movie_search.infra.versions import FileVersion, file_version
+from movie_search.search.bm25 import IndexStatistics
+from movie_search.search.postings import PositionList, PostingList
+from movie_search.search.segments import (
+    Segment,
+    SegmentedDocColumn,
+    SegmentedPositions,
+    SegmentedPostings,
+    has_positions,
+    merge_segments,
+)
+
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentInfo:
+    name: str
+    documents: int
+    deleted: int = 0
+    tombstones: str | None = None
+
+    def live_count(self) -> int:
+        return self.documents - self.deleted
+
+
+@dataclass(frozen=True, slots=True)
+class MergePolicy:
+    """Decide which segments to compact after an update.
+
+    The smallest segments are merged once there are more than
+    ``max_segments``, which bounds the per-term cost of a query, and a segment
+    is rewritten once more than ``max_deleted_ratio`` of its documents are
+    tombstoned.
+    """
+
+    max_segments: int = 8
+    max_deleted_ratio: float = 0.5
+
+    def select(self, segments: Sequence[SegmentInfo]) -> list[str]:
+        if len(segments) > self.max_segments:
+            by_size = sorted(segments, key=lambda info: (info.live_count(), info.name))
+            return [info.name for info in by_size[: len(segments) - self.max_segments + 1]]
+        return [
+            info.name for info in segments if info.deleted > info.documents * self.max_deleted_ratio
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class _Manifest:
+    next_segment: int = 1
+    average_document_length: float = 0.0
+    segments: tuple[SegmentInfo, ...] = ()
+    # Live terms across all segments; ``None`` when an update could not keep it.
+    terms: int | None = None
+
+
+class SegmentedIndexStore:
+    """Index cache that persists updates as new segments instead of a full rewrite."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        dirname: str = "segments",
+        merge_policy: MergePolicy | None = None,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self._path = cache_dir / dirname
+        self._manifest_path = self._path / "manifest.json"
+        self._merge_policy = merge_policy or MergePolicy()
+
+    def version(self) -> FileVersion | None:
+        """Every update publishes a new manifest, so its file identifies the stored index."""
+        return file_version(self._manifest_path)
+
+    def save(
+        self,
+        index: Mapping[str, PostingList],
+        docmap: Mapping[int, int],
+        average_document_length: float,
+        fingerprints: Mapping[int, int],
+        statistics: IndexStatistics | None = None,
+        positions: Mapping[str, PositionList] | None = None,
+    ) -> None:
+        self.save_segments(
+            [Segment(index, docmap, fingerprints, positions)],
+            average_document_length,
+            statistics,
+            len(index),
+        )
+
+    def load(self) -> StoredIndex:
+        manifest = self._read_manifest()
+        while True:
+            try:
+                opened = [self._open(info) for info in manifest.segments]
+                break
+            except IndexStoreError:
+                # An update removes the files its new manifest no longer lists, so
+                # a reader that lost that race retries with the newer manifest.
+                current = self._read_manifest()
+                if current == manifest:
+                    raise
+                manifest = current
+        segments = tuple(segment for segment, _, _ in opened)
+        terms: int | Callable[[], int] = (
+            manifest.terms
+            if manifest.terms is not None
+            else partial(
+                _count_live_terms, [(postings, segment.deleted) for segment, postings, _ in opened]
+            )
+        )
+        return StoredIndex(
+            index=SegmentedPostings(segments, terms),
+            docmap=SegmentedDocColumn(segments, "docmap"),
+            average_document_length=manifest.average_document_length,
+            fingerprints=SegmentedDocColumn(segments, "fingerprints"),
+            segments=segments,
+            statistics=opened[0][2] if len(opened) == 1 and not segments[0].deleted else None,
+            positions=SegmentedPositions(segments, terms) if has_positions(segments) else None,
+            term_count=terms,
+        )
+
+    def save_segments(
+        self,
+        segments: Sequence[Segment],
+        average_document_length: float,
+        statistics: IndexStatistics | None = None,
+        term_count: int | None = None,
+        compute_statistics: Callable[[Segment], IndexStatistics] | None = None,
+    ) -> None:
+        """Persist ``segments`` as the new state of the cache.
+
+        Unnamed segments are written as new files, tombstones of named ones are
+        updated, and stored segments missing from ``segments`` are dropped.
+        ``statistics`` are stored only when a single new segment replaces the
+        whole index. ``term_count`` is the number of live terms if the caller
+        kept it; otherwise it is counted on the first load that needs it.
+        If a merge leaves one segment, ``compute_statistics`` supplies its
+        statistics.
+        """
+        if len(segments) != 1:
+            statistics = None
+        try:
+            self._path.mkdir(parents=True, exist_ok=True)
+            manifest = self._read_manifest() if self._manifest_path.exists() else _Manifest()
+            stored = {info.name: info for info in manifest.segments}
+            next_segment = manifest.next_segment
+            infos: list[SegmentInfo] = []
+            for segment in segments:
+                if segment.name is None:
+                    info = self._write_segment(_segment_name(next_segment), segment, statistics)
+                    next_segment += 1
+                elif segment.name in stored:
+                    info = stored[segment.name]
+                    if len(segment.deleted) != info.deleted:
+                        info = self._write_tombstones(info, segment.deleted)
+                else:
+                    raise IndexStoreError(
+                        f"Index segment {segment.name} is no longer in {self._path}; "
+                        "reload the index and retry."
+                    )
+                if info.live_count() > 0:
+                    infos.append(info)
+            manifest = _Manifest(next_segment, average_document_length, tuple(infos), term_count)
+            self._publish(manifest)
+            self._merge(manifest, self._merge_policy.select(manifest.segments), compute_statistics)
+        except (OSError, OverflowError, struct.error) as exc:
+            raise IndexStoreError(f"Unable to persist index cache at {self._path}") from exc
+
+    def merge(
+        self,
+        force: bool = False,
+        compute_statistics: Callable[[Segment], IndexStatistics] | None = None,
+    ) -> int:
+        """Compact segments and return how many were merged.
+
+        With ``force`` every segment is merged into one, dropping all tombstones.
+        ``compute_statistics`` is as for ``save_segments``.
+        """
+        manifest = self._read_manifest()
+        if force:
+            needs_merge = len(manifest.segments) > 1 or any(
+                info.deleted for info in manifest.segments
+            )
+            names = [info.name for info in manifest.segments] if needs_merge else []
+        else:
+            names = self._merge_policy.select(manifest.segments)
+        try:
+            return self._merge(manifest, names, compute_statistics)
+        except (OSError, OverflowError, struct.error) as exc:
+            raise IndexStoreError(f"Unable to persist index cache at {self._path}") from exc
+
+    def _merge(
+        self,
+        manifest: _Manifest,
+        names: Sequence[str],
+        compute_statistics: Callable[[Segment], IndexStatistics] | None = None,
+    ) -> int:
+        if not names:
+            return 0
+        selected = [info for info in manifest.segments if info.name in names]
+        segment = merge_segments([self._open_segment(info) for info in selected])
+        # The merged segment holds the whole index when every segment was selected.
+        statistics = (
+            compute_statistics(segment)
+            if compute_statistics is not None
+            and len(selected) == len(manifest.segments)
+            and segment.docmap
+            else None
+        )
+        merged = self._write_segment(_segment_name(manifest.next_segment), segment, statistics)
+        infos: list[SegmentInfo] = []
+        for info in manifest.segments:
+            if info is selected[0] and merged.live_count() > 0:
+                infos.append(merged)
+            elif info.name not in names:
+                infos.append(info)
+        # Merging keeps every live document, so the live terms stay the same.
+        self._publish(
+            replace(manifest, next_segment=manifest.next_segment + 1, segments=tuple(infos))
+        )
+        return len(selected)
+
+    def _write_segment(
+        self, name: str, segment: Segment, statistics: IndexStatistics | None = None
+    ) -> SegmentInfo:
+        live = merge_segments([segment]) if segment.deleted else segment
+        total_length = sum(live.docmap.values())
+        write_index(
+            self._path / f"{name}.bin",
+            live.index,
+            live.docmap,
+            total_length / len(live.docmap) if live.docmap else 0.0,
+            live.fingerprints,
+            statistics,
+            live.positions,
+        )
+        return SegmentInfo(name=name, documents=len(live.docmap))
+
+    def _write_tombstones(self, info: SegmentInfo, deleted: frozenset[int]) -> SegmentInfo:
+        buffer, header = map_index_file(self._path / f"{info.name}.bin")
+        with buffer:
+            bitmap = bytearray((header.doc_count + 7) // 8)
+            for doc_id in deleted:
+                position = find_doc(buffer, header, doc_id)
+                if position is not None:
+                    bitmap[position // 8] |= 1 << (position % 8)
+        count = sum(byte.bit_count() for byte in bitmap)
+        filename = f"{info.name}.{count}.del"
+        _write_atomically(self._path / filename, bytes(bitmap))
+        return replace(info, deleted=count, tombstones=filename)
+
+    def _open_segment(self, info: SegmentInfo) -> Segment:
+        return self._open(info)[0]
+
+    def _open(self, info: SegmentInfo) -> tuple[Segment, MappedPostings, IndexStatistics | None]:
+        path = self._path / f"{info.name}.bin"
+        try:
+            buffer, header = map_index_file(path)
+            deleted = self._read_tombstones(info, buffer, header)
+        except FileNotFoundError as exc:
+            raise IndexStoreError(
+                f"Index segment {info.name} is missing from {self._path}"
+            ) from exc
+        except (OSError, ValueError) as exc:
+            raise IndexStoreError(f"Unable to load index segment {info.name}") from exc
+        if header.doc_count != info.documents:
+            raise IndexStoreError(f"Index segment {info.name} does not match the manifest.")
+        postings = MappedPostings(buffer, header)
+        segment = Segment(
+            index=postings,
+            docmap=MappedDocColumn(buffer, header, MappedDocColumn.LENGTH),
+            fingerprints=MappedDocColumn(buffer, header, MappedDocColumn.FINGERPRINT),
+            positions=mapped_positions(buffer, header),
+            deleted=deleted,
+            name=info.name,
+        )
+        return segment, postings, mapped_statistics(buffer, header)
+
+    def _read_tombstones(
+        self, info: SegmentInfo, buffer: mmap.mmap, header: IndexHeader
+    ) -> frozenset[int]:
+        if info.tombstones is None:
+            return frozenset()
+        bitmap = (self._path / info.tombstones).read_bytes()
+        if len(bitmap) != (header.doc_count + 7) // 8:
+            raise IndexStoreError(f"Tombstones of index segment {info.name} are corrupt.")
+        deleted = frozenset(
+            read_doc_entry(buffer, header, byte_index * 8 + bit)[0]
+            for byte_index, byte in enumerate(bitmap)
+            if byte
+            for bit in range(8)
+            if byte >> bit & 1
+        )
+        if len(deleted) != info.deleted:
+            raise IndexStoreError(f"Tombstones of index segment {info.name} are corrupt.")
+        return deleted
+
+    def _publish(self, manifest: _Manifest) -> None:
+        payload = {
+            "version": MANIFEST_VERSION,
+            "next_segment": manifest.next_segment,
+            "average_document_length": manifest.average_document_length,
+            "terms": manifest.terms,
+            "segments": [
+                {
+                    "name": info.name,
+                    "documents": info.documents,
+                    "deleted": info.deleted,
+                    "tombstones": info.tombstones,
+                }
+                for info in manifest.segments
+            ],
+        }
+        _write_atomically(self._manifest_path, json.dumps(payload, indent=2).encode())
+        self._remove_unreferenced(manifest)
+
+    def _remove_unreferenced(self, manifest: _Manifest) -> None:
+        # Readers keep their own mappings, and ``load`` retries when a file of the
+        # manifest it read is gone, so files are unlinked as soon as the manifest
+        # stops referencing them.
+        referenced = {self._manifest_path.name}
+        for info in manifest.segments:
+            referenced.add(f"{info.name}.bin")
+            if info.tombstones is not None:
+                referenced.add(info.tombstones)
+        for path in self._path.iterdir():
+            if path.suffix in {".bin", ".del"} and path.name not in referenced:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _read_manifest(self) -> _Manifest:
+        try:
+            raw = json.loads(self._manifest_path.read_bytes())
+        except FileNotFoundError as exc:
+            raise IndexStoreError(f"Index cache not found in {self._path}") from exc
+        except OSError as exc:
+            raise IndexStoreError(f"Unable to load index cache from {self._path}") from exc
+        except ValueError as exc:
+            raise IndexStoreError(f"Index manifest is corrupt: {self._manifest_path}") from exc
+        return _validate_manifest(raw)
+
+
+def _validate_manifest(value: Any) -> _Manifest:
+    if not isinstance(value, dict) or value.get("version") != MANIFEST_VERSION:
+        raise IndexStoreError("Index manifest has an unknown format.")
+    next_segment = value.get("next_segment")
+    average = value.get("average_document_length")
+    raw_segments = value.get("segments")
+    terms = value.get("terms")
+    if (
+        not isinstance(next_segment, int)
+        or not isinstance(average, float | int)
+        or not isinstance(terms, int | None)
+        or not isinstance(raw_segments, list)
+    ):
+        raise IndexStoreError("Index manifest has an unknown format.")
+    infos: list[SegmentInfo] = []
+    for raw in raw_segments:
+        if (
+            not isinstance(raw, dict)
+            or not isinstance(raw.get("name"), str)
+            or not isinstance(raw.get("documents"), int)
+            or not isinstance(raw.get("deleted"), int)
+            or not isinstance(raw.get("tombstones"), str | None)
+        ):
+            raise IndexStoreError("Index manifest segment entries are malformed.")
+        infos.append(SegmentInfo(raw["name"], raw["documents"], raw["deleted"], raw["tombstones"]))
+    return _Manifest(next_segment, float(average), tuple(infos), terms)
+
+
+def _count_live_terms(segments: Sequence[tuple[MappedPostings, frozenset[int]]]) -> int:
+    """Count the distinct terms left with a live document in the opened segments."""
+    if len(segments) == 1 and not segments[0][1]:
+        return len(segments[0][0])
+    return len(
+        set(chain.from_iterable(postings.live_terms(deleted) for postings, deleted in segments))
+    )
+
+
+def _segment_name(number: int) -> str:
+    return f"seg-{number:06d}"
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    temporary_path.write_bytes(data)
+    os.replace(temporary_path, path)
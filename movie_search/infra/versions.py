@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+
+FileVersion = tuple[int, int, int]
+
+
+def file_version(path: Path) -> FileVersion | None:
+    """Return the inode, modification time and size of ``path``, or ``None`` if it is missing.
+
+    A file replaced with ``os.replace`` gets a new inode, so the version changes
+    even when the rewrite lands within the file system's timestamp granularity.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
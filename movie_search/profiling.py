@@ -0,0 +1,147 @@
+"""Per-stage wall time, call counts and allocations of the search and index pipelines.
+
+Pipeline code marks its stages with ``stage(name)``. Outside a ``Profiler``
+a stage costs one global lookup; inside one, every stage exit is added to the
+profiler's totals and passed to its hooks::
+
+    with Profiler(hooks=[print]) as profiler:
+        service.search("matrix")
+    profiler.report()  # {"wall_seconds": ..., "stages": {"score": {...}, ...}}
+
+Stages nest, and a stage's time includes the stages inside it. Allocations are
+the net number of memory blocks the process gained during a stage, plus net
+traced bytes while ``tracemalloc`` is tracing.
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class StageEvent:
+    name: str
+    seconds: float
+    allocated_blocks: int
+    allocated_bytes: int | None = None
+
+
+type StageHook = Callable[[StageEvent], None]
+
+
+@dataclass(slots=True)
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    allocated_blocks: int = 0
+    allocated_bytes: int | None = None
+
+    def add(self, event: StageEvent) -> None:
+        self.calls += 1
+        self.seconds += event.seconds
+        self.allocated_blocks += event.allocated_blocks
+        if event.allocated_bytes is not None:
+            self.allocated_bytes = (self.allocated_bytes or 0) + event.allocated_bytes
+
+    def to_dict(self) -> dict[str, int | float | None]:
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "allocated_blocks": self.allocated_blocks,
+            "allocated_bytes": self.allocated_bytes,
+        }
+
+
+class Profiler:
+    """Collects the stages run while it is active, from any thread."""
+
+    def __init__(self, hooks: Iterable[StageHook] = ()) -> None:
+        self._hooks = list(hooks)
+        self._stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._previous: Profiler | None = None
+        self._started: float | None = None
+        self._wall_seconds = 0.0
+
+    def __enter__(self) -> "Profiler":
+        global _active
+        self._previous, _active = _active, self
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        global _active
+        _active, self._previous = self._previous, None
+        if self._started is not None:
+            self._wall_seconds += time.perf_counter() - self._started
+            self._started = None
+
+    def add_hook(self, hook: StageHook) -> None:
+        self._hooks.append(hook)
+
+    def record(self, event: StageEvent) -> None:
+        with self._lock:
+            self._stages.setdefault(event.name, StageStats()).add(event)
+        for hook in self._hooks:
+            hook(event)
+
+    def stages(self) -> dict[str, StageStats]:
+        with self._lock:
+            return {
+                name: StageStats(
+                    stats.calls, stats.seconds, stats.allocated_blocks, stats.allocated_bytes
+                )
+                for name, stats in self._stages.items()
+            }
+
+    def report(self) -> dict[str, Any]:
+        """Return the totals as JSON-ready data, stages in the order they first ran."""
+        report: dict[str, Any] = {
+            "wall_seconds": self._wall_seconds,
+            "stages": {name: stats.to_dict() for name, stats in self.stages().items()},
+        }
+        if tracemalloc.is_tracing():
+            report["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        return report
+
+
+_active: Profiler | None = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Record the enclosed block as one call of stage ``name`` in the active profiler."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+
+    tracing = tracemalloc.is_tracing()
+    traced_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        profiler.record(
+            StageEvent(
+                name=name,
+                seconds=seconds,
+                allocated_blocks=sys.getallocatedblocks() - blocks_before,
+                allocated_bytes=(
+                    tracemalloc.get_traced_memory()[0] - traced_before if tracing else None
+                ),
+            )
+        )
@@ -1,19 +1,108 @@
+import heapq
 import math
+from array import array
+from bisect import bisect_left
 from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from dataclasses import dataclass
+from functools import partial
+from itertools import pairwise
+from typing import Protocol
 
-from movie_search.domain.models import Movie, SearchResult
+from movie_search.domain.models import DocumentScore, Movie, SearchResult
+from movie_search.profiling import stage
+from movie_search.search.phrases import contains_phrase, minimum_distance
+from movie_search.search.postings import (
+    DOC_ID_TYPECODE,
+    FREQUENCY_TYPECODE,
+    IMPACT_LEVELS,
+    IMPACT_TYPECODE,
+    ImpactPostings,
+    PositionList,
+    PostingList,
+    intersect,
+)
 
 
 @dataclass(frozen=True, slots=True)
 class BM25Config:
+    """BM25 parameters plus the weight of the proximity bonus phrase queries add.
+
+    Two query terms ``d`` positions apart add ``proximity * min(idf) / d**2``.
+    Only queries with a phrase of two or more tokens get the bonus.
+    """
+
     k1: float = 1.5
     b: float = 0.75
+    proximity: float = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class TermStatistics:
+    idf: float
+    max_score: float
+
+
+@dataclass(frozen=True, slots=True)
+class IndexStatistics:
+    """BM25 statistics precomputed for one state of an index.
+
+    ``max_score`` is the largest score a term adds to any single document, the
+    tightest upper bound pruning can use. ``impacts``, when present, holds every
+    term's postings in score order. The statistics only apply to an index with
+    the same document count and average length, ranked with the same ``k1`` and
+    ``b`` as ``config``.
+    """
+
+    config: BM25Config
+    document_count: int
+    average_document_length: float
+    terms: Mapping[str, TermStatistics]
+    impacts: Mapping[str, ImpactPostings] | None = None
+
+    def applies_to(
+        self, config: BM25Config, document_count: int, average_document_length: float
+    ) -> bool:
+        return (
+            self.config.k1 == config.k1
+            and self.config.b == config.b
+            and self.document_count == document_count
+            and self.average_document_length == average_document_length
+        )
+
+
+class ScoringIndex(Protocol):
+    def postings(self, token: str) -> PostingList: ...
+
+    def document_length(self, doc_id: int) -> int: ...
+
+    def document_count(self) -> int: ...
+
+    def average_document_length(self) -> float: ...
+
+    def statistics(self) -> IndexStatistics | None: ...
+
+
+class PositionalIndex(ScoringIndex, Protocol):
+    def positions(self, token: str) -> PositionList: ...
+
+
+@dataclass(slots=True)
+class RankCounters:
+    """Work done by ranking calls: posting entries read and documents scored."""
+
+    postings: int = 0
+    scored: int = 0
 
 
 class BM25SearchEngine:
     def __init__(self, config: BM25Config | None = None) -> None:
         self._config = config or BM25Config()
+        self._scan: tuple[list[list[str]], _CorpusStatistics] | None = None
+
+    @property
+    def config(self) -> BM25Config:
+        return self._config
 
     def rank(
         self,
@@ -21,45 +110,560 @@ class BM25SearchEngine:
         corpus_tokens: list[list[str]],
         query_tokens: list[str],
         limit: int,
+        phrases: Sequence[Sequence[str]] = (),
+        counters: RankCounters | None = None,
     ) -> list[SearchResult]:
+        """Rank ``movies`` by BM25, keeping only those containing every phrase.
+
+        Documents matching the phrases also get the proximity bonus. Work done
+        is added to ``counters`` when given.
+        """
         if limit <= 0 or not movies or not query_tokens:
             return []
 
-        avgdl = (
-            sum(len(tokens) for tokens in corpus_tokens) / len(corpus_tokens)
-            if corpus_tokens
-            else 0.0
-        )
+        with stage("document_frequencies"):
+            statistics = self._corpus_statistics(corpus_tokens)
+        avgdl = statistics.average_document_length
         if avgdl == 0.0:
             return []
 
         num_docs = len(movies)
-        df = Counter[str]()
-        for tokens in corpus_tokens:
-            unique_tokens = set(tokens)
-            for query_token in query_tokens:
-                if query_token in unique_tokens:
-                    df[query_token] += 1
-
+        df = statistics.document_frequencies
+        idfs = {
+            query_token: self._idf(df[query_token], num_docs)
+            for query_token in query_tokens
+            if phrases and df[query_token] > 0
+        }
+        if counters is not None:
+            counters.postings += sum(df[query_token] for query_token in query_tokens)
+            counters.scored += num_docs
         scored: list[SearchResult] = []
-        for idx, movie in enumerate(movies):
-            tokens = corpus_tokens[idx]
-            doc_len = len(tokens)
-            tf = Counter(tokens)
-
-            score = 0.0
-            for query_token in query_tokens:
-                if df[query_token] > 0:
-                    idf = math.log(
-                        (num_docs - df[query_token] + 0.5) / (df[query_token] + 0.5) + 1.0
-                    )
-                    denominator = tf[query_token] + self._config.k1 * (
-                        1 - self._config.b + self._config.b * doc_len / avgdl
+        with stage("score"):
+            for idx, movie in enumerate(movies):
+                doc_len = statistics.document_lengths[idx]
+                tf = statistics.term_frequencies[idx]
+
+                score = 0.0
+                for query_token in query_tokens:
+                    if df[query_token] > 0:
+                        idf = self._idf(df[query_token], num_docs)
+                        score += self._term_score(idf, tf[query_token], doc_len, avgdl)
+                if score > 0 and phrases:
+                    if not all(tf[token] for phrase in phrases for token in phrase):
+                        continue
+                    bonus = self._phrase_bonus(
+                        query_tokens,
+                        phrases,
+                        _DocumentPositions(_scan_positions(corpus_tokens[idx])),
+                        idfs,
                     )
-                    if denominator > 0:
-                        score += idf * (tf[query_token] * (self._config.k1 + 1)) / denominator
-            if score > 0:
-                scored.append(SearchResult(movie=movie, score=score))
+                    if bonus is None:
+                        continue
+                    score += bonus
+                if score > 0:
+                    scored.append(SearchResult(movie=movie, score=score))
 
-        scored.sort(key=lambda item: (-item.score, item.movie.id))
+        with stage("sort"):
+            scored.sort(key=lambda item: (-item.score, item.movie.id))
         return scored[:limit]
+
+    def _corpus_statistics(self, corpus_tokens: list[list[str]]) -> "_CorpusStatistics":
+        # Computed once per corpus and reused while ``rank`` keeps receiving the
+        # same ``corpus_tokens`` list, like the numpy engine's matrix.
+        scan = self._scan
+        if scan is None or scan[0] is not corpus_tokens:
+            scan = (corpus_tokens, _CorpusStatistics.of(corpus_tokens))
+            self._scan = scan
+        return scan[1]
+
+    def rank_index(
+        self,
+        index: ScoringIndex,
+        query_tokens: list[str],
+        limit: int,
+        counters: RankCounters | None = None,
+    ) -> list[DocumentScore]:
+        """Rank documents from the index with WAND dynamic pruning.
+
+        Each query term carries an upper bound on the score it can add to any
+        document. Documents whose summed bounds cannot reach the current k-th
+        best score are skipped without being scored, and the result is the same
+        as scoring every document that matches a query term.
+
+        IDF and the bounds come from the index's precomputed statistics when
+        they apply; otherwise they are derived from each posting list.
+        """
+        if limit <= 0 or not query_tokens:
+            return []
+
+        avgdl = index.average_document_length()
+        if avgdl == 0.0:
+            return []
+
+        if counters is None:
+            counters = RankCounters()
+        num_docs = index.document_count()
+        statistics = index.statistics()
+        if statistics is None or not statistics.applies_to(self._config, num_docs, avgdl):
+            statistics = None
+        elif statistics.impacts is not None and len(set(query_tokens)) <= _MAX_IMPACT_TERMS:
+            return self._rank_impacts(index, query_tokens, statistics, avgdl, limit, counters)
+        terms = statistics.terms if statistics is not None else {}
+        exact_bounds = True
+        cursors: list[_TermCursor] = []
+        idfs: dict[str, float] = {}
+        for query_token, occurrences in Counter(query_tokens).items():
+            postings = index.postings(query_token)
+            if not postings:
+                continue
+            counters.postings += len(postings)
+            term = terms.get(query_token)
+            if term is None:
+                idf = self._idf(len(postings), num_docs)
+                max_score = self._upper_bound(idf, max(postings.frequencies), avgdl)
+                exact_bounds = False
+            else:
+                idf, max_score = term.idf, term.max_score
+            idfs[query_token] = idf
+            cursors.append(
+                _TermCursor(query_token, postings, max_score * occurrences * _BOUND_SLACK)
+            )
+
+        if not cursors:
+            return []
+        # A single posting list offers nothing to skip, and unusual k1/b values
+        # break the monotonicity bounds derived from frequencies alone rely on.
+        if len(cursors) == 1 or not (exact_bounds or self._bounds_are_monotone()):
+            return self._rank_postings(index, query_tokens, cursors, idfs, avgdl, limit, counters)
+
+        # Min-heap whose root is the worst kept result: lowest score, then highest doc ID.
+        heap: list[tuple[float, int]] = []
+        while cursors:
+            cursors.sort(key=_cursor_doc_id)
+            threshold = heap[0][0] if len(heap) == limit else 0.0
+
+            pivot = -1
+            accumulated = 0.0
+            for position, cursor in enumerate(cursors):
+                accumulated += cursor.bound
+                if accumulated > 0.0 and accumulated >= threshold:
+                    pivot = position
+                    break
+            if pivot < 0:
+                break
+
+            pivot_doc = cursors[pivot].doc_id
+            if cursors[0].doc_id == pivot_doc:
+                frequencies = {
+                    cursor.token: cursor.frequency
+                    for cursor in cursors
+                    if cursor.doc_id == pivot_doc
+                }
+                score = self._document_score(
+                    query_tokens, frequencies, idfs, index.document_length(pivot_doc), avgdl
+                )
+                counters.scored += 1
+                entry = (score, -pivot_doc)
+                if score > 0 and len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif score > 0 and entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+                for cursor in cursors:
+                    if cursor.doc_id == pivot_doc:
+                        cursor.advance()
+            else:
+                for cursor in cursors[:pivot]:
+                    cursor.seek(pivot_doc)
+            cursors = [cursor for cursor in cursors if cursor.doc_id != _END_OF_POSTINGS]
+
+        top = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [DocumentScore(doc_id=-negated_id, score=score) for score, negated_id in top]
+
+    def rank_phrases(
+        self,
+        index: PositionalIndex,
+        query_tokens: list[str],
+        phrases: Sequence[Sequence[str]],
+        limit: int,
+        counters: RankCounters | None = None,
+    ) -> list[DocumentScore]:
+        """Rank the documents containing every phrase by BM25 plus the proximity bonus.
+
+        Candidates come from intersecting the posting lists of the phrase
+        tokens, rarest first, and token positions are only decoded for them.
+        Scores match ``rank`` over the same documents.
+        """
+        if limit <= 0 or not query_tokens or not phrases:
+            return []
+
+        avgdl = index.average_document_length()
+        if avgdl == 0.0:
+            return []
+
+        num_docs = index.document_count()
+        statistics = index.statistics()
+        terms = (
+            statistics.terms
+            if statistics is not None and statistics.applies_to(self._config, num_docs, avgdl)
+            else {}
+        )
+        postings: dict[str, PostingList] = {}
+        idfs: dict[str, float] = {}
+        for query_token in query_tokens:
+            token_postings = _postings(index, postings, query_token)
+            if token_postings and query_token not in idfs:
+                term = terms.get(query_token)
+                idfs[query_token] = (
+                    term.idf if term is not None else self._idf(len(token_postings), num_docs)
+                )
+        if counters is not None:
+            counters.postings += sum(len(token_postings) for token_postings in postings.values())
+        required = {token for phrase in phrases for token in phrase}
+        if not required <= idfs.keys():
+            return []
+
+        positions: dict[str, PositionList] = {}
+        scored: list[tuple[int, float]] = []
+        for doc_id in intersect([postings[token] for token in required]):
+            bonus = self._phrase_bonus(
+                query_tokens,
+                phrases,
+                _DocumentPositions(partial(_indexed_positions, index, positions, doc_id)),
+                idfs,
+            )
+            if bonus is None:
+                continue
+            frequencies = {token: postings[token].frequency(doc_id) for token in idfs}
+            score = self._document_score(
+                query_tokens, frequencies, idfs, index.document_length(doc_id), avgdl
+            )
+            scored.append((doc_id, score + bonus))
+        if counters is not None:
+            counters.scored += len(scored)
+
+        top = heapq.nsmallest(limit, scored, key=lambda item: (-item[1], item[0]))
+        return [DocumentScore(doc_id=doc_id, score=score) for doc_id, score in top]
+
+    def compute_statistics(
+        self, index: ScoringIndex, terms: Iterable[str], impacts: bool = False
+    ) -> IndexStatistics:
+        """Precompute IDF and the exact per-document score bound of every term.
+
+        With ``impacts`` each term's postings are also laid out in score order.
+        """
+        num_docs = index.document_count()
+        avgdl = index.average_document_length()
+        computed: dict[str, TermStatistics] = {}
+        impact_postings: dict[str, ImpactPostings] = {}
+        for token in terms if avgdl else ():
+            postings = index.postings(token)
+            if not postings:
+                continue
+            idf = self._idf(len(postings), num_docs)
+            scored = sorted(
+                (
+                    -self._term_score(idf, frequency, index.document_length(doc_id), avgdl),
+                    doc_id,
+                    frequency,
+                )
+                for doc_id, frequency in postings.items()
+            )
+            max_score = -scored[0][0]
+            computed[token] = TermStatistics(idf=idf, max_score=max_score)
+            if impacts:
+                impact_postings[token] = ImpactPostings(
+                    doc_ids=array(DOC_ID_TYPECODE, (doc_id for _, doc_id, _ in scored)),
+                    frequencies=array(
+                        FREQUENCY_TYPECODE, (frequency for _, _, frequency in scored)
+                    ),
+                    impacts=array(
+                        IMPACT_TYPECODE, (_quantize(-score, max_score) for score, _, _ in scored)
+                    ),
+                )
+        return IndexStatistics(
+            self._config, num_docs, avgdl, computed, impact_postings if impacts else None
+        )
+
+    def _rank_impacts(
+        self,
+        index: ScoringIndex,
+        query_tokens: list[str],
+        statistics: IndexStatistics,
+        avgdl: float,
+        limit: int,
+        counters: RankCounters,
+    ) -> list[DocumentScore]:
+        """Rank by walking score-ordered postings until no unseen document can place.
+
+        Every list is read in step, and a document is scored in full the first
+        time any list reaches it. The impacts at the current positions bound the
+        score of every document not seen yet, so once the k-th best score beats
+        their sum the top k is final. A single-term query reads just the first
+        ``limit`` postings.
+        """
+        assert statistics.impacts is not None
+        occurrences = Counter(query_tokens)
+        lists = [
+            (token, impacts, statistics.terms[token].max_score * count / IMPACT_LEVELS)
+            for token, count in occurrences.items()
+            if (impacts := statistics.impacts.get(token))
+        ]
+        idfs = {token: statistics.terms[token].idf for token, _, _ in lists}
+        if len(lists) == 1 and occurrences[lists[0][0]] == 1:
+            # Score order is exactly the result order, tie-break included.
+            token, impacts, _ = lists[0]
+            results: list[DocumentScore] = []
+            for doc_id, frequency in zip(
+                impacts.doc_ids[:limit], impacts.frequencies[:limit], strict=True
+            ):
+                score = self._document_score(
+                    query_tokens, {token: frequency}, idfs, index.document_length(doc_id), avgdl
+                )
+                if score <= 0:
+                    break
+                results.append(DocumentScore(doc_id=doc_id, score=score))
+            counters.postings += len(results)
+            counters.scored += len(results)
+            return results
+        # Doc-ordered postings are only needed to score documents in full.
+        doc_postings: dict[str, PostingList] = {}
+
+        heap: list[tuple[float, int]] = []
+        seen: set[int] = set()
+        position = 0
+        while True:
+            bound = sum(
+                impacts.impacts[position] * scale
+                for _, impacts, scale in lists
+                if position < len(impacts)
+            )
+            if bound == 0.0 or (len(heap) == limit and heap[0][0] > bound * _BOUND_SLACK):
+                break
+            for token, impacts, _ in lists:
+                if position >= len(impacts):
+                    continue
+                doc_id = impacts.doc_ids[position]
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                frequencies = {
+                    other: (
+                        impacts.frequencies[position]
+                        if other == token
+                        else _postings(index, doc_postings, other).frequency(doc_id)
+                    )
+                    for other, _, _ in lists
+                }
+                score = self._document_score(
+                    query_tokens, frequencies, idfs, index.document_length(doc_id), avgdl
+                )
+                entry = (score, -doc_id)
+                if score > 0 and len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif score > 0 and entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            position += 1
+
+        counters.postings += sum(min(position, len(impacts)) for _, impacts, _ in lists)
+        counters.postings += sum(len(postings) for postings in doc_postings.values())
+        counters.scored += len(seen)
+        top = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [DocumentScore(doc_id=-negated_id, score=score) for score, negated_id in top]
+
+    def _rank_postings(
+        self,
+        index: ScoringIndex,
+        query_tokens: list[str],
+        cursors: list["_TermCursor"],
+        idfs: dict[str, float],
+        avgdl: float,
+        limit: int,
+        counters: RankCounters,
+    ) -> list[DocumentScore]:
+        frequencies: dict[int, dict[str, int]] = {}
+        for cursor in cursors:
+            for doc_id, frequency in cursor.postings.items():
+                frequencies.setdefault(doc_id, {})[cursor.token] = frequency
+        counters.scored += len(frequencies)
+
+        scored = (
+            (
+                doc_id,
+                self._document_score(
+                    query_tokens, doc_frequencies, idfs, index.document_length(doc_id), avgdl
+                ),
+            )
+            for doc_id, doc_frequencies in frequencies.items()
+        )
+        top = heapq.nsmallest(
+            limit,
+            ((doc_id, score) for doc_id, score in scored if score > 0),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return [DocumentScore(doc_id=doc_id, score=score) for doc_id, score in top]
+
+    def _document_score(
+        self,
+        query_tokens: list[str],
+        frequencies: dict[str, int],
+        idfs: dict[str, float],
+        doc_len: int,
+        avgdl: float,
+    ) -> float:
+        # Summed in query order, exactly as rank() does, so scores match bit for bit.
+        score = 0.0
+        for query_token in query_tokens:
+            frequency = frequencies.get(query_token, 0)
+            if frequency:
+                score += self._term_score(idfs[query_token], frequency, doc_len, avgdl)
+        return score
+
+    def _phrase_bonus(
+        self,
+        query_tokens: list[str],
+        phrases: Sequence[Sequence[str]],
+        positions: Mapping[str, list[int]],
+        idfs: Mapping[str, float],
+    ) -> float | None:
+        """Return a document's proximity bonus, or ``None`` if it misses a phrase.
+
+        Each pair of adjacent, distinct query terms found in the document adds a
+        bonus that shrinks with the square of their closest distance. Single-token
+        phrases only filter: such queries may run on an index without positions
+        (see ``Query.needs_positions``), so they get no bonus from either path.
+        """
+        if not any(len(phrase) > 1 for phrase in phrases):
+            return 0.0
+        for phrase in phrases:
+            if len(phrase) > 1 and not contains_phrase([positions[token] for token in phrase]):
+                return None
+        bonus = 0.0
+        for left, right in pairwise(query_tokens):
+            if left == right or left not in idfs or right not in idfs:
+                continue
+            distance = minimum_distance(positions[left], positions[right])
+            if distance:
+                bonus += self._config.proximity * min(idfs[left], idfs[right]) / distance**2
+        return bonus
+
+    def _upper_bound(self, idf: float, max_frequency: int, avgdl: float) -> float:
+        # A term scores highest at its largest frequency in the shortest possible document.
+        return self._term_score(idf, max_frequency, 0, avgdl)
+
+    def _bounds_are_monotone(self) -> bool:
+        return self._config.k1 >= 0 and 0 <= self._config.b <= 1
+
+    def _idf(self, doc_freq: int, num_docs: int) -> float:
+        return math.log((num_docs - doc_freq + 0.5) / (doc_freq + 0.5) + 1.0)
+
+    def _term_score(self, idf: float, frequency: int, doc_len: int, avgdl: float) -> float:
+        denominator = frequency + self._config.k1 * (
+            1 - self._config.b + self._config.b * doc_len / avgdl
+        )
+        if denominator <= 0:
+            return 0.0
+        return idf * (frequency * (self._config.k1 + 1)) / denominator
+
+
+@dataclass(frozen=True, slots=True)
+class _CorpusStatistics:
+    average_document_length: float
+    document_lengths: tuple[int, ...]
+    term_frequencies: tuple[Counter[str], ...]
+    document_frequencies: Counter[str]
+
+    @classmethod
+    def of(cls, corpus_tokens: list[list[str]]) -> "_CorpusStatistics":
+        term_frequencies = tuple(Counter(tokens) for tokens in corpus_tokens)
+        document_frequencies = Counter[str]()
+        for frequencies in term_frequencies:
+            document_frequencies.update(frequencies.keys())
+        lengths = tuple(len(tokens) for tokens in corpus_tokens)
+        return cls(
+            average_document_length=sum(lengths) / len(lengths) if lengths else 0.0,
+            document_lengths=lengths,
+            term_frequencies=term_frequencies,
+            document_frequencies=document_frequencies,
+        )
+
+
+# Guards pruning against rounding differences between a bound and an exact score.
+_BOUND_SLACK = 1.0 + 1e-9
+
+# Longer queries are ranked with WAND, which skips better across many lists.
+_MAX_IMPACT_TERMS = 3
+
+
+def _quantize(score: float, max_score: float) -> int:
+    if score <= 0.0 or max_score <= 0.0:
+        return 0
+    return min(IMPACT_LEVELS, math.ceil(score / max_score * IMPACT_LEVELS))
+
+
+def _postings(index: ScoringIndex, cache: dict[str, PostingList], token: str) -> PostingList:
+    postings = cache.get(token)
+    if postings is None:
+        postings = cache[token] = index.postings(token)
+    return postings
+
+
+def _positions(index: PositionalIndex, cache: dict[str, PositionList], token: str) -> PositionList:
+    positions = cache.get(token)
+    if positions is None:
+        positions = cache[token] = index.positions(token)
+    return positions
+
+
+class _DocumentPositions(dict[str, list[int]]):
+    """Positions of query tokens in one document, each decoded on first access."""
+
+    def __init__(self, decode: Callable[[str], list[int]]) -> None:
+        super().__init__()
+        self._decode = decode
+
+    def __missing__(self, token: str) -> list[int]:
+        positions = self[token] = self._decode(token)
+        return positions
+
+
+def _indexed_positions(
+    index: PositionalIndex, cache: dict[str, PositionList], doc_id: int, token: str
+) -> list[int]:
+    return _positions(index, cache, token).positions(doc_id)
+
+
+def _scan_positions(tokens: list[str]) -> Callable[[str], list[int]]:
+    return lambda token: [position for position, other in enumerate(tokens) if other == token]
+
+
+class _TermCursor:
+    __slots__ = ("token", "postings", "bound", "doc_id", "_position")
+
+    def __init__(self, token: str, postings: PostingList, bound: float) -> None:
+        self.token = token
+        self.postings = postings
+        self.bound = bound
+        self._position = 0
+        self.doc_id = postings.doc_ids[0]
+
+    @property
+    def frequency(self) -> int:
+        return self.postings.frequencies[self._position]
+
+    def advance(self) -> None:
+        self._move_to(self._position + 1)
+
+    def seek(self, doc_id: int) -> None:
+        self._move_to(bisect_left(self.postings.doc_ids, doc_id, lo=self._position))
+
+    def _move_to(self, position: int) -> None:
+        doc_ids = self.postings.doc_ids
+        self._position = position
+        self.doc_id = doc_ids[position] if position < len(doc_ids) else _END_OF_POSTINGS
+
+
+_END_OF_POSTINGS = 1 << 64
+
+
+def _cursor_doc_id(cursor: _TermCursor) -> int:
+    return cursor.doc_id
@@ -1,58 +1,557 @@
-from collections.abc import Callable
+import hashlib
+from array import array
+from collections import Counter, deque
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from itertools import accumulate, batched, chain, count, pairwise
 
+from movie_search.domain.exceptions import DataFormatError
 from movie_search.domain.models import Movie
+from movie_search.search.bm25 import IndexStatistics
+from movie_search.search.phrases import contains_phrase
+from movie_search.search.postings import (
+    DOC_ID_TYPECODE,
+    EMPTY_POSITIONS,
+    EMPTY_POSTINGS,
+    FREQUENCY_TYPECODE,
+    POSITION_OFFSET_TYPECODE,
+    PositionList,
+    PostingList,
+    encode_positions,
+    intersect,
+)
+from movie_search.search.segments import (
+    Segment,
+    SegmentedDocColumn,
+    SegmentedPositions,
+    SegmentedPostings,
+    has_positions,
+    merge_positions,
+)
+
+DEFAULT_SHARD_SIZE = 1024
+
+# Shared by all indexes, so a generation also identifies which index it came from.
+_GENERATIONS = count(1)
 
 
 class InvertedIndex:
+    """Postings with term frequencies plus the document lengths BM25 needs.
+
+    Imported postings and docmaps are kept as the mappings the store returned,
+    so a lazily decoded store is only read for the terms a query touches.
+    Imported segments are queried through merged views; updates then append a
+    new segment and tombstone older copies instead of rewriting postings.
+    Precomputed BM25 statistics describe one state of the index, so any
+    update discards them. Token positions are optional; an index built with
+    them keeps recording them for updated documents.
+    """
+
     def __init__(self) -> None:
-        self._index: dict[str, set[int]] = {}
-        self._docmap: dict[int, str] = {}
+        self._index: Mapping[str, PostingList] = {}
+        self._docmap: Mapping[int, int] = {}
+        self._fingerprints: Mapping[int, int] = {}
+        self._positions: Mapping[str, PositionList] | None = None
+        self._segments: list[Segment] | None = None
+        # Live terms of a segmented index, while updates can keep the count exact.
+        self._term_count: int | None = None
+        self._statistics: IndexStatistics | None = None
+        self._average_document_length = 0.0
+        self._generation = next(_GENERATIONS)
 
     def build(
         self,
-        movies: list[Movie],
+        movies: Iterable[Movie],
         stopwords: set[str],
         tokenizer: Callable[[str, set[str]], list[str]],
+        workers: int = 1,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        positions: bool = False,
     ) -> None:
+        """Tokenize ``movies`` into postings, optionally across a process pool.
+
+        ``movies`` is consumed once, so it may be a generator. With
+        ``workers > 1`` it is cut into contiguous shards of ``shard_size``
+        movies that are indexed in separate processes, with a bounded number
+        of shards in flight, and merged in shard order. That yields exactly the
+        index a serial build produces. ``tokenizer`` must then be picklable,
+        e.g. a module-level function. With ``positions`` the token positions
+        of every term are recorded too, which phrase queries need.
+        """
         self.clear()
+        if workers > 1:
+            # Imported here: multiprocessing is slow to import and only parallel builds need it.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                partial = _merge(
+                    _index_shards(
+                        executor,
+                        batched(movies, shard_size, strict=False),
+                        stopwords,
+                        tokenizer,
+                        positions,
+                        max_in_flight=workers * _SHARDS_PER_WORKER,
+                    )
+                )
+        else:
+            partial = _index_shard(movies, stopwords, tokenizer, positions)
+
+        self._index = {
+            token: _finalize(doc_ids, frequencies)
+            for token, (doc_ids, frequencies) in partial.pending.items()
+        }
+        self._positions = _finalize_positions(partial) if positions else None
+        self._docmap = partial.docmap
+        self._fingerprints = partial.fingerprints
+        self._average_document_length = _average(partial.docmap)
+        self._changed()
+
+    def upsert(
+        self,
+        movies: Iterable[Movie],
+        stopwords: set[str],
+        tokenizer: Callable[[str, set[str]], list[str]],
+        previous_tokens: Iterable[str] | None = None,
+    ) -> list[int]:
+        """Add new movies and re-index changed ones, returning the affected IDs.
+
+        Movies whose title and description match the indexed fingerprint are
+        skipped. Only the posting lists of touched terms are rewritten.
+        Positions are recorded for the changed movies if the index has them.
+        ``previous_tokens`` are the tokens of the indexed versions of the
+        changed movies; a segmented index needs them to keep its term count.
+        """
+        changed: dict[int, Movie] = {}
         for movie in movies:
-            content = f"{movie.title} {movie.description}"
-            self._docmap[movie.id] = content
-            for token in set(tokenizer(content, stopwords)):
-                self._index.setdefault(token, set()).add(movie.id)
+            if movie.id in changed or self._fingerprints.get(movie.id) != content_fingerprint(
+                movie
+            ):
+                changed[movie.id] = movie
+        if not changed:
+            return []
+
+        positions = self.has_positions()
+        partial = _index_shard(changed.values(), stopwords, tokenizer, positions)
+        if self._segments is not None:
+            replaced = any(doc_id in self._docmap for doc_id in changed)
+            counted = self._count_live(
+                chain(partial.pending, previous_tokens or ())
+                if previous_tokens is not None or not replaced
+                else None
+            )
+            total_length = self._total_length() - self._tombstone(self._segments, changed.keys())
+            self._segments.append(
+                Segment(
+                    index={
+                        token: _finalize(doc_ids, frequencies)
+                        for token, (doc_ids, frequencies) in partial.pending.items()
+                    },
+                    docmap=partial.docmap,
+                    fingerprints=partial.fingerprints,
+                    positions=_finalize_positions(partial) if positions else None,
+                )
+            )
+            self._set_total_length(total_length + sum(partial.docmap.values()))
+            self._recount(counted)
+            return sorted(changed)
+
+        index, docmap, fingerprints = self._mutable()
+        self._remove_postings(index, changed.keys() & docmap.keys())
+        for token, (doc_ids, frequencies) in partial.pending.items():
+            existing = index.get(token, EMPTY_POSTINGS)
+            index[token] = PostingList.from_pairs(
+                chain(existing.items(), zip(doc_ids, frequencies, strict=True))
+            )
+        if positions:
+            token_positions = self._mutable_positions()
+            self._remove_positions(token_positions, changed.keys() & docmap.keys())
+            for token, runs in partial.positions.items():
+                existing_positions = token_positions.get(token, EMPTY_POSITIONS)
+                token_positions[token] = PositionList.from_runs(
+                    chain(
+                        existing_positions.runs(), zip(partial.pending[token][0], runs, strict=True)
+                    )
+                )
+        docmap.update(partial.docmap)
+        fingerprints.update(partial.fingerprints)
+        self._average_document_length = _average(docmap)
+        self._changed()
+        return sorted(changed)
+
+    def delete(
+        self, doc_ids: Iterable[int], previous_tokens: Iterable[str] | None = None
+    ) -> list[int]:
+        """Remove documents from the index, returning the IDs that were present.
+
+        ``previous_tokens`` are the tokens of the removed documents, as for ``upsert``.
+        """
+        removed = {doc_id for doc_id in doc_ids if doc_id in self._docmap}
+        if not removed:
+            return []
+
+        if self._segments is not None:
+            counted = self._count_live(previous_tokens)
+            total_length = self._total_length() - self._tombstone(self._segments, removed)
+            self._set_total_length(total_length)
+            self._recount(counted)
+            return sorted(removed)
+
+        index, docmap, fingerprints = self._mutable()
+        self._remove_postings(index, removed)
+        if self._positions is not None:
+            self._remove_positions(self._mutable_positions(), removed)
+        for doc_id in removed:
+            del docmap[doc_id]
+            fingerprints.pop(doc_id, None)
+        self._average_document_length = _average(docmap)
+        self._changed()
+        return sorted(removed)
 
     def clear(self) -> None:
-        self._index.clear()
-        self._docmap.clear()
+        self._index = {}
+        self._docmap = {}
+        self._fingerprints = {}
+        self._positions = None
+        self._segments = None
+        self._average_document_length = 0.0
+        self._changed()
+
+    def lookup(self, term_tokens: list[str], phrases: Iterable[Sequence[str]] = ()) -> list[int]:
+        """Return the documents containing every token, and each phrase in order.
 
-    def lookup(self, term_tokens: list[str]) -> list[int]:
+        Posting lists are intersected rarest first with galloping search, and
+        positions are only decoded for the documents that contain every token.
+        """
         if not term_tokens:
             return []
 
-        doc_ids: set[int] | None = None
-        for token in term_tokens:
-            token_docs = self._index.get(token, set())
-            if doc_ids is None:
-                doc_ids = set(token_docs)
-            else:
-                doc_ids &= token_docs
-            if not doc_ids:
-                return []
+        matches = intersect([self.postings(token) for token in dict.fromkeys(term_tokens)])
+        multi_token_phrases = [phrase for phrase in phrases if len(phrase) > 1]
+        return [
+            doc_id
+            for doc_id in matches
+            if all(
+                contains_phrase([self.positions(token).positions(doc_id) for token in phrase])
+                for phrase in multi_token_phrases
+            )
+        ]
+
+    def postings(self, token: str) -> PostingList:
+        return self._index.get(token, EMPTY_POSTINGS)
+
+    def positions(self, token: str) -> PositionList:
+        if self._positions is None:
+            return EMPTY_POSITIONS
+        return self._positions.get(token, EMPTY_POSITIONS)
+
+    def has_positions(self) -> bool:
+        return self._positions is not None
+
+    def document_length(self, doc_id: int) -> int:
+        return self._docmap.get(doc_id, 0)
+
+    def document_ids(self) -> Iterator[int]:
+        return iter(self._docmap)
+
+    def document_count(self) -> int:
+        return len(self._docmap)
+
+    def average_document_length(self) -> float:
+        return self._average_document_length
 
-        return sorted(doc_ids) if doc_ids is not None else []
+    def terms(self) -> Iterator[str]:
+        return iter(self._index)
 
-    def stats(self) -> dict[str, int]:
+    def statistics(self) -> IndexStatistics | None:
+        return self._statistics
+
+    def set_statistics(self, statistics: IndexStatistics | None) -> None:
+        """Attach BM25 statistics computed for the current state of the index."""
+        self._statistics = statistics
+
+    def stats(self) -> dict[str, int | float]:
         return {
             "token_count": len(self._index),
             "document_count": len(self._docmap),
+            "average_document_length": self._average_document_length,
         }
 
-    def export_index(self) -> dict[str, set[int]]:
-        return {token: set(doc_ids) for token, doc_ids in self._index.items()}
+    def term_count(self) -> int | None:
+        """Return how many terms have live postings, or ``None`` if only a scan can tell."""
+        return len(self._index) if self._segments is None else self._term_count
+
+    def export_index(self) -> dict[str, PostingList]:
+        return dict(self._index)
 
-    def export_docmap(self) -> dict[int, str]:
+    def export_docmap(self) -> dict[int, int]:
         return dict(self._docmap)
 
-    def import_data(self, index: dict[str, list[int]], docmap: dict[int, str]) -> None:
-        self._index = {token: set(doc_ids) for token, doc_ids in index.items()}
-        self._docmap = dict(docmap)
+    def export_fingerprints(self) -> dict[int, int]:
+        return dict(self._fingerprints)
+
+    def export_positions(self) -> dict[str, PositionList] | None:
+        if self._segments is not None:
+            return merge_positions(self._segments)
+        return dict(self._positions) if self._positions is not None else None
+
+    def fingerprint(self, doc_id: int) -> int | None:
+        return self._fingerprints.get(doc_id)
+
+    def generation(self) -> int:
+        """Return a number that changes whenever the indexed content changes."""
+        return self._generation
+
+    def segments(self) -> list[Segment] | None:
+        """Return the segments with their tombstones, or ``None`` for a monolithic index."""
+        return list(self._segments) if self._segments is not None else None
+
+    def import_data(
+        self,
+        index: Mapping[str, PostingList],
+        docmap: Mapping[int, int],
+        average_document_length: float | None = None,
+        fingerprints: Mapping[int, int] | None = None,
+        statistics: IndexStatistics | None = None,
+        positions: Mapping[str, PositionList] | None = None,
+    ) -> None:
+        self._index = index
+        self._docmap = docmap
+        self._fingerprints = fingerprints if fingerprints is not None else {}
+        self._positions = positions
+        self._segments = None
+        self._term_count = None
+        self._average_document_length = (
+            _average(self._docmap) if average_document_length is None else average_document_length
+        )
+        self._changed()
+        self._statistics = statistics
+
+    def import_segments(
+        self,
+        segments: Iterable[Segment],
+        average_document_length: float | None = None,
+        statistics: IndexStatistics | None = None,
+        term_count: int | Callable[[], int] | None = None,
+    ) -> None:
+        """Serve the index from ``segments``, whose live terms number ``term_count``.
+
+        ``term_count`` may also be a function that counts them on first use.
+        """
+        self._segments = list(segments)
+        self._term_count = term_count if isinstance(term_count, int) else None
+        self._index = SegmentedPostings(self._segments, term_count)
+        self._docmap = SegmentedDocColumn(self._segments, "docmap")
+        self._fingerprints = SegmentedDocColumn(self._segments, "fingerprints")
+        self._positions = (
+            SegmentedPositions(self._segments, term_count)
+            if has_positions(self._segments)
+            else None
+        )
+        self._average_document_length = (
+            _average(self._docmap) if average_document_length is None else average_document_length
+        )
+        self._changed()
+        self._statistics = statistics
+
+    def _mutable(self) -> tuple[dict[str, PostingList], dict[int, int], dict[int, int]]:
+        # Lazily mapped stores are read-only, so the first update materializes them.
+        if not isinstance(self._index, dict):
+            self._index = dict(self._index)
+        if not isinstance(self._docmap, dict):
+            self._docmap = dict(self._docmap)
+        if not isinstance(self._fingerprints, dict):
+            self._fingerprints = dict(self._fingerprints)
+        return self._index, self._docmap, self._fingerprints
+
+    def _mutable_positions(self) -> dict[str, PositionList]:
+        if not isinstance(self._positions, dict):
+            self._positions = dict(self._positions or {})
+        return self._positions
+
+    def _tombstone(self, segments: list[Segment], doc_ids: Collection[int]) -> int:
+        """Mark live copies of ``doc_ids`` deleted, returning their total length."""
+        removed_length = 0
+        for position, segment in enumerate(segments):
+            dead = [doc_id for doc_id in doc_ids if segment.is_live(doc_id)]
+            if dead:
+                removed_length += sum(segment.docmap[doc_id] for doc_id in dead)
+                segments[position] = segment.with_deleted(dead)
+        return removed_length
+
+    def _count_live(self, tokens: Iterable[str] | None) -> tuple[set[str], int] | None:
+        """Return the terms an update may revive or empty and how many are live now.
+
+        ``None`` means the count cannot be kept, because it is already unknown
+        or the tokens of the replaced documents are.
+        """
+        if self._term_count is None or tokens is None:
+            return None
+        candidates = set(tokens)
+        return candidates, sum(token in self._index for token in candidates)
+
+    def _recount(self, counted: tuple[set[str], int] | None) -> None:
+        assert self._segments is not None
+        if counted is None or self._term_count is None:
+            self._term_count = None
+        else:
+            candidates, live = counted
+            self._term_count += sum(token in self._index for token in candidates) - live
+        self._index = SegmentedPostings(self._segments, self._term_count)
+        if self._positions is not None:
+            self._positions = SegmentedPositions(self._segments, self._term_count)
+
+    def _total_length(self) -> int:
+        # Lengths are integers, so the total recovered from the average is exact
+        # and the adjusted average equals the one a rebuild would compute.
+        return round(self._average_document_length * len(self._docmap))
+
+    def _set_total_length(self, total_length: int) -> None:
+        count = len(self._docmap)
+        self._average_document_length = total_length / count if count else 0.0
+        self._changed()
+
+    def _changed(self) -> None:
+        self._statistics = None
+        self._generation = next(_GENERATIONS)
+
+    def _remove_postings(self, index: dict[str, PostingList], doc_ids: Collection[int]) -> None:
+        if not doc_ids:
+            return
+        for token, postings in list(index.items()):
+            remaining = postings.without(doc_ids)
+            if not remaining:
+                del index[token]
+            elif remaining is not postings:
+                index[token] = remaining
+
+    def _remove_positions(
+        self, positions: dict[str, PositionList], doc_ids: Collection[int]
+    ) -> None:
+        if not doc_ids:
+            return
+        for token, token_positions in list(positions.items()):
+            remaining = token_positions.without(doc_ids)
+            if not remaining:
+                del positions[token]
+            elif remaining is not token_positions:
+                positions[token] = remaining
+
+
+def content_fingerprint(movie: Movie) -> int:
+    """Return a stable 64-bit hash of the text a movie is indexed from."""
+    digest = hashlib.blake2b(
+        f"{movie.title}\x1f{movie.description}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+# Several queued shards per worker keep the pool busy when shard costs are uneven.
+_SHARDS_PER_WORKER = 4
+
+_Pending = dict[str, tuple[array[int], array[int]]]
+
+
+@dataclass(slots=True)
+class _Partial:
+    docmap: dict[int, int] = field(default_factory=dict)
+    fingerprints: dict[int, int] = field(default_factory=dict)
+    pending: _Pending = field(default_factory=dict)
+    # Encoded positions per token, parallel to the doc IDs in ``pending``.
+    positions: dict[str, list[bytes]] = field(default_factory=dict)
+
+
+def _index_shard(
+    movies: Iterable[Movie],
+    stopwords: set[str],
+    tokenizer: Callable[[str, set[str]], list[str]],
+    positions: bool = False,
+) -> _Partial:
+    partial = _Partial()
+    try:
+        for movie in movies:
+            tokens = tokenizer(f"{movie.title} {movie.description}", stopwords)
+            partial.docmap[movie.id] = len(tokens)
+            partial.fingerprints[movie.id] = content_fingerprint(movie)
+            token_positions: dict[str, list[int]] = {}
+            if positions:
+                for position, token in enumerate(tokens):
+                    token_positions.setdefault(token, []).append(position)
+            for token, frequency in Counter(tokens).items():
+                doc_ids, frequencies = partial.pending.setdefault(
+                    token, (array(DOC_ID_TYPECODE), array(FREQUENCY_TYPECODE))
+                )
+                doc_ids.append(movie.id)
+                frequencies.append(frequency)
+                if positions:
+                    partial.positions.setdefault(token, []).append(
+                        encode_positions(token_positions[token])
+                    )
+    except OverflowError as exc:
+        raise DataFormatError("Movie IDs must be non-negative 32-bit integers.") from exc
+    return partial
+
+
+def _index_shards(
+    executor: Executor,
+    shards: Iterable[tuple[Movie, ...]],
+    stopwords: set[str],
+    tokenizer: Callable[[str, set[str]], list[str]],
+    positions: bool,
+    max_in_flight: int,
+) -> Iterator[_Partial]:
+    in_flight: deque[Future[_Partial]] = deque()
+    for shard in shards:
+        in_flight.append(executor.submit(_index_shard, shard, stopwords, tokenizer, positions))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def _merge(partials: Iterable[_Partial]) -> _Partial:
+    merged = _Partial()
+    for partial in partials:
+        merged.docmap.update(partial.docmap)
+        merged.fingerprints.update(partial.fingerprints)
+        for token, (doc_ids, frequencies) in partial.pending.items():
+            existing = merged.pending.get(token)
+            if existing is None:
+                merged.pending[token] = (doc_ids, frequencies)
+            else:
+                existing[0].extend(doc_ids)
+                existing[1].extend(frequencies)
+        for token, runs in partial.positions.items():
+            merged.positions.setdefault(token, []).extend(runs)
+    return merged
+
+
+def _finalize(doc_ids: array[int], frequencies: array[int]) -> PostingList:
+    if all(previous < current for previous, current in pairwise(doc_ids)):
+        return PostingList(doc_ids=doc_ids, frequencies=frequencies)
+    # Unordered or repeated movie IDs: the last occurrence wins, as in a dict.
+    return PostingList.from_pairs(dict(zip(doc_ids, frequencies, strict=True)).items())
+
+
+def _finalize_positions(partial: _Partial) -> dict[str, PositionList]:
+    finalized: dict[str, PositionList] = {}
+    for token, runs in partial.positions.items():
+        doc_ids = partial.pending[token][0]
+        if all(previous < current for previous, current in pairwise(doc_ids)):
+            finalized[token] = PositionList(
+                doc_ids=doc_ids,
+                offsets=array(
+                    POSITION_OFFSET_TYPECODE, accumulate((len(run) for run in runs), initial=0)
+                ),
+                data=b"".join(runs),
+            )
+        else:
+            finalized[token] = PositionList.from_runs(dict(zip(doc_ids, runs, strict=True)).items())
+    return finalized
+
+
+def _average(doc_lengths: Mapping[int, int]) -> float:
+    if not doc_lengths:
+        return 0.0
+    return sum(doc_lengths.values()) / len(doc_lengths)
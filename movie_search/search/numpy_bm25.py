@@ -0,0 +1,123 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from movie_search.domain.models import Movie, SearchResult
+from movie_search.profiling import stage
+from movie_search.search.bm25 import BM25Config, BM25SearchEngine, RankCounters
+
+
+class NumpyBM25SearchEngine(BM25SearchEngine):
+    """BM25 ranker that scores a query with array operations over a CSR matrix.
+
+    The term-document matrix (one row of document positions and term
+    frequencies per term) is built once per corpus and reused for as long as
+    ``rank`` keeps receiving the same ``corpus_tokens`` list. Scores and
+    ordering match ``BM25SearchEngine.rank``.
+    """
+
+    def __init__(self, config: BM25Config | None = None) -> None:
+        super().__init__(config)
+        self._corpus_tokens: list[list[str]] | None = None
+        self._vocabulary: dict[str, int] = {}
+        self._indptr: npt.NDArray[np.int64] = np.zeros(1, dtype=np.int64)
+        self._indices: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self._frequencies: npt.NDArray[np.float64] = np.zeros(0, dtype=np.float64)
+        self._doc_lengths: npt.NDArray[np.float64] = np.zeros(0, dtype=np.float64)
+
+    def rank(
+        self,
+        movies: list[Movie],
+        corpus_tokens: list[list[str]],
+        query_tokens: list[str],
+        limit: int,
+        phrases: Sequence[Sequence[str]] = (),
+        counters: RankCounters | None = None,
+    ) -> list[SearchResult]:
+        if limit <= 0 or not movies or not query_tokens:
+            return []
+        if phrases:
+            # Phrase matching needs token positions, which the matrix does not keep.
+            return super().rank(movies, corpus_tokens, query_tokens, limit, phrases, counters)
+
+        if corpus_tokens is not self._corpus_tokens:
+            with stage("document_frequencies"):
+                self._prepare(corpus_tokens)
+
+        num_docs = len(movies)
+        avgdl = float(self._doc_lengths.sum()) / num_docs if num_docs else 0.0
+        if avgdl == 0.0:
+            return []
+
+        k1 = self._config.k1
+        b = self._config.b
+        length_norm = k1 * ((1 - b) + b * self._doc_lengths / avgdl)
+        scores = np.zeros(num_docs, dtype=np.float64)
+        with stage("score"):
+            for query_token in query_tokens:
+                row = self._vocabulary.get(query_token)
+                if row is None:
+                    continue
+                start, end = int(self._indptr[row]), int(self._indptr[row + 1])
+                docs = self._indices[start:end]
+                frequencies = self._frequencies[start:end]
+                idf = math.log((num_docs - (end - start) + 0.5) / ((end - start) + 0.5) + 1.0)
+                denominator = frequencies + length_norm[docs]
+                contribution = np.where(
+                    denominator > 0,
+                    idf * (frequencies * (k1 + 1)) / np.where(denominator > 0, denominator, 1.0),
+                    0.0,
+                )
+                scores[docs] += contribution
+                if counters is not None:
+                    counters.postings += end - start
+
+        with stage("sort"):
+            candidates = np.flatnonzero(scores > 0)
+            if counters is not None:
+                counters.scored += int(candidates.size)
+            if candidates.size > limit:
+                kth = np.argpartition(-scores[candidates], limit - 1)[limit - 1]
+                cutoff = scores[candidates[kth]]
+                # Keep every tie at the cut-off so the movie-ID tie-break stays exact.
+                candidates = candidates[scores[candidates] >= cutoff]
+
+            movie_ids = np.fromiter((movies[int(doc)].id for doc in candidates), dtype=np.int64)
+            order = np.lexsort((movie_ids, -scores[candidates]))[:limit]
+        return [
+            SearchResult(
+                movie=movies[int(candidates[position])], score=float(scores[candidates[position]])
+            )
+            for position in order
+        ]
+
+    def _prepare(self, corpus_tokens: list[list[str]]) -> None:
+        rows: dict[str, tuple[list[int], list[int]]] = {}
+        for doc, tokens in enumerate(corpus_tokens):
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, frequency in counts.items():
+                docs, frequencies = rows.setdefault(token, ([], []))
+                docs.append(doc)
+                frequencies.append(frequency)
+
+        self._vocabulary = {token: row for row, token in enumerate(rows)}
+        lengths = [len(docs) for docs, _ in rows.values()]
+        self._indptr = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        self._indices = np.fromiter(
+            (doc for docs, _ in rows.values() for doc in docs),
+            dtype=np.int64,
+            count=int(self._indptr[-1]),
+        )
+        self._frequencies = np.fromiter(
+            (frequency for _, frequencies in rows.values() for frequency in frequencies),
+            dtype=np.float64,
+            count=int(self._indptr[-1]),
+        )
+        self._doc_lengths = np.fromiter(
+            (len(tokens) for tokens in corpus_tokens), dtype=np.float64, count=len(corpus_tokens)
+        )
+        self._corpus_tokens = corpus_tokens
@@ -0,0 +1,31 @@
+from collections.abc import Sequence
+
+
+def contains_phrase(token_positions: Sequence[Sequence[int]]) -> bool:
+    """Return whether the i-th positions hold some ``start + i`` for a common ``start``.
+
+    ``token_positions`` lists the positions of each phrase token in one document.
+    """
+    if not token_positions:
+        return False
+    starts = set(token_positions[0])
+    for offset, positions in enumerate(token_positions[1:], start=1):
+        starts.intersection_update(position - offset for position in positions)
+        if not starts:
+            return False
+    return bool(starts)
+
+
+def minimum_distance(left: Sequence[int], right: Sequence[int]) -> int | None:
+    """Return the smallest gap between two sorted position lists, or ``None`` if one is empty."""
+    best: int | None = None
+    i = j = 0
+    while i < len(left) and j < len(right):
+        gap = abs(left[i] - right[j])
+        if best is None or gap < best:
+            best = gap
+        if left[i] < right[j]:
+            i += 1
+        else:
+            j += 1
+    return best
@@ -0,0 +1,219 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from itertools import accumulate
+
+DOC_ID_TYPECODE = "I"
+FREQUENCY_TYPECODE = "I"
+IMPACT_TYPECODE = "B"
+POSITION_OFFSET_TYPECODE = "I"
+
+# Impacts quantize a term's scores to 1..IMPACT_LEVELS of its maximum score.
+IMPACT_LEVELS = 255
+
+
+@dataclass(frozen=True, slots=True)
+class PostingList:
+    """Doc-ID-sorted postings held in compact typed arrays."""
+
+    doc_ids: array[int]
+    frequencies: array[int]
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[int, int]]) -> "PostingList":
+        ordered = sorted(pairs)
+        return cls(
+            doc_ids=array(DOC_ID_TYPECODE, (doc_id for doc_id, _ in ordered)),
+            frequencies=array(FREQUENCY_TYPECODE, (frequency for _, frequency in ordered)),
+        )
+
+    @classmethod
+    def empty(cls) -> "PostingList":
+        return cls(doc_ids=array(DOC_ID_TYPECODE), frequencies=array(FREQUENCY_TYPECODE))
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.doc_ids)
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        return zip(self.doc_ids, self.frequencies, strict=True)
+
+    def frequency(self, doc_id: int) -> int:
+        position = bisect_left(self.doc_ids, doc_id)
+        if position < len(self.doc_ids) and self.doc_ids[position] == doc_id:
+            return self.frequencies[position]
+        return 0
+
+    def without(self, doc_ids: Collection[int]) -> "PostingList":
+        """Return the postings minus ``doc_ids``, or ``self`` if none are present."""
+        if len(doc_ids) < len(self.doc_ids):
+            if not any(self.frequency(doc_id) for doc_id in doc_ids):
+                return self
+        elif not any(doc_id in doc_ids for doc_id in self.doc_ids):
+            return self
+        return PostingList(
+            doc_ids=array(
+                DOC_ID_TYPECODE, (doc_id for doc_id in self.doc_ids if doc_id not in doc_ids)
+            ),
+            frequencies=array(
+                FREQUENCY_TYPECODE,
+                (frequency for doc_id, frequency in self.items() if doc_id not in doc_ids),
+            ),
+        )
+
+    def to_dict(self) -> dict[int, int]:
+        return dict(self.items())
+
+
+EMPTY_POSTINGS = PostingList.empty()
+
+
+def intersect(postings: Sequence[PostingList]) -> Iterator[int]:
+    """Yield the doc IDs present in every posting list, in ascending order.
+
+    Lists are taken rarest first. Each candidate is searched for in the other
+    lists by galloping forward from the previous match, and a miss gallops the
+    candidate list forward to the doc ID that was found instead, so the work
+    follows the shortest list rather than the longest and no sets are built.
+    """
+    if not postings:
+        return
+    shortest, *others = sorted((entry.doc_ids for entry in postings), key=len)
+    cursors = [0] * len(others)
+    position = 0
+    while position < len(shortest):
+        doc_id = shortest[position]
+        for index, doc_ids in enumerate(others):
+            cursor = cursors[index] = gallop(doc_ids, doc_id, cursors[index])
+            if cursor == len(doc_ids):
+                return
+            if doc_ids[cursor] != doc_id:
+                position = gallop(shortest, doc_ids[cursor], position + 1)
+                break
+        else:
+            yield doc_id
+            position += 1
+
+
+def gallop(doc_ids: array[int], doc_id: int, start: int) -> int:
+    """Return the first position from ``start`` on holding a doc ID of at least ``doc_id``.
+
+    Probes ``start + 1``, ``start + 2``, ``start + 4``, ... before a binary
+    search, so the cost grows with the log of the distance skipped.
+    """
+    size = len(doc_ids)
+    if start >= size or doc_ids[start] >= doc_id:
+        return start
+    low, step = start, 1
+    high = start + 1
+    while high < size and doc_ids[high] < doc_id:
+        low = high
+        step *= 2
+        high = low + step
+    return bisect_left(doc_ids, doc_id, low + 1, min(high, size))
+
+
+@dataclass(frozen=True, slots=True)
+class ImpactPostings:
+    """Postings of one term ordered by descending BM25 score, ties by ascending doc ID.
+
+    ``impacts`` holds each score quantized up to the next of ``IMPACT_LEVELS``
+    steps of the term's maximum score, so ``impact * max_score / IMPACT_LEVELS``
+    bounds the score of that posting and of every posting after it.
+    """
+
+    doc_ids: array[int]
+    frequencies: array[int]
+    impacts: array[int]
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class PositionList:
+    """Token positions of one term in every document that contains it.
+
+    Documents are sorted by ID as in a ``PostingList``, and
+    ``data[offsets[i]:offsets[i + 1]]`` holds the positions in ``doc_ids[i]``
+    as varint-encoded gaps. A document's positions are only decoded when asked
+    for, and ``runs`` hands out the encoded bytes so lists can be merged
+    without decoding them.
+    """
+
+    doc_ids: array[int]
+    offsets: array[int]
+    data: bytes
+
+    @classmethod
+    def from_runs(cls, runs: Iterable[tuple[int, bytes]]) -> "PositionList":
+        ordered = sorted(runs)
+        return cls(
+            doc_ids=array(DOC_ID_TYPECODE, (doc_id for doc_id, _ in ordered)),
+            offsets=array(
+                POSITION_OFFSET_TYPECODE, accumulate((len(run) for _, run in ordered), initial=0)
+            ),
+            data=b"".join(run for _, run in ordered),
+        )
+
+    @classmethod
+    def empty(cls) -> "PositionList":
+        return cls(
+            doc_ids=array(DOC_ID_TYPECODE), offsets=array(POSITION_OFFSET_TYPECODE, [0]), data=b""
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def runs(self) -> Iterator[tuple[int, bytes]]:
+        """Yield ``(doc_id, encoded_positions)`` pairs in doc ID order."""
+        for position, doc_id in enumerate(self.doc_ids):
+            yield doc_id, self.data[self.offsets[position] : self.offsets[position + 1]]
+
+    def positions(self, doc_id: int) -> list[int]:
+        position = bisect_left(self.doc_ids, doc_id)
+        if position < len(self.doc_ids) and self.doc_ids[position] == doc_id:
+            return decode_positions(self.data[self.offsets[position] : self.offsets[position + 1]])
+        return []
+
+    def without(self, doc_ids: Collection[int]) -> "PositionList":
+        """Return the positions minus ``doc_ids``, or ``self`` if none are present."""
+        if not any(doc_id in doc_ids for doc_id in self.doc_ids):
+            return self
+        return PositionList.from_runs(
+            (doc_id, run) for doc_id, run in self.runs() if doc_id not in doc_ids
+        )
+
+
+EMPTY_POSITIONS = PositionList.empty()
+
+
+def encode_positions(positions: Iterable[int]) -> bytes:
+    """Encode increasing token positions as LEB128 varints of their gaps."""
+    encoded = bytearray()
+    previous = 0
+    for position in positions:
+        gap = position - previous
+        previous = position
+        while gap >= 0x80:
+            encoded.append(gap & 0x7F | 0x80)
+            gap >>= 7
+        encoded.append(gap)
+    return bytes(encoded)
+
+
+def decode_positions(data: bytes) -> list[int]:
+    positions: list[int] = []
+    position = gap = shift = 0
+    for byte in data:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        position += gap
+        positions.append(position)
+        gap = shift = 0
+    return positions
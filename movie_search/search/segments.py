@@ -0,0 +1,217 @@
+from collections.abc import Callable, Collection, Iterator, Mapping, Sequence
+from dataclasses import dataclass, replace
+from itertools import chain
+from typing import Literal
+
+from movie_search.search.postings import PositionList, PostingList
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    """One immutable slice of the index plus tombstones for its deleted documents.
+
+    ``name`` is assigned by the store that persisted the segment and is
+    ``None`` for segments that only exist in memory. ``positions`` is ``None``
+    when the segment was indexed without token positions.
+    """
+
+    index: Mapping[str, PostingList]
+    docmap: Mapping[int, int]
+    fingerprints: Mapping[int, int]
+    positions: Mapping[str, PositionList] | None = None
+    deleted: frozenset[int] = frozenset()
+    name: str | None = None
+
+    def live_count(self) -> int:
+        return len(self.docmap) - len(self.deleted)
+
+    def is_live(self, doc_id: int) -> bool:
+        return doc_id not in self.deleted and doc_id in self.docmap
+
+    def live_postings(self, token: str) -> PostingList | None:
+        postings = self.index.get(token)
+        if postings is None or not self.deleted:
+            return postings
+        return postings.without(self.deleted)
+
+    def live_positions(self, token: str) -> PositionList | None:
+        positions = self.positions.get(token) if self.positions is not None else None
+        if positions is None or not self.deleted:
+            return positions
+        return positions.without(self.deleted)
+
+    def with_deleted(self, doc_ids: Collection[int]) -> "Segment":
+        return replace(self, deleted=self.deleted | set(doc_ids))
+
+
+class SegmentedPostings(Mapping[str, PostingList]):
+    """Term dictionary that merges the live postings of every segment on access.
+
+    Each document is live in at most one segment, so merging is a union.
+    ``term_count`` is the number of live terms in ``segments``, or a function
+    that counts them when first asked; it is trusted until the segments change.
+    """
+
+    def __init__(
+        self, segments: Sequence[Segment], term_count: int | Callable[[], int] | None = None
+    ) -> None:
+        self._segments = segments
+        self._counted = _TermCount(segments, term_count)
+
+    def __getitem__(self, token: str) -> PostingList:
+        parts = [
+            postings
+            for segment in self._segments
+            if (postings := segment.live_postings(token)) is not None and postings
+        ]
+        if not parts:
+            raise KeyError(token)
+        if len(parts) == 1:
+            return parts[0]
+        return PostingList.from_pairs(chain.from_iterable(part.items() for part in parts))
+
+    def __contains__(self, token: object) -> bool:
+        if not isinstance(token, str):
+            return False
+        return any(
+            (postings := segment.live_postings(token)) is not None and postings
+            for segment in self._segments
+        )
+
+    def __len__(self) -> int:
+        count = self._counted.get(self._segments)
+        return sum(1 for _ in self) if count is None else count
+
+    def __iter__(self) -> Iterator[str]:
+        seen: set[str] = set()
+        for segment in self._segments:
+            for token in segment.index:
+                if token not in seen and token in self:
+                    seen.add(token)
+                    yield token
+
+
+class SegmentedPositions(Mapping[str, PositionList]):
+    """Token positions merged from the live documents of every segment on access.
+
+    Only valid when every segment recorded positions, so every term has them
+    and ``term_count`` is the same as for ``SegmentedPostings``.
+    """
+
+    def __init__(
+        self, segments: Sequence[Segment], term_count: int | Callable[[], int] | None = None
+    ) -> None:
+        self._segments = segments
+        self._counted = _TermCount(segments, term_count)
+
+    def __getitem__(self, token: str) -> PositionList:
+        parts = [
+            positions
+            for segment in self._segments
+            if (positions := segment.live_positions(token)) is not None and positions
+        ]
+        if not parts:
+            raise KeyError(token)
+        if len(parts) == 1:
+            return parts[0]
+        return PositionList.from_runs(chain.from_iterable(part.runs() for part in parts))
+
+    def __len__(self) -> int:
+        count = self._counted.get(self._segments)
+        return sum(1 for _ in self) if count is None else count
+
+    def __iter__(self) -> Iterator[str]:
+        seen: set[str] = set()
+        for segment in self._segments:
+            for token in segment.positions or ():
+                if token not in seen and segment.live_positions(token):
+                    seen.add(token)
+                    yield token
+
+
+class _TermCount:
+    """Number of live terms in a set of segments, counted at most once."""
+
+    __slots__ = ("_segments", "_count")
+
+    def __init__(self, segments: Sequence[Segment], count: int | Callable[[], int] | None) -> None:
+        # Callers may tombstone or append to ``segments`` in place, so the count
+        # is kept with a snapshot of the segments it was stored for.
+        self._segments = tuple(segments) if count is not None else ()
+        self._count = count
+
+    def get(self, segments: Sequence[Segment]) -> int | None:
+        """Return the count for ``segments``, or ``None`` if only a full scan can tell."""
+        if (
+            self._count is not None
+            and len(segments) == len(self._segments)
+            and all(left is right for left, right in zip(segments, self._segments, strict=True))
+        ):
+            if not isinstance(self._count, int):
+                self._count = self._count()
+            return self._count
+        if len(segments) == 1 and not segments[0].deleted:
+            return len(segments[0].index)
+        return None
+
+
+def has_positions(segments: Sequence[Segment]) -> bool:
+    return bool(segments) and all(segment.positions is not None for segment in segments)
+
+
+class SegmentedDocColumn(Mapping[int, int]):
+    """Per-document values (lengths or fingerprints) read from the live segments."""
+
+    def __init__(
+        self, segments: Sequence[Segment], column: Literal["docmap", "fingerprints"]
+    ) -> None:
+        self._segments = segments
+        self._column = column
+
+    def __getitem__(self, doc_id: int) -> int:
+        for segment in reversed(self._segments):
+            if doc_id in segment.deleted:
+                continue
+            value = getattr(segment, self._column).get(doc_id)
+            if value is not None:
+                return int(value)
+        raise KeyError(doc_id)
+
+    def __len__(self) -> int:
+        return sum(segment.live_count() for segment in self._segments)
+
+    def __iter__(self) -> Iterator[int]:
+        for segment in self._segments:
+            for doc_id in segment.docmap:
+                if doc_id not in segment.deleted:
+                    yield doc_id
+
+
+def merge_segments(segments: Sequence[Segment]) -> Segment:
+    """Combine the live documents of ``segments`` into one in-memory segment."""
+    pairs: dict[str, list[tuple[int, int]]] = {}
+    docmap: dict[int, int] = {}
+    fingerprints: dict[int, int] = {}
+    for segment in segments:
+        for token in segment.index:
+            postings = segment.live_postings(token)
+            if postings:
+                pairs.setdefault(token, []).extend(postings.items())
+        for doc_id, length in segment.docmap.items():
+            if doc_id not in segment.deleted:
+                docmap[doc_id] = length
+                fingerprints[doc_id] = segment.fingerprints.get(doc_id, 0)
+    return Segment(
+        index={token: PostingList.from_pairs(items) for token, items in sorted(pairs.items())},
+        docmap=dict(sorted(docmap.items())),
+        fingerprints=dict(sorted(fingerprints.items())),
+        positions=merge_positions(segments),
+    )
+
+
+def merge_positions(segments: Sequence[Segment]) -> dict[str, PositionList] | None:
+    """Combine the live token positions of ``segments``, or ``None`` if any lacks them."""
+    if not has_positions(segments):
+        return None
+    merged = SegmentedPositions(segments)
+    return {token: merged[token] for token in sorted(merged)}
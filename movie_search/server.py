@@ -0,0 +1,357 @@
+"""Long-running query server that keeps the catalog and index warm.
+
+Requests are plain HTTP ``GET``s with JSON responses, served on localhost TCP
+or on a Unix domain socket::
+
+    GET /search?q=matrix&limit=5   -> {"query": "matrix", "results": [movie, ...]}
+    GET /lookup?term=matrix        -> {"term": "matrix", "doc_ids": [1, 2]}
+    GET /stats                     -> {"document_count": ..., "token_count": ..., ...}
+    GET /health                    -> {"status": "ok", "in_flight": ..., "cache": {...}, ...}
+    GET /metrics                   -> Prometheus text format (see ``metrics``)
+
+Errors are returned as ``{"error": message}`` with a 4xx or 5xx status.
+
+The server runs on asyncio. Ranking and index reads are CPU-bound, so they run
+in an executor with at most ``max_concurrency`` at a time; up to
+``max_pending`` more wait for a slot and anything beyond that is rejected with
+``503`` straight away, which keeps queueing delay bounded under bursts.
+Concurrent searches with the same tokens, phrases and limit share one computation.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from movie_search.application.index_service import IndexService
+from movie_search.application.metrics import CONTENT_TYPE, METRICS, Sample, SearchMetrics
+from movie_search.application.search_service import SearchService
+from movie_search.domain.exceptions import IndexStoreError, MovieSearchError
+from movie_search.settings import (
+    DEFAULT_HOST,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_PENDING,
+    DEFAULT_PORT,
+)
+
+# A dict is sent as JSON and a string as Prometheus text.
+Response = tuple[HTTPStatus, dict[str, Any] | str]
+
+
+class QueryApi:
+    """Routes query API requests to services that stay loaded between requests.
+
+    ``executor`` runs the blocking service calls; by default a thread pool with
+    ``max_concurrency`` workers is used, since the loaded index lives in this
+    process and ranking mostly reads shared, immutable structures. Each call in
+    the executor first checks the stores' versions, so the services reload once
+    index commands in another process change the index.
+    """
+
+    def __init__(
+        self,
+        search_service: SearchService,
+        index_service: IndexService,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        executor: Executor | None = None,
+        metrics: SearchMetrics | None = None,
+    ) -> None:
+        self._search_service = search_service
+        self._index_service = index_service
+        self._metrics = metrics or METRICS
+        self._max_concurrency = max_concurrency
+        self._max_admitted = max_concurrency + max_pending
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="movie-search-query"
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._admitted = 0
+        self._in_flight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._index_loaded = False
+        self._index_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._versions = self._store_versions()
+        self.counters = {"requests": 0, "coalesced": 0, "rejected": 0}
+
+    def warm(self) -> None:
+        self._search_service.warm()
+        try:
+            self._load_index()
+        except IndexStoreError:
+            # Searching may scan the corpus without an index; lookup and stats
+            # retry the load and report the error until an index is built.
+            pass
+
+    async def handle(self, path: str, params: Mapping[str, Sequence[str]]) -> Response:
+        self.counters["requests"] += 1
+        try:
+            if path == "/search":
+                query = _param(params, "q")
+                limit = _int_param(params, "limit", 5)
+                movies = await self._search(query, limit)
+                return HTTPStatus.OK, {
+                    "query": query,
+                    "results": [movie.to_dict() for movie in movies],
+                }
+            if path == "/lookup":
+                term = _param(params, "term")
+                doc_ids = await self._run(lambda: self._lookup(term))
+                return HTTPStatus.OK, {"term": term, "doc_ids": doc_ids}
+            if path == "/stats":
+                return HTTPStatus.OK, dict(await self._run(self._stats))
+            if path == "/health":
+                return HTTPStatus.OK, {
+                    "status": "ok",
+                    "in_flight": self._admitted,
+                    **self.counters,
+                    "cache": self._search_service.cache_stats(),
+                }
+            if path == "/metrics":
+                return HTTPStatus.OK, self._metrics.render(self._server_samples())
+        except _BadRequest as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except _Busy:
+            self.counters["rejected"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server is busy; retry later."}
+        except IndexStoreError as exc:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)}
+        except MovieSearchError as exc:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {path}"}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _search(self, query: str, limit: int) -> Any:
+        # Analysis may read the stopwords file or import the stemmer, so it stays off the loop.
+        parsed = await self._run(lambda: self._search_service.analyze(query))
+        # Queries without tokens rank nothing; only a blank query lists movies.
+        key = ("search", parsed, limit, not parsed.tokens and query.strip() == "")
+        return await self._coalesce(
+            key, lambda: self._run(lambda: self._search_service.search(query=query, limit=limit))
+        )
+
+    async def _coalesce(self, key: Hashable, start: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(start())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.counters["coalesced"] += 1
+        # A disconnecting client must not cancel a computation others wait on.
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, done: asyncio.Future[Any]) -> None:
+        if self._in_flight.get(key) is done:
+            del self._in_flight[key]
+
+    async def _run(self, call: Callable[[], Any]) -> Any:
+        if self._admitted >= self._max_admitted:
+            raise _Busy
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_concurrency)
+        self._admitted += 1
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slots:
+                return await loop.run_in_executor(
+                    self._executor, lambda: self._call_current(loop, call)
+                )
+        finally:
+            self._admitted -= 1
+
+    def _call_current(self, loop: asyncio.AbstractEventLoop, call: Callable[[], Any]) -> Any:
+        """Run ``call`` after reloading the services if another process changed a store."""
+        if self._store_versions() != self._versions:
+            with self._reload_lock:
+                versions = self._store_versions()
+                if versions != self._versions:
+                    # Computations started before the change must not answer later requests.
+                    loop.call_soon_threadsafe(self._in_flight.clear)
+                    self._search_service.reload()
+                    with self._index_lock:
+                        self._index_loaded = False
+                    self._versions = versions
+        return call()
+
+    def _server_samples(self) -> list[Sample]:
+        return [
+            Sample(
+                f"movie_search_server_{name}_total",
+                "counter",
+                f"Server requests: {name}.",
+                value,
+            )
+            for name, value in self.counters.items()
+        ] + [
+            Sample(
+                "movie_search_server_in_flight",
+                "gauge",
+                "Requests running or waiting for a slot.",
+                self._admitted,
+            )
+        ]
+
+    def _lookup(self, term: str) -> list[int]:
+        self._load_index()
+        return self._index_service.lookup(term)
+
+    def _stats(self) -> dict[str, int | float]:
+        self._load_index()
+        return self._index_service.stats()
+
+    def _load_index(self) -> None:
+        with self._index_lock:
+            if not self._index_loaded:
+                self._index_service.load()
+                self._index_loaded = True
+
+    def _store_versions(self) -> tuple[Hashable, Hashable]:
+        return self._search_service.version(), self._index_service.version()
+
+
+class _BadRequest(Exception):
+    pass
+
+
+class _Busy(Exception):
+    pass
+
+
+def _param(params: Mapping[str, Sequence[str]], name: str) -> str:
+    values = params.get(name)
+    if not values:
+        raise _BadRequest(f"Missing required parameter '{name}'.")
+    return values[0]
+
+
+def _int_param(params: Mapping[str, Sequence[str]], name: str, default: int) -> int:
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        return int(values[0])
+    except ValueError as exc:
+        raise _BadRequest(f"Parameter '{name}' must be an integer.") from exc
+
+
+class QueryServer:
+    """HTTP/1.1 front end for ``QueryApi`` on asyncio streams."""
+
+    def __init__(
+        self,
+        api: QueryApi,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        socket_path: Path | None = None,
+    ) -> None:
+        self._api = api
+        self._host = host
+        self._port = port
+        self._socket_path = socket_path
+        self._server: asyncio.Server | None = None
+
+    @property
+    def address(self) -> str:
+        if self._socket_path is not None:
+            return f"unix:{self._socket_path}"
+        if self._server is not None:
+            host, port = self._server.sockets[0].getsockname()[:2]
+            return f"http://{host}:{port}"
+        return f"http://{self._host}:{self._port}"
+
+    async def start(self) -> None:
+        if self._socket_path is not None:
+            if self._socket_path.is_socket():
+                self._socket_path.unlink()
+            self._server = await asyncio.start_unix_server(
+                self._serve_connection, path=self._socket_path
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._serve_connection, host=self._host, port=self._port
+            )
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if self._socket_path is not None:
+                try:
+                    os.unlink(self._socket_path)
+                except FileNotFoundError:
+                    pass
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while await self._serve_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer one request and return whether the connection stays open."""
+        request_line = await reader.readline()
+        if not request_line:
+            return False
+        parts = request_line.decode("latin-1").split()
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if length := int(headers.get("content-length", "0")):
+            await reader.readexactly(length)
+
+        payload: dict[str, Any] | str
+        if len(parts) != 3:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": "Malformed request line."}
+            keep_alive = False
+        else:
+            method, target, version = parts
+            keep_alive = version == "HTTP/1.1" and headers.get("connection") != "close"
+            if method != "GET":
+                status, payload = HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported."}
+            else:
+                url = urlsplit(target)
+                status, payload = await self._api.handle(
+                    url.path, parse_qs(url.query, keep_blank_values=True)
+                )
+
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), CONTENT_TYPE
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+        return keep_alive
@@ -1,7 +1,24 @@
+import os
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
-CACHE_DIR = PROJECT_ROOT / "cache"
-MOVIES_PATH = DATA_DIR / "movies.json"
+CACHE_DIR = Path(os.environ.get("MOVIE_SEARCH_CACHE_DIR", PROJECT_ROOT / "cache"))
+# A ".jsonl" path selects the JSON Lines catalog format.
+MOVIES_PATH = Path(os.environ.get("MOVIE_SEARCH_MOVIES_PATH", DATA_DIR / "movies.json"))
 STOPWORDS_PATH = DATA_DIR / "stopwords.txt"
+# When set (e.g. "http://127.0.0.1:8765" or "unix:/tmp/movie-search.sock"), search,
+# lookup and stats are answered by a running `movie-search serve` daemon.
+SERVER_ADDRESS = os.environ.get("MOVIE_SEARCH_SERVER")
+# "builtin" stems with the dependency-free Porter stemmer instead of nltk's; both
+# give the same stems, so indexes built with either can be searched with the other.
+STEMMER = os.environ.get("MOVIE_SEARCH_STEMMER", "nltk")
+# "unicode" case-folds and also deletes non-ASCII punctuation; ASCII text is tokenized the
+# same either way, but an index must be rebuilt after switching if the catalog has other text.
+TOKENIZER = os.environ.get("MOVIE_SEARCH_TOKENIZER", "ascii")
+
+# Defaults of `movie-search serve`, kept here so parsing arguments needs no asyncio.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_PENDING = 64
@@ -0,0 +1,28 @@
+"""Catalog and stopwords stand-ins shared by the test modules."""
+
+from collections.abc import Iterable, Iterator
+
+from movie_search.domain.models import Movie
+
+
+class StubMovieRepository:
+    """Catalog over a list the test may change; ``load_count`` counts full loads."""
+
+    def __init__(self, movies: list[Movie]) -> None:
+        self._movies = movies
+        self.load_count = 0
+
+    def load_movies(self) -> list[Movie]:
+        self.load_count += 1
+        return self._movies
+
+    def iter_movies(self) -> Iterator[Movie]:
+        return iter(self._movies)
+
+
+class StubStopwordsRepository:
+    def __init__(self, stopwords: Iterable[str] = ("the",)) -> None:
+        self._stopwords = set(stopwords)
+
+    def load_stopwords(self) -> set[str]:
+        return self._stopwords
@@ -0,0 +1,158 @@
+import json
+from collections import Counter
+
+import pytest
+
+from movie_search.benchmarks.__main__ import main
+from movie_search.benchmarks.compare import compare_results
+from movie_search.benchmarks.corpus import SyntheticCorpus, parse_scale
+from movie_search.benchmarks.runner import percentile, run_benchmarks
+from movie_search.benchmarks.startup import ImportTime, parse_importtime, run_startup
+from movie_search.benchmarks.tokenizers import benchmark_texts, run_tokenizers
+from movie_search.infra.json_repository import JsonLinesMovieRepository
+
+
+def test_synthetic_corpus_is_deterministic_and_zipfian() -> None:
+    corpus = SyntheticCorpus(seed=3, vocabulary_size=500)
+
+    movies = list(corpus.movies(300))
+    assert movies == list(SyntheticCorpus(seed=3, vocabulary_size=500).movies(300))
+    assert movies != list(SyntheticCorpus(seed=4, vocabulary_size=500).movies(300))
+    assert [movie.id for movie in movies] == list(range(1, 301))
+    assert corpus.queries(20) == SyntheticCorpus(seed=3, vocabulary_size=500).queries(20)
+
+    counts = Counter(
+        word for movie in movies for word in f"{movie.title} {movie.description}".lower().split()
+    )
+    ranked = [count for _, count in counts.most_common()]
+    assert ranked[0] > 10 * ranked[len(ranked) // 2]
+
+
+def test_parse_scale_accepts_names_and_suffixed_counts() -> None:
+    assert parse_scale("10k") == 10_000
+    assert parse_scale("1M") == 1_000_000
+    assert parse_scale("250") == 250
+    assert parse_scale("25k") == 25_000
+
+    for value in ("", "k", "0", "ten"):
+        with pytest.raises(ValueError):
+            parse_scale(value)
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile([4.0], 0.9) == 4.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_results_flags_slower_times_and_lower_throughput() -> None:
+    baseline = {
+        "version": 1,
+        "scales": {
+            "100": {
+                "documents": 100,
+                "build": {"seconds": 1.0, "documents_per_second": 100.0},
+                "search": {"index": {"p99_ms": 2.0, "p50_ms": 0.0}},
+                "peak_rss_bytes": 1000,
+            }
+        },
+    }
+    current = {
+        "version": 1,
+        "scales": {
+            "100": {
+                "documents": 200,
+                "build": {"seconds": 1.2, "documents_per_second": 70.0},
+                "search": {"index": {"p99_ms": 3.0, "p50_ms": 5.0, "p90_ms": 9.0}},
+                "peak_rss_bytes": 900,
+            }
+        },
+    }
+
+    regressions = compare_results(current, baseline, tolerance=0.25)
+
+    assert [regression.metric for regression in regressions] == [
+        "scales.100.build.documents_per_second",
+        "scales.100.search.index.p99_ms",
+    ]
+    assert regressions[1].change == pytest.approx(0.5)
+    assert compare_results(current, baseline, tolerance=0.6) == []
+
+
+def test_run_benchmarks_reports_every_stage() -> None:
+    results = run_benchmarks([60], queries=5, seed=1, max_scan_documents=50, isolate=False)
+
+    scale = results["scales"]["60"]
+    assert scale["documents"] == 60
+    assert scale["build"]["documents_per_second"] > 0
+    assert scale["index"]["size_bytes"] > 0
+    assert scale["index"]["documents_size_bytes"] > 0
+    assert set(scale["search"]) == {"index"}
+    assert scale["search"]["index"]["p50_ms"] <= scale["search"]["index"]["p99_ms"]
+    assert compare_results(results, results) == []
+
+    scanned = run_benchmarks([40], queries=5, seed=1, max_scan_documents=50, isolate=False)
+    assert set(scanned["scales"]["40"]["search"]) == {"index", "scan"}
+
+
+def test_cli_generates_catalogs_and_fails_on_regressions(tmp_path, capsys) -> None:
+    catalog = tmp_path / "movies.jsonl"
+    assert main(["generate", str(catalog), "--scale", "25", "--seed", "2"]) == 0
+    assert len(JsonLinesMovieRepository(catalog).load_movies()) == 25
+
+    baseline = tmp_path / "baseline.json"
+    results = tmp_path / "results.json"
+    baseline.write_text(json.dumps({"scales": {"10": {"build": {"seconds": 1.0}}}}))
+    results.write_text(json.dumps({"scales": {"10": {"build": {"seconds": 2.0}}}}))
+
+    assert main(["compare", str(baseline), "--baseline", str(baseline)]) == 0
+    assert main(["compare", str(results), "--baseline", str(baseline)]) == 1
+    assert "scales.10.build.seconds" in capsys.readouterr().err
+    assert main(["compare", str(tmp_path / "missing.json"), "--baseline", str(baseline)]) == 1
+
+
+def test_parse_importtime_reads_self_cumulative_and_depth() -> None:
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            "import time:        80 |        300 | movie_search",
+            "Documents: 3",
+            "import time:       100 |        100 |     movie_search.domain",
+        ]
+    )
+
+    assert parse_importtime(output) == [
+        ImportTime("_io", 120, 120, 1),
+        ImportTime("movie_search", 80, 300, 0),
+        ImportTime("movie_search.domain", 100, 100, 2),
+    ]
+
+
+def test_run_startup_times_each_command_in_a_fresh_interpreter() -> None:
+    results = run_startup(["index stats", "search"], documents=20, repeat=1, stemmer="builtin")
+
+    stats = results["commands"]["index stats"]
+    assert stats["import_ms"] > 0
+    assert stats["wall_ms"] >= stats["import_ms"]
+    assert stats["loaded"]["nltk"] is False
+    assert stats["loaded"]["asyncio"] is False
+    assert results["commands"]["search"]["loaded"]["nltk"] is False
+    assert "movie_search" in stats["slowest_imports"]
+
+
+def test_run_tokenizers_reports_throughput_against_tokenize() -> None:
+    assert benchmark_texts(5, seed=2, kind="unicode") == benchmark_texts(5, seed=2, kind="unicode")
+
+    results = run_tokenizers(30, repeat=1, seed=2)
+
+    assert set(results["texts"]) == {"ascii", "unicode"}
+    ascii_tokenizers = results["texts"]["ascii"]["tokenizers"]
+    assert ascii_tokenizers["tokenize"]["speedup"] == 1.0
+    assert ascii_tokenizers["pipeline_builtin"]["tokens"] == ascii_tokenizers["tokenize"]["tokens"]
+    assert all(timing["tokens_per_second"] > 0 for timing in ascii_tokenizers.values())
+    assert compare_results(results, results) == []
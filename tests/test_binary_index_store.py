@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import pytest
+
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.domain.models import Movie
+from movie_search.domain.tokenization import tokenize
+from movie_search.infra.binary_index_store import BinaryIndexStore
+from movie_search.infra.mmap_index_store import MmapIndexStore
+from movie_search.search.bm25 import BM25Config, BM25SearchEngine
+from movie_search.search.inverted_index import InvertedIndex
+from movie_search.search.postings import PostingList
+
+
+def test_binary_index_store_roundtrip(tmp_path: Path) -> None:
+    store = BinaryIndexStore(tmp_path)
+    index = {
+        "matrix": PostingList.from_pairs([(70000, 3), (1, 1), (300, 1)]),
+        "café": PostingList.from_pairs([(2, 1)]),
+        "action": PostingList.from_pairs([(1, 400)]),
+    }
+    docmap = {70000: 5, 1: 2, 300: 1, 2: 1}
+
+    store.save(
+        index=index,
+        docmap=docmap,
+        average_document_length=2.25,
+        fingerprints={1: 11, 70000: 2**64 - 1},
+    )
+    stored = store.load()
+
+    assert {token: postings.to_dict() for token, postings in stored.index.items()} == {
+        "action": {1: 400},
+        "café": {2: 1},
+        "matrix": {1: 1, 300: 1, 70000: 3},
+    }
+    assert stored.index["matrix"].doc_ids.typecode == "I"
+    assert stored.docmap == {1: 2, 2: 1, 300: 1, 70000: 5}
+    assert stored.average_document_length == 2.25
+    assert stored.fingerprints == {1: 11, 2: 0, 300: 0, 70000: 2**64 - 1}
+
+
+def test_binary_index_store_matches_built_index(tmp_path: Path) -> None:
+    index = InvertedIndex()
+    movies = [Movie(1, "The Matrix", "Sci-fi"), Movie(2, "Matrix Reloaded", "Sci-fi sequel")]
+    index.build(movies=movies, stopwords={"the"}, tokenizer=tokenize)
+    store = BinaryIndexStore(tmp_path)
+
+    store.save(
+        index=index.export_index(),
+        docmap=index.export_docmap(),
+        average_document_length=index.average_document_length(),
+        fingerprints=index.export_fingerprints(),
+    )
+    stored = store.load()
+
+    assert stored.index == index.export_index()
+    assert stored.docmap == index.export_docmap()
+    assert stored.fingerprints == index.export_fingerprints()
+
+
+@pytest.mark.parametrize("store_type", [BinaryIndexStore, MmapIndexStore])
+def test_binary_index_store_persists_bm25_statistics(
+    tmp_path: Path, store_type: type[BinaryIndexStore]
+) -> None:
+    index = InvertedIndex()
+    movies = [Movie(1, "The Matrix", "Sci-fi"), Movie(2, "Matrix Reloaded", "Sci-fi sequel")]
+    index.build(movies=movies, stopwords={"the"}, tokenizer=tokenize)
+    engine = BM25SearchEngine(BM25Config(k1=1.2, b=0.5))
+    statistics = engine.compute_statistics(index, index.terms(), impacts=True)
+    store = store_type(tmp_path)
+
+    store.save(
+        index=index.export_index(),
+        docmap=index.export_docmap(),
+        average_document_length=index.average_document_length(),
+        fingerprints=index.export_fingerprints(),
+        statistics=statistics,
+    )
+    stored = store.load()
+
+    assert stored.statistics is not None
+    assert stored.statistics.config == BM25Config(k1=1.2, b=0.5)
+    assert stored.statistics.document_count == 2
+    assert stored.statistics.average_document_length == index.average_document_length()
+    assert dict(stored.statistics.terms) == statistics.terms
+    assert stored.statistics.impacts is not None
+    assert dict(stored.statistics.impacts) == statistics.impacts
+
+    # Statistics describing a different index are not written.
+    store.save(
+        index=index.export_index(),
+        docmap={1: 2},
+        average_document_length=2.0,
+        fingerprints={},
+        statistics=statistics,
+    )
+    assert store.load().statistics is None
+
+
+@pytest.mark.parametrize("store_type", [BinaryIndexStore, MmapIndexStore])
+def test_binary_index_store_persists_token_positions(
+    tmp_path: Path, store_type: type[BinaryIndexStore]
+) -> None:
+    index = InvertedIndex()
+    movies = [Movie(1, "Star Wars", "Star " * 300 + "wars"), Movie(2, "Wars", "Star")]
+    index.build(movies=movies, stopwords=set(), tokenizer=tokenize, positions=True)
+    positions = index.export_positions()
+    assert positions is not None
+    store = store_type(tmp_path)
+
+    store.save(
+        index=index.export_index(),
+        docmap=index.export_docmap(),
+        average_document_length=index.average_document_length(),
+        fingerprints=index.export_fingerprints(),
+        positions=positions,
+    )
+    stored = store.load()
+
+    assert stored.positions is not None
+    assert dict(stored.positions) == positions
+    assert stored.positions["star"].positions(1) == [0, *range(2, 302)]
+
+    # Positions missing a term are not written.
+    store.save(
+        index=index.export_index(),
+        docmap=index.export_docmap(),
+        average_document_length=index.average_document_length(),
+        fingerprints={},
+        positions={"star": positions["star"]},
+    )
+    assert store.load().positions is None
+
+
+def test_binary_index_store_load_missing_cache_raises(tmp_path: Path) -> None:
+    with pytest.raises(IndexStoreError):
+        BinaryIndexStore(tmp_path).load()
+
+
+def test_binary_index_store_rejects_corrupt_file(tmp_path: Path) -> None:
+    (tmp_path / "index.bin").write_bytes(b"not an index")
+    with pytest.raises(IndexStoreError):
+        BinaryIndexStore(tmp_path).load()
+
+
+def test_binary_index_store_rejects_truncated_postings(tmp_path: Path) -> None:
+    store = BinaryIndexStore(tmp_path)
+    store.save(
+        index={"matrix": PostingList.from_pairs([(1, 1), (2, 1)])},
+        docmap={1: 1, 2: 1},
+        average_document_length=1.0,
+        fingerprints={},
+    )
+    path = tmp_path / "index.bin"
+    path.write_bytes(path.read_bytes()[:-2])
+
+    with pytest.raises(IndexStoreError):
+        store.load()
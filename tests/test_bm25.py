@@ -1,5 +1,10 @@
+import random
+
 from movie_search.domain.models import Movie
-from movie_search.search.bm25 import BM25SearchEngine
+from movie_search.domain.tokenization import tokenize
+from movie_search.search.bm25 import BM25Config, BM25SearchEngine, IndexStatistics
+from movie_search.search.inverted_index import InvertedIndex
+from movie_search.search.postings import PostingList
 
 
 def test_bm25_ranking_and_tiebreaker() -> None:
@@ -26,3 +31,215 @@ def test_bm25_handles_empty_corpus_tokens() -> None:
         movies=movies, corpus_tokens=corpus_tokens, query_tokens=["matrix"], limit=5
     )
     assert results == []
+
+
+def test_bm25_rank_index_matches_exhaustive_ranking() -> None:
+    engine = BM25SearchEngine()
+    movies = [
+        Movie(3, "Simulation", "A movie about simulation"),
+        Movie(1, "The Matrix", "Sci-fi action movie with simulation"),
+        Movie(2, "Matrix Reloaded", "Second Matrix movie"),
+        Movie(4, "Inception", "Dream heist"),
+    ]
+    corpus_tokens = [tokenize(f"{movie.title} {movie.description}", set()) for movie in movies]
+    index = InvertedIndex()
+    index.build(movies=movies, stopwords=set(), tokenizer=tokenize)
+
+    for query in (["matrix"], ["movi", "simul"], ["matrix", "matrix"], ["missing"]):
+        expected = engine.rank(
+            movies=movies, corpus_tokens=corpus_tokens, query_tokens=query, limit=3
+        )
+        actual = engine.rank_index(index=index, query_tokens=query, limit=3)
+        assert [(item.doc_id, item.score) for item in actual] == [
+            (item.movie.id, item.score) for item in expected
+        ]
+
+
+def test_bm25_rank_index_handles_empty_index() -> None:
+    engine = BM25SearchEngine()
+    assert engine.rank_index(index=InvertedIndex(), query_tokens=["matrix"], limit=5) == []
+
+
+def _random_corpus(seed: int) -> tuple[list[Movie], list[list[str]], InvertedIndex]:
+    rng = random.Random(seed)
+    vocabulary = [f"w{number}" for number in range(12)]
+    movies = []
+    for doc_id in rng.sample(range(1, 500), 120):
+        words = rng.choices(vocabulary, weights=range(12, 0, -1), k=rng.randint(0, 8))
+        movies.append(Movie(doc_id, " ".join(words), ""))
+    corpus_tokens = [tokenize(movie.title, set()) for movie in movies]
+    index = InvertedIndex()
+    index.build(movies=movies, stopwords=set(), tokenizer=tokenize)
+    return movies, corpus_tokens, index
+
+
+def test_bm25_rank_index_pruning_matches_exhaustive_on_random_corpora() -> None:
+    rng = random.Random(7)
+    for seed in range(5):
+        movies, corpus_tokens, index = _random_corpus(seed)
+        for config in (BM25Config(), BM25Config(k1=0.9, b=0.4), BM25Config(k1=1.2, b=1.5)):
+            engine = BM25SearchEngine(config)
+            for _ in range(20):
+                query = [f"w{rng.randrange(14)}" for _ in range(rng.randint(1, 4))]
+                limit = rng.choice((1, 3, 5, 20, 200))
+                expected = engine.rank(
+                    movies=movies, corpus_tokens=corpus_tokens, query_tokens=query, limit=limit
+                )
+                actual = engine.rank_index(index=index, query_tokens=query, limit=limit)
+                assert [(item.doc_id, item.score) for item in actual] == [
+                    (item.movie.id, item.score) for item in expected
+                ]
+
+
+def test_bm25_precomputed_statistics_bound_scores_exactly() -> None:
+    rng = random.Random(11)
+    for seed in range(3):
+        movies, corpus_tokens, index = _random_corpus(seed)
+        # b > 1 breaks frequency-only bounds, so pruning relies on the exact ones.
+        for config in (BM25Config(), BM25Config(k1=1.2, b=1.5)):
+            engine = BM25SearchEngine(config)
+            index.set_statistics(engine.compute_statistics(index, index.terms()))
+            statistics = index.statistics()
+            assert statistics is not None
+            for token in index.terms():
+                scores = [
+                    item.score
+                    for item in engine.rank(
+                        movies=movies, corpus_tokens=corpus_tokens, query_tokens=[token], limit=1
+                    )
+                ]
+                assert statistics.terms[token].max_score == scores[0]
+
+            for _ in range(20):
+                query = [f"w{rng.randrange(14)}" for _ in range(rng.randint(1, 4))]
+                expected = engine.rank(
+                    movies=movies, corpus_tokens=corpus_tokens, query_tokens=query, limit=5
+                )
+                actual = engine.rank_index(index=index, query_tokens=query, limit=5)
+                assert [(item.doc_id, item.score) for item in actual] == [
+                    (item.movie.id, item.score) for item in expected
+                ]
+
+
+def test_bm25_rank_index_ignores_statistics_for_another_config() -> None:
+    movies, _, index = _random_corpus(3)
+    index.set_statistics(BM25SearchEngine(BM25Config(k1=0.5)).compute_statistics(index, ["w0"]))
+    engine = BM25SearchEngine()
+    expected = engine.rank_index(index=index, query_tokens=["w0", "w1"], limit=5)
+
+    statistics = index.statistics()
+    assert statistics is not None
+    assert not statistics.applies_to(engine.config, len(movies), index.average_document_length())
+    index.set_statistics(None)
+    assert engine.rank_index(index=index, query_tokens=["w0", "w1"], limit=5) == expected
+
+
+class CountingIndex:
+    def __init__(self, index: InvertedIndex) -> None:
+        self._index = index
+        self.postings_calls = 0
+        self.length_calls = 0
+
+    def postings(self, token: str) -> PostingList:
+        self.postings_calls += 1
+        return self._index.postings(token)
+
+    def document_length(self, doc_id: int) -> int:
+        self.length_calls += 1
+        return self._index.document_length(doc_id)
+
+    def document_count(self) -> int:
+        return self._index.document_count()
+
+    def average_document_length(self) -> float:
+        return self._index.average_document_length()
+
+    def statistics(self) -> IndexStatistics | None:
+        return self._index.statistics()
+
+
+def test_bm25_impact_ordered_postings_match_exhaustive_ranking() -> None:
+    rng = random.Random(5)
+    for seed in range(5):
+        movies, corpus_tokens, index = _random_corpus(seed)
+        for config in (BM25Config(), BM25Config(k1=1.2, b=1.5)):
+            engine = BM25SearchEngine(config)
+            index.set_statistics(engine.compute_statistics(index, index.terms(), impacts=True))
+            for _ in range(30):
+                query = [f"w{rng.randrange(14)}" for _ in range(rng.randint(1, 3))]
+                limit = rng.choice((1, 3, 5, 200))
+                expected = engine.rank(
+                    movies=movies, corpus_tokens=corpus_tokens, query_tokens=query, limit=limit
+                )
+                actual = engine.rank_index(index=index, query_tokens=query, limit=limit)
+                assert [(item.doc_id, item.score) for item in actual] == [
+                    (item.movie.id, item.score) for item in expected
+                ]
+
+
+def test_bm25_single_term_query_reads_only_the_head_of_impact_postings() -> None:
+    _, _, index = _random_corpus(1)
+    engine = BM25SearchEngine()
+    index.set_statistics(engine.compute_statistics(index, index.terms(), impacts=True))
+    counting = CountingIndex(index)
+
+    results = engine.rank_index(index=counting, query_tokens=["w0"], limit=3)
+
+    assert len(index.postings("w0")) > 3
+    index.set_statistics(None)
+    assert results == engine.rank_index(index=index, query_tokens=["w0"], limit=3)
+    assert counting.postings_calls == 0
+    assert counting.length_calls == 3
+
+
+def test_bm25_rank_phrases_filters_phrases_and_boosts_proximity() -> None:
+    movies = [
+        Movie(1, "Star Wars", "An empire far away"),
+        Movie(2, "Star Wars Empire", "Strikes back at last"),
+        Movie(3, "Wars of the star empire", ""),
+        Movie(4, "Empire", "Star wars"),
+    ]
+    stopwords = {"of", "the"}
+    corpus_tokens = [tokenize(f"{movie.title} {movie.description}", stopwords) for movie in movies]
+    index = InvertedIndex()
+    index.build(movies=movies, stopwords=stopwords, tokenizer=tokenize, positions=True)
+    engine = BM25SearchEngine()
+    query_tokens, phrases = ["star", "war", "empir"], [("star", "war")]
+
+    indexed = engine.rank_phrases(index, query_tokens, phrases, limit=5)
+    scanned = engine.rank(movies, corpus_tokens, query_tokens, limit=5, phrases=phrases)
+    unboosted = BM25SearchEngine(BM25Config(proximity=0.0))
+
+    # Movie 3 has every term but not the phrase, and "empire" right after the
+    # phrase lifts the longer movie 2 above movie 1.
+    assert [item.doc_id for item in indexed] == [4, 2, 1]
+    assert [item.doc_id for item in unboosted.rank_phrases(index, query_tokens, phrases, 5)] == [
+        4,
+        1,
+        2,
+    ]
+    assert [(item.movie.id, item.score) for item in scanned] == [
+        (item.doc_id, item.score) for item in indexed
+    ]
+
+
+def test_bm25_single_word_phrases_rank_alike_with_and_without_positions() -> None:
+    movies = [
+        Movie(1, "The Matrix", "Matrix reloaded soon"),
+        Movie(2, "Matrix Reloaded", "A sequel"),
+        Movie(3, "Reloaded", "No match"),
+    ]
+    stopwords = {"the", "a"}
+    corpus_tokens = [tokenize(f"{movie.title} {movie.description}", stopwords) for movie in movies]
+    engine = BM25SearchEngine()
+    query_tokens, phrases = ["matrix", "reload"], [("matrix",)]
+
+    scanned = engine.rank(movies, corpus_tokens, query_tokens, limit=5, phrases=phrases)
+    for positions in (True, False):
+        index = InvertedIndex()
+        index.build(movies=movies, stopwords=stopwords, tokenizer=tokenize, positions=positions)
+        indexed = engine.rank_phrases(index, query_tokens, phrases, limit=5)
+        assert [(item.doc_id, item.score) for item in indexed] == [
+            (item.movie.id, item.score) for item in scanned
+        ]
+    assert sorted(item.movie.id for item in scanned) == [1, 2]
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+
+from movie_search.domain.exceptions import DataFormatError, IndexStoreError
+from movie_search.domain.models import Movie
+from movie_search.infra.document_store import BinaryDocumentStore
+
+MOVIES = [
+    Movie(30, "Heat", "Heist in LA"),
+    Movie(1, "The Matrix", "Action sci-fi"),
+    Movie(7, "Amélie", ""),
+]
+
+
+def test_document_store_roundtrip_keeps_catalog_order(tmp_path: Path) -> None:
+    store = BinaryDocumentStore(tmp_path)
+    store.save(MOVIES)
+
+    documents = store.load()
+
+    assert len(documents) == 3
+    assert documents[7] == Movie(7, "Amélie", "")
+    assert 30 in documents
+    assert 2 not in documents
+    with pytest.raises(KeyError):
+        documents[2]
+    assert list(documents.values()) == MOVIES
+
+
+def test_document_store_keeps_the_last_copy_of_a_repeated_id(tmp_path: Path) -> None:
+    store = BinaryDocumentStore(tmp_path)
+    store.save([*MOVIES, Movie(1, "The Matrix", "Remastered")])
+
+    documents = store.load()
+
+    assert len(documents) == 3
+    assert documents[1].description == "Remastered"
+    assert list(documents) == [30, 7, 1]
+
+
+def test_document_store_update_replaces_in_place_and_appends(tmp_path: Path) -> None:
+    store = BinaryDocumentStore(tmp_path)
+    store.save(MOVIES)
+    before = store.load()
+
+    store.update(upserts=[Movie(1, "The Matrix", "Updated"), Movie(4, "Tenet", "")], deleted=[30])
+
+    assert list(store.load().values()) == [
+        Movie(1, "The Matrix", "Updated"),
+        Movie(7, "Amélie", ""),
+        Movie(4, "Tenet", ""),
+    ]
+    # Readers of the previous file keep a consistent view.
+    assert before[30] == MOVIES[0]
+
+
+def test_document_store_reports_missing_corrupt_and_invalid_data(tmp_path: Path) -> None:
+    store = BinaryDocumentStore(tmp_path)
+    with pytest.raises(IndexStoreError, match="not found"):
+        store.load()
+
+    (tmp_path / "documents.bin").write_bytes(b"not a document file, just text")
+    with pytest.raises(IndexStoreError, match="unknown format"):
+        store.load()
+
+    with pytest.raises(DataFormatError):
+        store.save([Movie(-1, "Negative", "")])
+    assert not (tmp_path / "documents.bin.tmp").exists()
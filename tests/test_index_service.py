@@ -1,8 +1,10 @@
+from collections.abc import Iterator
 from pathlib import Path
 
 from movie_search.application.index_service import IndexService
 from movie_search.domain.models import Movie
 from movie_search.infra.index_store import PickleIndexStore
+from movie_search.search.bm25 import BM25Config
 
 
 class StubMovieRepository:
@@ -12,6 +14,9 @@ class StubMovieRepository:
     def load_movies(self) -> list[Movie]:
         return self._movies
 
+    def iter_movies(self) -> Iterator[Movie]:
+        return iter(self._movies)
+
 
 class StubStopwordsRepository:
     def __init__(self, stopwords: set[str]) -> None:
@@ -47,3 +52,75 @@ def test_index_service_build_lookup_save_load(tmp_path: Path) -> None:
     stats = restored.stats()
     assert stats["document_count"] == 2
     assert stats["token_count"] > 0
+
+
+def test_index_service_sync_applies_catalog_diff(tmp_path: Path) -> None:
+    store = PickleIndexStore(tmp_path)
+    stopwords_repo = StubStopwordsRepository({"the"})
+    builder = IndexService(
+        movie_repository=StubMovieRepository(
+            [Movie(1, "The Matrix", "Action"), Movie(2, "Inception", "Dream")]
+        ),
+        stopwords_repository=stopwords_repo,
+        index_store=store,
+    )
+    builder.build()
+    builder.save()
+
+    catalog = [
+        Movie(1, "The Matrix", "Action"),
+        Movie(2, "Inception", "Heist"),
+        Movie(3, "Heat", ""),
+    ]
+    service = IndexService(
+        movie_repository=StubMovieRepository(catalog),
+        stopwords_repository=stopwords_repo,
+        index_store=store,
+    )
+    service.load()
+
+    assert service.sync() == {"added": 1, "updated": 1, "deleted": 0}
+    assert service.lookup("heist") == [2]
+    assert service.lookup("dream") == []
+    assert service.delete([1]) == [1]
+    assert service.upsert([Movie(3, "Heat", "Heist")]) == [3]
+    service.save()
+
+    restored = IndexService(
+        movie_repository=StubMovieRepository(catalog),
+        stopwords_repository=stopwords_repo,
+        index_store=store,
+    )
+    restored.load()
+    assert restored.lookup("heist") == [2, 3]
+    assert restored.sync() == {"added": 1, "updated": 1, "deleted": 0}
+
+
+def test_index_service_persists_statistics_until_an_update(tmp_path: Path) -> None:
+    movies = [Movie(1, "The Matrix", "Action sci-fi"), Movie(2, "Inception", "Dream action")]
+    movie_repo = StubMovieRepository(movies)
+    stopwords_repo = StubStopwordsRepository({"the"})
+    store = PickleIndexStore(tmp_path)
+    service = IndexService(
+        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+    )
+    service.build()
+    service.save()
+
+    statistics = store.load().statistics
+    assert statistics is not None
+    assert statistics.config == BM25Config()
+    assert statistics.document_count == 2
+    assert set(statistics.terms) == {"action", "dream", "incept", "matrix", "scifi"}
+    assert statistics.impacts is None
+
+    service.build(impact_ordered=True)
+    service.save()
+    statistics = store.load().statistics
+    assert statistics is not None
+    assert statistics.impacts is not None
+    assert list(statistics.impacts["action"].doc_ids) == [1, 2]
+
+    service.upsert([Movie(3, "Heat", "Heist")])
+    service.save()
+    assert store.load().statistics is None
@@ -4,18 +4,28 @@ import pytest
 
 from movie_search.domain.exceptions import IndexStoreError
 from movie_search.infra.index_store import PickleIndexStore
+from movie_search.search.postings import PostingList
 
 
 def test_index_store_save_and_load_roundtrip(tmp_path: Path) -> None:
     store = PickleIndexStore(tmp_path)
-    index = {"matrix": {2, 1}, "action": {1}}
-    docmap = {2: "Matrix Reloaded", 1: "The Matrix"}
+    index = {
+        "matrix": PostingList.from_pairs([(2, 1), (1, 1)]),
+        "action": PostingList.from_pairs([(1, 1)]),
+    }
+    docmap = {2: 2, 1: 2}
 
-    store.save(index=index, docmap=docmap)
+    store.save(index=index, docmap=docmap, average_document_length=2.0, fingerprints={1: 7})
     stored = store.load()
 
-    assert stored.index == {"action": [1], "matrix": [1, 2]}
-    assert stored.docmap == {1: "The Matrix", 2: "Matrix Reloaded"}
+    assert {token: postings.to_dict() for token, postings in stored.index.items()} == {
+        "action": {1: 1},
+        "matrix": {1: 1, 2: 1},
+    }
+    assert list(stored.index["matrix"]) == [1, 2]
+    assert stored.docmap == {1: 2, 2: 2}
+    assert stored.average_document_length == 2.0
+    assert stored.fingerprints == {1: 7}
 
 
 def test_index_store_load_missing_cache_raises(tmp_path: Path) -> None:
@@ -29,6 +39,23 @@ def test_index_store_rejects_invalid_payload(tmp_path: Path) -> None:
     tmp_path.mkdir(parents=True, exist_ok=True)
     (tmp_path / "index.pkl").write_bytes(b"not a pickle")
     (tmp_path / "docmap.pkl").write_bytes(b"not a pickle")
+    (tmp_path / "corpus.pkl").write_bytes(b"not a pickle")
+
+    with pytest.raises(IndexStoreError):
+        store.load()
+
+
+def test_index_store_rejects_mismatched_corpus_statistics(tmp_path: Path) -> None:
+    store = PickleIndexStore(tmp_path)
+    store.save(
+        index={"matrix": PostingList.from_pairs([(1, 1)])},
+        docmap={1: 1},
+        average_document_length=1.0,
+        fingerprints={},
+    )
+    PickleIndexStore(tmp_path, docmap_filename="other.pkl").save(
+        index={}, docmap={}, average_document_length=0.0, fingerprints={}
+    )
 
     with pytest.raises(IndexStoreError):
         store.load()
@@ -1,5 +1,9 @@
+from pathlib import Path
+from types import MappingProxyType
+
 from movie_search.domain.models import Movie
 from movie_search.domain.tokenization import tokenize
+from movie_search.infra.binary_index_store import BinaryIndexStore
 from movie_search.search.inverted_index import InvertedIndex
 
 
@@ -35,10 +39,178 @@ def test_inverted_index_export_import_roundtrip() -> None:
     movies = [Movie(10, "Matrix", "Action")]
     index.build(movies=movies, stopwords=set(), tokenizer=tokenize)
 
-    exported_index = {token: sorted(doc_ids) for token, doc_ids in index.export_index().items()}
+    exported_index = index.export_index()
     exported_docmap = index.export_docmap()
 
     restored = InvertedIndex()
-    restored.import_data(exported_index, exported_docmap)
+    restored.import_data(exported_index, exported_docmap, index.average_document_length())
 
     assert restored.lookup(["matrix"]) == [10]
+    assert restored.postings("matrix").to_dict() == {10: 1}
+    assert restored.document_length(10) == 2
+
+
+def test_inverted_index_records_term_frequencies_and_lengths() -> None:
+    index = InvertedIndex()
+    movies = [
+        Movie(1, "Matrix", "Matrix sequel"),
+        Movie(2, "Inception", "Dream"),
+    ]
+    index.build(movies=movies, stopwords=set(), tokenizer=tokenize)
+
+    assert index.postings("matrix").to_dict() == {1: 2}
+    assert index.postings("matrix").doc_ids.typecode == "I"
+    assert index.document_length(1) == 3
+    assert index.document_count() == 2
+    assert index.average_document_length() == 2.5
+    assert index.export_docmap() == {1: 3, 2: 2}
+    assert index.stats()["average_document_length"] == 2.5
+
+
+def test_inverted_index_orders_postings_by_doc_id() -> None:
+    index = InvertedIndex()
+    movies = [Movie(5, "Matrix", ""), Movie(2, "Matrix", "Matrix"), Movie(9, "Matrix", "")]
+    index.build(movies=movies, stopwords=set(), tokenizer=tokenize)
+
+    postings = index.postings("matrix")
+    assert list(postings.doc_ids) == [2, 5, 9]
+    assert list(postings.frequencies) == [2, 1, 1]
+    assert postings.frequency(5) == 1
+    assert postings.frequency(3) == 0
+
+
+def test_inverted_index_parallel_build_matches_serial_build(tmp_path: Path) -> None:
+    movies = [
+        Movie(doc_id, f"Movie {doc_id % 7} running", f"Story number {doc_id % 11} runs")
+        for doc_id in (5, 3, 9, 1, 12, 40, 7, 2, 3, 30, 8, 21)
+    ]
+    serial = InvertedIndex()
+    serial.build(movies=movies, stopwords={"the"}, tokenizer=tokenize)
+    parallel = InvertedIndex()
+    parallel.build(
+        movies=iter(movies), stopwords={"the"}, tokenizer=tokenize, workers=3, shard_size=2
+    )
+
+    assert parallel.export_index() == serial.export_index()
+    assert parallel.export_docmap() == serial.export_docmap()
+    assert parallel.average_document_length() == serial.average_document_length()
+
+    for name, index in (("serial", serial), ("parallel", parallel)):
+        BinaryIndexStore(tmp_path / name).save(
+            index=index.export_index(),
+            docmap=index.export_docmap(),
+            average_document_length=index.average_document_length(),
+            fingerprints=index.export_fingerprints(),
+        )
+    serial_bytes = (tmp_path / "serial" / "index.bin").read_bytes()
+    assert (tmp_path / "parallel" / "index.bin").read_bytes() == serial_bytes
+
+
+def _assert_same_index(actual: InvertedIndex, expected: InvertedIndex) -> None:
+    assert actual.export_index() == expected.export_index()
+    assert actual.export_docmap() == expected.export_docmap()
+    assert actual.export_fingerprints() == expected.export_fingerprints()
+    assert actual.average_document_length() == expected.average_document_length()
+
+
+def test_inverted_index_upsert_and_delete_match_rebuild() -> None:
+    original = [
+        Movie(1, "The Matrix", "Sci-fi"),
+        Movie(2, "Matrix Reloaded", "Sci-fi sequel"),
+        Movie(3, "Inception", "Dream heist"),
+    ]
+    index = InvertedIndex()
+    index.build(movies=original, stopwords={"the"}, tokenizer=tokenize)
+
+    assert index.upsert([Movie(1, "The Matrix", "Sci-fi")], {"the"}, tokenize) == []
+    changed = index.upsert(
+        [Movie(2, "Matrix Revolutions", "Final sequel"), Movie(4, "Heat", "Heist")],
+        {"the"},
+        tokenize,
+    )
+    assert changed == [2, 4]
+    assert index.delete([3, 99]) == [3]
+
+    expected = InvertedIndex()
+    expected.build(
+        movies=[
+            Movie(1, "The Matrix", "Sci-fi"),
+            Movie(2, "Matrix Revolutions", "Final sequel"),
+            Movie(4, "Heat", "Heist"),
+        ],
+        stopwords={"the"},
+        tokenizer=tokenize,
+    )
+    _assert_same_index(index, expected)
+    assert index.lookup(["reload"]) == []
+    assert index.lookup(["heist"]) == [4]
+
+
+def test_inverted_index_upsert_after_import_of_read_only_mappings() -> None:
+    source = InvertedIndex()
+    source.build(movies=[Movie(1, "Matrix", "")], stopwords=set(), tokenizer=tokenize)
+    index = InvertedIndex()
+    index.import_data(
+        MappingProxyType(source.export_index()),
+        MappingProxyType(source.export_docmap()),
+        source.average_document_length(),
+        MappingProxyType(source.export_fingerprints()),
+    )
+
+    index.upsert([Movie(2, "Matrix", "Sequel")], set(), tokenize)
+
+    assert index.lookup(["matrix"]) == [1, 2]
+    assert index.document_count() == 2
+
+
+def test_inverted_index_generation_changes_with_content() -> None:
+    index = InvertedIndex()
+    index.build(movies=[Movie(1, "Matrix", "")], stopwords=set(), tokenizer=tokenize)
+    built = index.generation()
+
+    assert index.upsert([Movie(1, "Matrix", "")], set(), tokenize) == []
+    assert index.generation() == built
+    index.upsert([Movie(2, "Heat", "")], set(), tokenize)
+    updated = index.generation()
+    index.delete([2])
+
+    assert len({built, updated, index.generation()}) == 3
+    assert InvertedIndex().generation() != InvertedIndex().generation()
+
+
+def test_inverted_index_phrase_lookup_uses_positions_through_updates() -> None:
+    movies = [
+        Movie(1, "Star Wars", "A new hope"),
+        Movie(2, "Wars of the Star", "Star wars again"),
+        Movie(3, "Star Trek", "Wars among stars"),
+    ]
+    index = InvertedIndex()
+    index.build(movies=movies, stopwords={"of", "the"}, tokenizer=tokenize, positions=True)
+
+    assert index.lookup(["star", "war"]) == [1, 2, 3]
+    assert index.lookup(["star", "war"], [("star", "war")]) == [1, 2]
+    assert index.positions("star").positions(2) == [1, 2]
+
+    index.upsert([Movie(3, "Star Wars Trek", "")], stopwords=set(), tokenizer=tokenize)
+    index.delete([1])
+    rebuilt = InvertedIndex()
+    rebuilt.build(
+        [movies[1], Movie(3, "Star Wars Trek", "")],
+        stopwords={"of", "the"},
+        tokenizer=tokenize,
+        positions=True,
+    )
+
+    assert index.lookup(["star", "war"], [("star", "war")]) == [2, 3]
+    assert index.export_positions() == rebuilt.export_positions()
+
+
+def test_inverted_index_lookup_starts_from_the_rarest_term() -> None:
+    movies = [Movie(doc_id, "Common", "rare" if doc_id % 7 == 0 else "") for doc_id in range(50)]
+    index = InvertedIndex()
+    index.build(movies=movies, stopwords=set(), tokenizer=tokenize)
+
+    expected = [doc_id for doc_id in range(50) if doc_id % 7 == 0]
+    assert index.lookup(["common", "rare"]) == expected
+    assert index.lookup(["rare", "common", "rare"]) == expected
+    assert index.lookup(["common", "missing"]) == []
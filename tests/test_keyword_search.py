@@ -1,14 +1,30 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from movie_search.application.index_service import IndexService
+from movie_search.application.result_cache import ResultCache
 from movie_search.application.search_service import SearchService
+from movie_search.domain.exceptions import IndexStoreError
 from movie_search.domain.models import Movie
+from movie_search.infra.document_store import BinaryDocumentStore
+from movie_search.infra.index_store import PickleIndexStore
+from movie_search.search.bm25 import BM25SearchEngine
 
 
 class StubMovieRepository:
     def __init__(self, movies: list[Movie]) -> None:
         self._movies = movies
+        self.load_count = 0
 
     def load_movies(self) -> list[Movie]:
+        self.load_count += 1
         return self._movies
 
+    def iter_movies(self) -> Iterator[Movie]:
+        return iter(self._movies)
+
 
 class StubStopwordsRepository:
     def __init__(self, stopwords: set[str]) -> None:
@@ -115,3 +131,172 @@ def test_search_only_punctuation() -> None:
 def test_search_non_positive_limit() -> None:
     service = _service([Movie(1, "The Matrix", "Sci-fi")])
     assert service.search("Matrix", limit=0) == []
+
+
+def test_search_with_index_matches_corpus_scan(tmp_path: Path) -> None:
+    movies = [
+        Movie(1, "The Matrix", "Sci-fi action movie with simulation"),
+        Movie(2, "Matrix Reloaded", "Second Matrix movie"),
+        Movie(3, "Simulation", "A movie about simulation"),
+    ]
+    movie_repo = StubMovieRepository(movies)
+    stopwords_repo = StubStopwordsRepository({"the", "and", "a"})
+    store = PickleIndexStore(tmp_path)
+    index_service = IndexService(
+        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+    )
+    index_service.build()
+    index_service.save()
+
+    indexed = SearchService(
+        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+    )
+    scanning = _service(movies)
+
+    for query in ("simulation", "Matrix", "movie", "Inception", "the", ""):
+        assert indexed.search(query, limit=2) == scanning.search(query, limit=2)
+
+
+def test_search_matches_quoted_phrases_with_and_without_index(tmp_path: Path) -> None:
+    movies = [
+        Movie(1, "Star Wars", "Rebels against an empire"),
+        Movie(2, "Star Trek", "Wars among the stars"),
+        Movie(3, "The Empire Strikes Back", "Star wars sequel"),
+    ]
+    movie_repo = StubMovieRepository(movies)
+    stopwords_repo = StubStopwordsRepository({"the"})
+    store = PickleIndexStore(tmp_path)
+    index_service = IndexService(
+        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+    )
+    index_service.build()
+    index_service.save()
+    indexed = SearchService(
+        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+    )
+
+    with pytest.raises(IndexStoreError, match="--positions"):
+        indexed.search('"star wars"')
+    with pytest.raises(IndexStoreError, match="--positions"):
+        index_service.lookup('"star wars"')
+
+    index_service.build(positions=True)
+    index_service.save()
+    indexed.reload()
+    scanning = _service(movies, {"the"})
+
+    assert [movie.id for movie in indexed.search('"star wars" empire')] == [1, 3]
+    assert [movie.id for movie in scanning.search('"star wars" empire')] == [1, 3]
+    assert [movie.id for movie in indexed.search("star wars empire")] == [1, 3, 2]
+    assert index_service.lookup('"Star Wars"') == [1, 3]
+
+
+def test_search_with_document_store_never_loads_the_catalog(tmp_path: Path) -> None:
+    movies = [
+        Movie(1, "The Matrix", "Sci-fi action movie with simulation"),
+        Movie(2, "Matrix Reloaded", "Second Matrix movie"),
+        Movie(3, "Simulation", "A movie about simulation"),
+    ]
+    movie_repo = StubMovieRepository(movies)
+    stopwords_repo = StubStopwordsRepository({"the"})
+    store = PickleIndexStore(tmp_path)
+    documents = BinaryDocumentStore(tmp_path)
+    index_service = IndexService(
+        movie_repository=movie_repo,
+        stopwords_repository=stopwords_repo,
+        index_store=store,
+        document_store=documents,
+    )
+    index_service.build()
+    index_service.save()
+    index_service.upsert([Movie(4, "Matrix", "Upserted without a catalog entry")])
+    index_service.delete([2])
+    index_service.save()
+
+    service = SearchService(
+        movie_repository=movie_repo,
+        stopwords_repository=stopwords_repo,
+        index_store=store,
+        document_store=documents,
+    )
+
+    assert service.search("matrix", limit=5) == [
+        movies[0],
+        Movie(4, "Matrix", "Upserted without a catalog entry"),
+    ]
+    assert service.search("", limit=2) == [movies[0], movies[2]]
+    assert movie_repo.load_count == 0
+
+
+def test_search_many_matches_individual_searches_and_loads_once() -> None:
+    movies = [
+        Movie(1, "The Matrix", "Sci-fi action movie with simulation"),
+        Movie(2, "Matrix Reloaded", "Second Matrix movie"),
+        Movie(3, "Simulation", "A movie about simulation"),
+    ]
+    repo = StubMovieRepository(movies)
+    service = SearchService(
+        movie_repository=repo, stopwords_repository=StubStopwordsRepository({"the"})
+    )
+    queries = ["Matrix", "simulation", "the matrix!", "", "Inception", "the"]
+
+    results = list(service.search_many(iter(queries), limit=2))
+
+    assert [query for query, _ in results] == queries
+    assert [movies for _, movies in results] == [_service(movies).search(q, 2) for q in queries]
+    assert repo.load_count == 1
+
+
+def test_search_many_non_positive_limit() -> None:
+    service = _service([Movie(1, "The Matrix", "Sci-fi")])
+    assert list(service.search_many(["Matrix"], limit=0)) == [("Matrix", [])]
+
+
+class CountingEngine(BM25SearchEngine):
+    def __init__(self) -> None:
+        super().__init__()
+        self.rank_calls = 0
+
+    def rank_index(self, index, query_tokens, limit, counters=None):
+        self.rank_calls += 1
+        return super().rank_index(index, query_tokens, limit, counters)
+
+
+def test_search_result_cache_shares_normalized_queries_and_follows_index(
+    tmp_path: Path,
+) -> None:
+    movies = [
+        Movie(1, "The Matrix", "Sci-fi action movie with simulation"),
+        Movie(2, "Matrix Reloaded", "Second Matrix movie"),
+    ]
+    movie_repo = StubMovieRepository(movies)
+    stopwords_repo = StubStopwordsRepository({"the"})
+    store = PickleIndexStore(tmp_path)
+    index_service = IndexService(
+        movie_repository=movie_repo, stopwords_repository=stopwords_repo, index_store=store
+    )
+    index_service.build()
+    index_service.save()
+    engine = CountingEngine()
+    cache: ResultCache[list[Movie]] = ResultCache()
+    service = SearchService(
+        movie_repository=movie_repo,
+        stopwords_repository=stopwords_repo,
+        engine=engine,
+        index_store=store,
+        result_cache=cache,
+    )
+
+    first = service.search("The Matrix!", limit=1)
+    assert service.search("matrix", limit=1) == first
+    assert service.search("matrix", limit=2) != first
+    assert engine.rank_calls == 2
+    assert service.cache_stats()["hits"] == 1
+
+    movies.append(Movie(3, "Matrix", ""))
+    index_service.sync()
+    index_service.save()
+    service.reload()
+
+    assert service.search("matrix", limit=1) == [Movie(3, "Matrix", "")]
+    assert engine.rank_calls == 3
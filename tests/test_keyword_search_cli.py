@@ -1,8 +1,14 @@
+import io
 import json
+import pstats
 
-from movie_search import cli
+import pytest
+
+from movie_search import cli, server
 from movie_search.domain.exceptions import DataAccessError
 from movie_search.domain.models import Movie
+from movie_search.infra.json_repository import JsonLinesMovieRepository, JsonMovieRepository
+from movie_search.profiling import stage
 
 
 class StubSearchService:
@@ -12,17 +18,41 @@ class StubSearchService:
     def search(self, query: str, limit: int = 5) -> list[Movie]:
         return self._movies[:limit]
 
+    def search_many(self, queries, limit: int = 5):
+        for query in queries:
+            yield query, self._movies[:limit]
+
+    def version(self) -> None:
+        return None
+
+
+class StubSearchClient(StubSearchService):
+    def __init__(self, address: str, movies: list[Movie]) -> None:
+        super().__init__(movies)
+        self.address = address
+
+    def lookup(self, term: str) -> list[int]:
+        return [7]
+
+    def stats(self) -> dict[str, int | float]:
+        return {"document_count": 4, "token_count": 9, "average_document_length": 1.0}
+
 
 class StubIndexService:
     def __init__(self, lookup_result: list[int] | None = None) -> None:
         self.lookup_result = lookup_result or []
-        self._stats = {"document_count": 3, "token_count": 10}
+        self._stats = {"document_count": 3, "token_count": 10, "average_document_length": 2.5}
         self.loaded = False
         self.saved = False
         self.built = False
 
-    def build(self) -> None:
+    def build(
+        self, workers: int = 1, impact_ordered: bool = False, positions: bool = False
+    ) -> None:
         self.built = True
+        self.workers = workers
+        self.impact_ordered = impact_ordered
+        self.positions = positions
 
     def save(self) -> None:
         self.saved = True
@@ -33,15 +63,32 @@ class StubIndexService:
     def lookup(self, term: str) -> list[int]:
         return self.lookup_result
 
-    def stats(self) -> dict[str, int]:
+    def upsert(self, movies: list[Movie]) -> list[int]:
+        self.upserted = list(movies)
+        return [movie.id for movie in self.upserted]
+
+    def delete(self, doc_ids: list[int]) -> list[int]:
+        return [doc_id for doc_id in doc_ids if doc_id < 10]
+
+    def sync(self) -> dict[str, int]:
+        return {"added": 1, "updated": 2, "deleted": 3}
+
+    def compact(self, impact_ordered: bool = False) -> int:
+        self.impact_ordered = impact_ordered
+        return 4
+
+    def stats(self) -> dict[str, int | float]:
         return self._stats
 
+    def version(self) -> None:
+        return None
+
 
 def test_search_text_output(monkeypatch, capsys) -> None:
     monkeypatch.setattr(
         cli,
         "create_search_service",
-        lambda: StubSearchService([Movie(1, "Test Movie", "Desc")]),
+        lambda **_: StubSearchService([Movie(1, "Test Movie", "Desc")]),
     )
 
     exit_code = cli.main(["search", "test"])
@@ -55,7 +102,7 @@ def test_search_json_output(monkeypatch, capsys) -> None:
     monkeypatch.setattr(
         cli,
         "create_search_service",
-        lambda: StubSearchService([Movie(2, "Json Movie", "Desc")]),
+        lambda **_: StubSearchService([Movie(2, "Json Movie", "Desc")]),
     )
 
     exit_code = cli.main(["search", "test", "--format", "json"])
@@ -66,8 +113,97 @@ def test_search_json_output(monkeypatch, capsys) -> None:
     assert payload == [{"id": 2, "title": "Json Movie", "description": "Desc"}]
 
 
+def test_search_use_index(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(
+        cli,
+        "create_indexed_search_service",
+        lambda **_: StubSearchService([Movie(4, "Indexed Movie", "Desc")]),
+    )
+
+    exit_code = cli.main(["search", "test", "--use-index"])
+    out = capsys.readouterr().out
+
+    assert exit_code == 0
+    assert "4: Indexed Movie" in out
+
+
+def test_search_numpy_engine(monkeypatch, capsys) -> None:
+    pytest.importorskip("numpy")
+    engines = []
+
+    def factory(engine: object = None) -> StubSearchService:
+        engines.append(engine)
+        return StubSearchService([Movie(5, "Vector Movie", "Desc")])
+
+    monkeypatch.setattr(cli, "create_search_service", factory)
+
+    exit_code = cli.main(["search", "test", "--engine", "numpy"])
+    out = capsys.readouterr().out
+
+    assert exit_code == 0
+    assert "5: Vector Movie" in out
+    assert type(engines[0]).__name__ == "NumpyBM25SearchEngine"
+
+
+def test_search_batch_from_file(monkeypatch, capsys, tmp_path) -> None:
+    monkeypatch.setattr(
+        cli,
+        "create_search_service",
+        lambda **_: StubSearchService([Movie(1, "Batch Movie", "Desc")]),
+    )
+    batch = tmp_path / "queries.jsonl"
+    batch.write_text('"matrix"\n\n{"query": "inception"}\n', encoding="utf-8")
+
+    exit_code = cli.main(["search", "--batch", str(batch), "--limit", "1"])
+    lines = capsys.readouterr().out.strip().splitlines()
+
+    assert exit_code == 0
+    movie = {"id": 1, "title": "Batch Movie", "description": "Desc"}
+    assert [json.loads(line) for line in lines] == [
+        {"query": "matrix", "results": [movie]},
+        {"query": "inception", "results": [movie]},
+    ]
+
+
+def test_search_batch_from_stdin(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(cli, "create_search_service", lambda **_: StubSearchService([]))
+    monkeypatch.setattr(cli.sys, "stdin", io.StringIO('{"query": "matrix"}\n'))
+
+    exit_code = cli.main(["search", "--batch", "-"])
+    out = capsys.readouterr().out.strip()
+
+    assert exit_code == 0
+    assert json.loads(out) == {"query": "matrix", "results": []}
+
+
+def test_search_batch_rejects_malformed_lines(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(cli, "create_search_service", lambda **_: StubSearchService([]))
+    monkeypatch.setattr(cli.sys, "stdin", io.StringIO("not json\n"))
+
+    exit_code = cli.main(["search", "--batch", "-"])
+
+    assert exit_code == 1
+    assert "batch line 1" in capsys.readouterr().err
+
+
+def test_search_batch_missing_file(monkeypatch, capsys, tmp_path) -> None:
+    monkeypatch.setattr(cli, "create_search_service", lambda **_: StubSearchService([]))
+
+    exit_code = cli.main(["search", "--batch", str(tmp_path / "missing.jsonl")])
+
+    assert exit_code == 1
+    assert "Batch file not found" in capsys.readouterr().err
+
+
+def test_search_requires_query_or_batch() -> None:
+    with pytest.raises(SystemExit):
+        cli.main(["search"])
+    with pytest.raises(SystemExit):
+        cli.main(["search", "matrix", "--batch", "-"])
+
+
 def test_search_no_results(monkeypatch, capsys) -> None:
-    monkeypatch.setattr(cli, "create_search_service", lambda: StubSearchService([]))
+    monkeypatch.setattr(cli, "create_search_service", lambda **_: StubSearchService([]))
 
     exit_code = cli.main(["search", "none"])
     out = capsys.readouterr().out
@@ -89,6 +225,70 @@ def test_index_build(monkeypatch, capsys) -> None:
     assert "Indexed 3 documents across 10 tokens." in out
 
 
+def test_index_build_with_workers(monkeypatch, capsys) -> None:
+    stub = StubIndexService()
+    monkeypatch.setattr(cli, "create_index_service", lambda: stub)
+
+    exit_code = cli.main(["index", "build", "--workers", "4", "--impact-ordered", "--positions"])
+
+    assert exit_code == 0
+    assert stub.workers == 4
+    assert stub.impact_ordered is True
+    assert stub.positions is True
+
+
+def test_index_build_rejects_non_positive_workers() -> None:
+    with pytest.raises(SystemExit):
+        cli.main(["index", "build", "--workers", "0"])
+
+
+def test_index_upsert(monkeypatch, capsys) -> None:
+    stub = StubIndexService()
+    monkeypatch.setattr(cli, "create_index_service", lambda: stub)
+
+    exit_code = cli.main(["index", "upsert", "--id", "7", "--title", "Heat", "--description", "LA"])
+    out = capsys.readouterr().out
+
+    assert exit_code == 0
+    assert stub.loaded is True
+    assert stub.saved is True
+    assert stub.upserted == [Movie(7, "Heat", "LA")]
+    assert "Upserted 1 documents." in out
+
+
+def test_index_delete(monkeypatch, capsys) -> None:
+    stub = StubIndexService()
+    monkeypatch.setattr(cli, "create_index_service", lambda: stub)
+
+    exit_code = cli.main(["index", "delete", "1", "2", "30"])
+
+    assert exit_code == 0
+    assert stub.saved is True
+    assert "Deleted 2 documents." in capsys.readouterr().out
+
+
+def test_index_sync(monkeypatch, capsys) -> None:
+    stub = StubIndexService()
+    monkeypatch.setattr(cli, "create_index_service", lambda: stub)
+
+    exit_code = cli.main(["index", "sync"])
+
+    assert exit_code == 0
+    assert stub.saved is True
+    assert "Added 1, updated 2 and deleted 3 documents." in capsys.readouterr().out
+
+
+def test_index_compact(monkeypatch, capsys) -> None:
+    stub = StubIndexService()
+    monkeypatch.setattr(cli, "create_index_service", lambda: stub)
+
+    exit_code = cli.main(["index", "compact"])
+
+    assert exit_code == 0
+    assert stub.loaded is True
+    assert "Merged 4 segments." in capsys.readouterr().out
+
+
 def test_index_lookup_text(monkeypatch, capsys) -> None:
     stub = StubIndexService(lookup_result=[1, 2])
     monkeypatch.setattr(cli, "create_index_service", lambda: stub)
@@ -122,6 +322,7 @@ def test_index_stats_text(monkeypatch, capsys) -> None:
     assert exit_code == 0
     assert "Documents: 3" in out
     assert "Tokens: 10" in out
+    assert "Average document length: 2.50" in out
 
 
 def test_index_stats_json(monkeypatch, capsys) -> None:
@@ -132,11 +333,78 @@ def test_index_stats_json(monkeypatch, capsys) -> None:
     out = capsys.readouterr().out.strip()
 
     assert exit_code == 0
-    assert json.loads(out) == {"document_count": 3, "token_count": 10}
+    assert json.loads(out) == {
+        "document_count": 3,
+        "token_count": 10,
+        "average_document_length": 2.5,
+    }
+
+
+def test_commands_use_running_server(monkeypatch, capsys) -> None:
+    clients: list[StubSearchClient] = []
+
+    def create_client(address: str) -> StubSearchClient:
+        clients.append(StubSearchClient(address, [Movie(1, "The Matrix", "Sci-fi")]))
+        return clients[-1]
+
+    def fail() -> None:
+        raise AssertionError("local services must not be created in client mode")
+
+    monkeypatch.setattr(cli, "create_search_client", create_client)
+    monkeypatch.setattr(cli, "create_search_service", fail)
+    monkeypatch.setattr(cli, "create_index_service", fail)
+    address = "unix:/tmp/movie-search.sock"
+
+    assert cli.main(["search", "matrix", "--server", address]) == 0
+    assert cli.main(["index", "lookup", "matrix", "--server", address]) == 0
+    assert cli.main(["index", "stats", "--format", "json", "--server", address]) == 0
+    out = capsys.readouterr().out
+
+    assert [client.address for client in clients] == [address] * 3
+    assert "1: The Matrix" in out
+    assert "7" in out
+    assert '"document_count": 4' in out
+
+
+def test_serve_warms_services_and_serves(monkeypatch, capsys, tmp_path) -> None:
+    served: dict[str, object] = {}
+
+    class StubServer:
+        address = "unix:/tmp/test.sock"
+
+        async def start(self) -> None:
+            served["started"] = True
+
+        async def serve_forever(self) -> None:
+            raise KeyboardInterrupt
+
+    def create_server(api, host, port, socket_path):
+        served["socket_path"] = socket_path
+        served["api"] = api
+        monkeypatch.setattr(api, "close", lambda: served.setdefault("closed", True))
+        return StubServer()
+
+    monkeypatch.setattr(
+        cli, "create_search_service", lambda engine, result_cache: StubSearchService([])
+    )
+    monkeypatch.setattr(cli, "create_index_service", lambda: StubIndexService())
+    monkeypatch.setattr(cli, "create_server", create_server)
+    monkeypatch.setattr(server.QueryApi, "warm", lambda self: served.setdefault("warm", True))
+
+    exit_code = cli.main(
+        ["serve", "--socket", str(tmp_path / "test.sock"), "--max-concurrency", "2"]
+    )
+
+    assert exit_code == 0
+    assert served["warm"] is True
+    assert served["started"] is True
+    assert served["closed"] is True
+    assert served["socket_path"] == tmp_path / "test.sock"
+    assert "Serving queries on unix:/tmp/test.sock" in capsys.readouterr().out
 
 
 def test_main_returns_non_zero_for_domain_errors(monkeypatch, capsys) -> None:
-    def failing_service() -> StubSearchService:
+    def failing_service(**_: object) -> StubSearchService:
         raise DataAccessError("boom")
 
     monkeypatch.setattr(cli, "create_search_service", failing_service)
@@ -146,3 +414,77 @@ def test_main_returns_non_zero_for_domain_errors(monkeypatch, capsys) -> None:
 
     assert exit_code == 1
     assert "Error: boom" in err
+
+
+def test_create_movie_repository_selects_format_by_suffix(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(cli, "MOVIES_PATH", tmp_path / "movies.jsonl")
+    assert isinstance(cli.create_movie_repository(), JsonLinesMovieRepository)
+
+    monkeypatch.setattr(cli, "MOVIES_PATH", tmp_path / "movies.json")
+    assert isinstance(cli.create_movie_repository(), JsonMovieRepository)
+
+
+def test_timings_flag_writes_stage_report_to_stderr(monkeypatch, capsys, tmp_path) -> None:
+    class ProfiledSearchService(StubSearchService):
+        def search(self, query: str, limit: int = 5) -> list[Movie]:
+            with stage("score"):
+                return super().search(query, limit)
+
+    monkeypatch.setattr(
+        cli,
+        "create_search_service",
+        lambda **_: ProfiledSearchService([Movie(1, "Test Movie", "Desc")]),
+    )
+    profile_path = tmp_path / "search.prof"
+
+    exit_code = cli.main(
+        ["--timings", "--profile", str(profile_path), "search", "test", "--format", "json"]
+    )
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
+    assert json.loads(captured.out) == [{"id": 1, "title": "Test Movie", "description": "Desc"}]
+    report = json.loads(captured.err)
+    assert report["command"] == "search"
+    assert report["stages"]["score"]["calls"] == 1
+    assert pstats.Stats(str(profile_path)).total_calls > 0
+
+
+def test_unwritable_profile_output_is_an_error(monkeypatch, capsys, tmp_path) -> None:
+    monkeypatch.setattr(cli, "create_index_service", lambda: StubIndexService())
+
+    exit_code = cli.main(["--profile", str(tmp_path / "missing" / "out.prof"), "index", "stats"])
+
+    assert exit_code == 1
+    assert "Unable to write profiling output" in capsys.readouterr().err
+
+
+def test_metrics_file_is_written_after_the_command(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(cli, "create_index_service", lambda: StubIndexService())
+    metrics_path = tmp_path / "movie_search.prom"
+
+    exit_code = cli.main(["--metrics-file", str(metrics_path), "index", "stats"])
+
+    assert exit_code == 0
+    assert "# TYPE movie_search_query_duration_seconds histogram" in metrics_path.read_text()
+    assert not metrics_path.with_name("movie_search.prom.tmp").exists()
+
+
+def test_unknown_stemmer_is_an_error(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(cli, "STEMMER", "snowball")
+
+    exit_code = cli.main(["search", "test"])
+
+    assert exit_code == 1
+    assert "Unknown stemmer 'snowball'" in capsys.readouterr().err
+
+
+def test_tokenizer_setting_selects_the_unicode_pipeline(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(cli, "TOKENIZER", "unicode")
+    monkeypatch.setattr(cli, "STEMMER", "builtin")
+    tokenizer = cli.create_tokenizer()
+    assert tokenizer("Hackers’ «Truth»", set()) == ["hacker", "truth"]
+
+    monkeypatch.setattr(cli, "TOKENIZER", "latin")
+    assert cli.main(["search", "test"]) == 1
+    assert "Unknown tokenizer 'latin'" in capsys.readouterr().err
@@ -0,0 +1,114 @@
+from pathlib import Path
+
+from stubs import StubMovieRepository, StubStopwordsRepository
+
+from movie_search.application.index_service import IndexService
+from movie_search.application.metrics import Histogram, Sample, SearchMetrics
+from movie_search.application.result_cache import ResultCache
+from movie_search.application.search_service import SearchService
+from movie_search.domain.models import Movie
+from movie_search.infra.index_store import PickleIndexStore
+from movie_search.search.bm25 import BM25SearchEngine, RankCounters
+from movie_search.search.inverted_index import InvertedIndex
+
+MOVIES = [
+    Movie(1, "The Matrix", "A hacker learns the truth"),
+    Movie(2, "Matrix Reloaded", "The hacker returns"),
+    Movie(3, "Inception", "Dreams within dreams"),
+]
+
+
+def _values(text: str) -> dict[str, float]:
+    return {
+        name: float(value)
+        for line in text.splitlines()
+        if not line.startswith("#")
+        for name, value in [line.rsplit(" ", 1)]
+    }
+
+
+def test_histogram_samples_are_cumulative() -> None:
+    histogram = Histogram([1, 10])
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.samples("work") == [
+        ('work_bucket{le="1"}', 2),
+        ('work_bucket{le="10"}', 3),
+        ('work_bucket{le="+Inf"}', 4),
+        ("work_sum", 56.5),
+        ("work_count", 4),
+    ]
+
+
+def test_render_writes_prometheus_text_and_skips_unset_values() -> None:
+    metrics = SearchMetrics()
+    metrics.observe_query(0.002)
+    metrics.observe_cache(hit=True)
+    metrics.observe_cache(hit=False)
+    metrics.observe_cache(hit=False)
+
+    text = metrics.render([Sample("extra_total", "counter", "Extra.", 7)])
+    values = _values(text)
+
+    assert "# TYPE movie_search_query_duration_seconds histogram" in text
+    assert values['movie_search_query_duration_seconds_bucket{le="0.0025"}'] == 1
+    assert values['movie_search_query_duration_seconds_bucket{le="0.001"}'] == 0
+    assert values["movie_search_result_cache_hits_total"] == 1
+    assert values["movie_search_result_cache_hit_ratio"] == 1 / 3
+    assert values["extra_total"] == 7
+    assert "movie_search_index_load_duration_seconds" not in values
+    assert "movie_search_index_documents" not in values
+
+
+def test_engine_counts_postings_read_and_documents_scored() -> None:
+    index = InvertedIndex()
+    index.build(MOVIES, {"the", "a"}, lambda text, stopwords: text.lower().split())
+    engine = BM25SearchEngine()
+
+    counters = RankCounters()
+    engine.rank_index(index, ["matrix", "hacker"], limit=1, counters=counters)
+    assert counters.postings == 4
+    assert 1 <= counters.scored <= 2
+
+    index.set_statistics(engine.compute_statistics(index, index.terms(), impacts=True))
+    impact_counters = RankCounters()
+    engine.rank_index(index, ["matrix"], limit=1, counters=impact_counters)
+    assert impact_counters == RankCounters(postings=1, scored=1)
+
+
+def test_services_record_queries_cache_hits_and_index_loads(tmp_path: Path) -> None:
+    metrics = SearchMetrics()
+    repository = StubMovieRepository(MOVIES)
+    stopwords = StubStopwordsRepository(("the", "a"))
+    store = PickleIndexStore(tmp_path)
+    index_service = IndexService(
+        movie_repository=repository,
+        stopwords_repository=stopwords,
+        index_store=store,
+        metrics=metrics,
+    )
+    index_service.build()
+    index_service.save()
+    index_service.load()
+    search_service = SearchService(
+        movie_repository=repository,
+        stopwords_repository=stopwords,
+        index_store=store,
+        result_cache=ResultCache(),
+        metrics=metrics,
+    )
+
+    search_service.search("matrix")
+    search_service.search("Matrix!")
+    search_service.search("hacker")
+
+    values = _values(metrics.render())
+    assert values["movie_search_query_duration_seconds_count"] == 3
+    assert values["movie_search_query_postings_count"] == 2
+    assert values["movie_search_query_scored_documents_sum"] >= 2
+    assert values["movie_search_result_cache_hits_total"] == 1
+    assert values["movie_search_result_cache_misses_total"] == 2
+    assert values["movie_search_index_builds_total"] == 1
+    assert values["movie_search_index_loads_total"] == 2
+    assert values["movie_search_index_documents"] == 3
@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+from stubs import StubMovieRepository, StubStopwordsRepository
+
+from movie_search.application.index_service import IndexService
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.domain.models import Movie
+from movie_search.infra.mmap_index_store import MmapIndexStore
+from movie_search.search.postings import PostingList
+
+
+def _save(store: MmapIndexStore) -> None:
+    store.save(
+        index={
+            "action": PostingList.from_pairs([(1, 1), (2, 2)]),
+            "matrix": PostingList.from_pairs([(1, 1), (3, 1)]),
+        },
+        docmap={3: 1, 1: 2, 2: 2},
+        average_document_length=5 / 3,
+        fingerprints={1: 10, 2: 20, 3: 30},
+    )
+
+
+def test_mmap_index_store_reads_postings_and_docmap(tmp_path: Path) -> None:
+    store = MmapIndexStore(tmp_path)
+    _save(store)
+
+    stored = store.load()
+
+    assert len(stored.index) == 2
+    assert list(stored.index) == ["action", "matrix"]
+    assert "matrix" in stored.index
+    assert "missing" not in stored.index
+    assert stored.index["action"].to_dict() == {1: 1, 2: 2}
+    assert stored.index.get("missing") is None
+    assert len(stored.docmap) == 3
+    assert stored.docmap[2] == 2
+    assert stored.docmap.get(4) is None
+    assert list(stored.docmap) == [1, 2, 3]
+    assert stored.average_document_length == 5 / 3
+    assert stored.fingerprints[3] == 30
+
+
+def test_mmap_index_store_decodes_postings_lazily(tmp_path: Path) -> None:
+    store = MmapIndexStore(tmp_path)
+    _save(store)
+    path = tmp_path / "index.bin"
+    path.write_bytes(path.read_bytes()[:-1])
+
+    stored = store.load()
+
+    assert stored.index["action"].to_dict() == {1: 1, 2: 2}
+    with pytest.raises(IndexStoreError):
+        stored.index["matrix"]
+
+
+def test_mmap_index_store_load_missing_cache_raises(tmp_path: Path) -> None:
+    with pytest.raises(IndexStoreError):
+        MmapIndexStore(tmp_path).load()
+
+
+def test_mmap_index_store_rejects_invalid_file(tmp_path: Path) -> None:
+    (tmp_path / "index.bin").write_bytes(b"")
+    with pytest.raises(IndexStoreError):
+        MmapIndexStore(tmp_path).load()
+
+    (tmp_path / "index.bin").write_bytes(b"MSIX" + bytes(64))
+    with pytest.raises(IndexStoreError):
+        MmapIndexStore(tmp_path).load()
+
+
+def test_index_service_lookup_from_mapped_index(tmp_path: Path) -> None:
+    movies = [
+        Movie(1, "The Matrix", "Action sci-fi"),
+        Movie(2, "Inception", "Dream action"),
+    ]
+    repo = StubMovieRepository(movies)
+    store = MmapIndexStore(tmp_path)
+    builder = IndexService(
+        movie_repository=repo, stopwords_repository=StubStopwordsRepository(), index_store=store
+    )
+    builder.build()
+    builder.save()
+
+    service = IndexService(
+        movie_repository=repo, stopwords_repository=StubStopwordsRepository(), index_store=store
+    )
+    service.load()
+
+    assert service.lookup("action") == [1, 2]
+    assert service.lookup("matrix dream") == []
+    assert service.stats() == builder.stats()
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+from stubs import StubMovieRepository, StubStopwordsRepository
+
+from movie_search.application.search_service import SearchService
+from movie_search.domain.models import Movie
+from movie_search.domain.tokenization import tokenize
+from movie_search.search.bm25 import BM25Config, BM25SearchEngine
+
+pytest.importorskip("numpy")
+
+from movie_search.search.numpy_bm25 import NumpyBM25SearchEngine  # noqa: E402
+
+
+def test_numpy_engine_matches_python_engine_on_random_corpora() -> None:
+    rng = random.Random(3)
+    vocabulary = [f"w{number}" for number in range(10)]
+    for config in (BM25Config(), BM25Config(k1=0.5, b=1.0)):
+        movies = [
+            Movie(doc_id, " ".join(rng.choices(vocabulary, k=rng.randint(0, 6))), "")
+            for doc_id in rng.sample(range(1000), 150)
+        ]
+        corpus_tokens = [tokenize(movie.title, set()) for movie in movies]
+        python_engine = BM25SearchEngine(config)
+        numpy_engine = NumpyBM25SearchEngine(config)
+
+        for _ in range(30):
+            query = [f"w{rng.randrange(12)}" for _ in range(rng.randint(1, 3))]
+            limit = rng.choice((1, 4, 10, 500))
+            expected = python_engine.rank(movies, corpus_tokens, query, limit)
+            actual = numpy_engine.rank(movies, corpus_tokens, query, limit)
+            assert actual == expected
+
+
+def test_numpy_engine_handles_empty_documents() -> None:
+    engine = NumpyBM25SearchEngine()
+    assert engine.rank([Movie(1, "Title", "Desc")], [[]], ["matrix"], limit=5) == []
+
+
+def test_search_service_with_numpy_engine_reuses_corpus() -> None:
+    repo = StubMovieRepository(
+        [
+            Movie(1, "The Matrix", "Sci-fi action movie with simulation"),
+            Movie(2, "Matrix Reloaded", "Second Matrix movie"),
+            Movie(3, "Simulation", "A movie about simulation"),
+        ]
+    )
+    service = SearchService(
+        movie_repository=repo,
+        stopwords_repository=StubStopwordsRepository(),
+        engine=NumpyBM25SearchEngine(),
+    )
+
+    assert [movie.id for movie in service.search("simulation")] == [3, 1]
+    assert [movie.id for movie in service.search("Matrix")] == [2, 1]
+    assert repo.load_count == 1
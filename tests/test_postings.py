@@ -0,0 +1,30 @@
+import random
+from array import array
+from bisect import bisect_left
+
+from movie_search.search.postings import PostingList, gallop, intersect
+
+
+def _postings(doc_ids: list[int]) -> PostingList:
+    return PostingList.from_pairs((doc_id, 1) for doc_id in doc_ids)
+
+
+def test_intersect_matches_set_intersection_in_any_order() -> None:
+    rng = random.Random(7)
+    for _ in range(200):
+        lists = [sorted(rng.sample(range(300), rng.randint(0, 200))) for _ in range(3)]
+        expected = sorted(set(lists[0]) & set(lists[1]) & set(lists[2]))
+
+        assert list(intersect([_postings(doc_ids) for doc_ids in lists])) == expected
+        assert list(intersect([_postings(doc_ids) for doc_ids in reversed(lists)])) == expected
+
+    assert list(intersect([])) == []
+    assert list(intersect([_postings([1, 2]), PostingList.empty()])) == []
+
+
+def test_gallop_finds_the_first_doc_id_not_below_the_target() -> None:
+    doc_ids = array("I", range(0, 1000, 3))
+
+    for target in (0, 1, 3, 500, 998, 999, 5000):
+        for start in (0, 10, 200, len(doc_ids)):
+            assert gallop(doc_ids, target, start) == max(start, bisect_left(doc_ids, target))
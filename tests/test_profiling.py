@@ -0,0 +1,121 @@
+import threading
+import tracemalloc
+from pathlib import Path
+
+from stubs import StubMovieRepository, StubStopwordsRepository
+
+from movie_search.application.index_service import IndexService
+from movie_search.application.search_service import SearchService
+from movie_search.domain.models import Movie
+from movie_search.infra.index_store import PickleIndexStore
+from movie_search.profiling import Profiler, StageEvent, stage
+
+MOVIES = [
+    Movie(1, "The Matrix", "A hacker learns the truth"),
+    Movie(2, "Matrix Reloaded", "The hacker returns"),
+    Movie(3, "Inception", "Dreams within dreams"),
+]
+
+
+def _run_stage(name: str) -> None:
+    with stage(name):
+        pass
+
+
+def test_stages_outside_a_profiler_record_nothing() -> None:
+    with stage("idle"):
+        pass
+
+    with Profiler() as profiler:
+        pass
+
+    assert profiler.report()["stages"] == {}
+
+
+def test_profiler_counts_calls_and_passes_events_to_hooks() -> None:
+    events: list[StageEvent] = []
+
+    with Profiler(hooks=[events.append]) as profiler:
+        for _ in range(3):
+            with stage("outer"), stage("inner"):
+                pass
+        thread = threading.Thread(target=_run_stage, args=("threaded",))
+        thread.start()
+        thread.join()
+    with stage("after"):
+        pass
+
+    stages = profiler.stages()
+    assert list(stages) == ["inner", "outer", "threaded"]
+    assert stages["outer"].calls == 3
+    assert stages["outer"].seconds >= stages["inner"].seconds
+    assert stages["outer"].allocated_bytes is None
+    assert [event.name for event in events] == ["inner", "outer"] * 3 + ["threaded"]
+    assert profiler.report()["wall_seconds"] >= stages["outer"].seconds
+
+
+def test_nested_profilers_restore_the_outer_one() -> None:
+    with Profiler() as outer:
+        with Profiler() as inner, stage("inner"):
+            pass
+        with stage("outer"):
+            pass
+
+    assert list(inner.stages()) == ["inner"]
+    assert list(outer.stages()) == ["outer"]
+
+
+def test_profiler_reports_traced_bytes_while_tracemalloc_runs() -> None:
+    tracemalloc.start()
+    try:
+        with Profiler() as profiler, stage("allocate"):
+            data = [str(number) for number in range(1000)]
+        report = profiler.report()
+    finally:
+        tracemalloc.stop()
+
+    assert len(data) == 1000
+    assert report["stages"]["allocate"]["allocated_bytes"] > 0
+    assert report["traced_peak_bytes"] > 0
+
+
+def test_services_report_their_pipeline_stages(tmp_path: Path) -> None:
+    repository = StubMovieRepository(MOVIES)
+    stopwords = StubStopwordsRepository(("the", "a"))
+    store = PickleIndexStore(tmp_path)
+    scan = SearchService(movie_repository=repository, stopwords_repository=stopwords)
+    indexed = SearchService(
+        movie_repository=repository, stopwords_repository=stopwords, index_store=store
+    )
+
+    with Profiler() as profiler:
+        index_service = IndexService(
+            movie_repository=repository, stopwords_repository=stopwords, index_store=store
+        )
+        index_service.build()
+        index_service.save()
+        scan.search("matrix")
+        scan.search("hacker")
+        indexed.search("matrix")
+
+    stages = profiler.stages()
+    assert set(stages) == {
+        "build_index",
+        "compute_statistics",
+        "save_index",
+        "load_stopwords",
+        "parse_query",
+        "query",
+        "load_catalog",
+        "tokenize_corpus",
+        "document_frequencies",
+        "score",
+        "sort",
+        "load_documents",
+        "load_index",
+        "fetch_documents",
+    }
+    assert stages["query"].calls == 3
+    assert stages["parse_query"].calls == 3
+    assert stages["tokenize_corpus"].calls == 1
+    assert stages["load_stopwords"].calls == 2
@@ -0,0 +1,51 @@
+from movie_search.application.result_cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_result_cache_evicts_least_recently_used() -> None:
+    cache: ResultCache[str] = ResultCache(max_entries=2)
+    cache.put("a", 1, "A")
+    cache.put("b", 1, "B")
+    assert cache.get("a", 1) == "A"
+
+    cache.put("c", 1, "C")
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == "A"
+    assert cache.get("c", 1) == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_result_cache_expires_entries_by_ttl_and_generation() -> None:
+    clock = FakeClock()
+    cache: ResultCache[str] = ResultCache(ttl=10.0, clock=clock)
+    cache.put("a", 1, "A")
+    cache.put("b", 1, "B")
+
+    clock.now = 5.0
+    assert cache.get("a", 1) == "A"
+    assert cache.get("b", 2) is None
+    clock.now = 10.0
+    assert cache.get("a", 1) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == 1 / 3
+    assert stats["expirations"] == 2
+    assert stats["size"] == 0
+
+
+def test_result_cache_with_no_entries_stores_nothing() -> None:
+    cache: ResultCache[str] = ResultCache(max_entries=0)
+    cache.put("a", 1, "A")
+
+    assert cache.get("a", 1) is None
+    assert cache.stats()["size"] == 0
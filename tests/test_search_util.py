@@ -4,7 +4,8 @@ from pathlib import Path
 import pytest
 
 from movie_search.domain.exceptions import DataAccessError, DataFormatError
-from movie_search.infra.json_repository import JsonMovieRepository
+from movie_search.infra import json_repository
+from movie_search.infra.json_repository import JsonLinesMovieRepository, JsonMovieRepository
 from movie_search.infra.stopwords_repository import StopwordsRepository
 
 
@@ -73,6 +74,111 @@ def test_load_movies_malformed_json_raises(tmp_path: Path) -> None:
         repository.load_movies()
 
 
+def test_iter_movies_streams_across_chunk_boundaries(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(json_repository, "_CHUNK_SIZE", 7)
+    movies_path = tmp_path / "movies.json"
+    payload = {
+        "meta": {"source": "test", "ids": [1, 2, 3]},
+        "movies": [
+            {"id": 12345, "title": 'Caf\u00e9 "Society"', "description": "Paris"},
+            "invalid",
+            123456789,
+            {"id": 2, "title": "Inception"},
+        ],
+        "trailer": None,
+    }
+    _write_text(movies_path, json.dumps(payload, indent=2))
+
+    repository = JsonMovieRepository(movies_path)
+    movies = list(repository.iter_movies())
+
+    assert movies == repository.load_movies()
+    assert [movie.id for movie in movies] == [12345, 2]
+    assert movies[0].title == 'Café "Society"'
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 17))
+def test_iter_movies_decodes_numbers_split_across_chunks(
+    tmp_path: Path, monkeypatch, chunk_size: int
+) -> None:
+    monkeypatch.setattr(json_repository, "_CHUNK_SIZE", chunk_size)
+    movies_path = tmp_path / "movies.json"
+    _write_text(
+        movies_path,
+        '{"version": 1.5, "scale": -0.00125, "movies": [12.75e-3, {"id": 7, "title": "Heat", '
+        '"rating": 8.25E+2}, -4.5, {"id": 8, "title": "Up"}, 1e10], "ratio": 6.02e23}',
+    )
+
+    repository = JsonMovieRepository(movies_path)
+
+    assert list(repository.iter_movies()) == repository.load_movies()
+    assert [movie.id for movie in repository.iter_movies()] == [7, 8]
+
+
+def test_iter_movies_handles_empty_and_missing_lists(tmp_path: Path) -> None:
+    movies_path = tmp_path / "movies.json"
+    for content in ("{}", '{"movies": []}', ' { "other" : 1 } '):
+        _write_text(movies_path, content)
+        assert list(JsonMovieRepository(movies_path).iter_movies()) == []
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{bad json",
+        '{"movies": [{"id": 1}',
+        '{"movies": [{"id": 1}] "x": 1}',
+        '{"movies": []} trailing',
+    ],
+)
+def test_iter_movies_malformed_json_raises(tmp_path: Path, content: str) -> None:
+    movies_path = tmp_path / "movies.json"
+    _write_text(movies_path, content)
+
+    with pytest.raises(DataFormatError):
+        list(JsonMovieRepository(movies_path).iter_movies())
+
+
+@pytest.mark.parametrize("content", ['{"movies": "bad"}', "[]", ""])
+def test_iter_movies_rejects_unexpected_shapes(tmp_path: Path, content: str) -> None:
+    movies_path = tmp_path / "movies.json"
+    _write_text(movies_path, content)
+
+    with pytest.raises(DataFormatError):
+        list(JsonMovieRepository(movies_path).iter_movies())
+
+
+def test_iter_movies_missing_file_raises(tmp_path: Path) -> None:
+    with pytest.raises(DataAccessError):
+        list(JsonMovieRepository(tmp_path / "missing.json").iter_movies())
+
+
+def test_load_json_lines_movies(tmp_path: Path) -> None:
+    movies_path = tmp_path / "movies.jsonl"
+    _write_text(
+        movies_path,
+        '{"id": 1, "title": "Test", "description": "Desc"}\n\n[1, 2]\n{"id": 2}\n',
+    )
+
+    repository = JsonLinesMovieRepository(movies_path)
+
+    assert [movie.id for movie in repository.iter_movies()] == [1, 2]
+    assert repository.load_movies()[0].title == "Test"
+
+
+def test_load_json_lines_malformed_line_raises(tmp_path: Path) -> None:
+    movies_path = tmp_path / "movies.jsonl"
+    _write_text(movies_path, '{"id": 1}\n{bad\n')
+
+    with pytest.raises(DataFormatError, match="line 2"):
+        JsonLinesMovieRepository(movies_path).load_movies()
+
+
+def test_load_json_lines_missing_file_raises(tmp_path: Path) -> None:
+    with pytest.raises(DataAccessError):
+        JsonLinesMovieRepository(tmp_path / "missing.jsonl").load_movies()
+
+
 def test_load_stopwords_success(tmp_path: Path) -> None:
     stopwords_path = tmp_path / "stopwords.txt"
     _write_text(stopwords_path, "the\nAND\n")
@@ -0,0 +1,262 @@
+import json
+from pathlib import Path
+
+import pytest
+from stubs import StubMovieRepository, StubStopwordsRepository
+
+from movie_search.application.index_service import IndexService
+from movie_search.domain.exceptions import IndexStoreError
+from movie_search.domain.models import Movie
+from movie_search.domain.tokenization import tokenize
+from movie_search.infra.document_store import BinaryDocumentStore
+from movie_search.infra.mmap_index_store import MappedPostings
+from movie_search.infra.segmented_index_store import (
+    MergePolicy,
+    SegmentedIndexStore,
+    SegmentInfo,
+)
+from movie_search.search.bm25 import BM25SearchEngine
+from movie_search.search.inverted_index import InvertedIndex
+
+
+def _service(store: SegmentedIndexStore, movies: list[Movie]) -> IndexService:
+    return IndexService(
+        movie_repository=StubMovieRepository(movies),
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=store,
+    )
+
+
+def _rebuilt(movies: list[Movie]) -> InvertedIndex:
+    index = InvertedIndex()
+    index.build(movies=movies, stopwords={"the"}, tokenizer=tokenize)
+    return index
+
+
+def _manifest(store_dir: Path) -> dict:
+    return json.loads((store_dir / "segments" / "manifest.json").read_text())
+
+
+MOVIES = [
+    Movie(1, "The Matrix", "Action sci-fi"),
+    Movie(2, "Inception", "Dream action heist"),
+    Movie(3, "Heat", "Heist in LA"),
+]
+
+
+def test_segmented_store_appends_segments_and_tombstones(tmp_path: Path) -> None:
+    store = SegmentedIndexStore(tmp_path, merge_policy=MergePolicy(max_deleted_ratio=1.0))
+    builder = _service(store, MOVIES)
+    builder.build()
+    builder.save()
+
+    service = _service(store, MOVIES)
+    service.load()
+    service.upsert([Movie(2, "Inception", "Dream sequel"), Movie(4, "Tenet", "Time heist")])
+    service.delete([3])
+    service.save()
+
+    manifest = _manifest(tmp_path)
+    assert [entry["name"] for entry in manifest["segments"]] == ["seg-000001", "seg-000002"]
+    assert manifest["segments"][0]["deleted"] == 2
+    assert (tmp_path / "segments" / "seg-000001.2.del").exists()
+
+    restored = _service(store, MOVIES)
+    restored.load()
+    expected = _rebuilt(
+        [MOVIES[0], Movie(2, "Inception", "Dream sequel"), Movie(4, "Tenet", "Time heist")]
+    )
+    assert restored.lookup("heist") == [4]
+    assert restored.lookup("action") == [1]
+    assert restored.stats() == expected.stats()
+
+
+def test_segmented_store_keeps_the_live_term_count_without_a_scan(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = SegmentedIndexStore(tmp_path, merge_policy=MergePolicy(max_deleted_ratio=1.0))
+    service = IndexService(
+        movie_repository=StubMovieRepository(MOVIES),
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=store,
+        document_store=BinaryDocumentStore(tmp_path),
+    )
+    service.build()
+    service.save()
+    assert _manifest(tmp_path)["terms"] == service.stats()["token_count"]
+
+    def scanned(*_: object) -> None:
+        raise AssertionError("every term was scanned")
+
+    # "la" and "sci-fi" only occur in deleted or replaced movies; the replaced
+    # versions are re-tokenized from the document store instead.
+    monkeypatch.setattr(MappedPostings, "live_terms", scanned)
+    service.upsert([Movie(1, "The Matrix", "Action"), Movie(4, "Tenet", "Time")])
+    service.delete([3])
+    service.save()
+
+    expected = _rebuilt(
+        [Movie(1, "The Matrix", "Action"), MOVIES[1], Movie(4, "Tenet", "Time")]
+    ).stats()["token_count"]
+    manifest = _manifest(tmp_path)
+    assert len(manifest["segments"]) == 2
+    assert manifest["terms"] == expected
+    restored = _service(store, MOVIES)
+    restored.load()
+    assert restored.stats()["token_count"] == expected
+
+
+def test_segmented_store_counts_terms_on_demand_when_an_update_could_not(
+    tmp_path: Path,
+) -> None:
+    store = SegmentedIndexStore(tmp_path, merge_policy=MergePolicy(max_deleted_ratio=1.0))
+    service = _service(store, MOVIES)
+    service.build()
+    service.save()
+    # Without a document store the replaced movie's old tokens are unknown.
+    service.upsert([Movie(1, "The Matrix", "Action")])
+    service.save()
+    assert _manifest(tmp_path)["terms"] is None
+
+    expected = _rebuilt([Movie(1, "The Matrix", "Action"), *MOVIES[1:]]).stats()["token_count"]
+    assert len(store.load().index) == expected
+    restored = _service(store, MOVIES)
+    restored.load()
+    assert restored.stats()["token_count"] == expected
+    assert store.merge(force=True) == 2
+    assert _manifest(tmp_path)["terms"] is None
+    assert len(store.load().index) == expected
+
+
+def test_segmented_index_ranks_like_a_rebuild(tmp_path: Path) -> None:
+    store = SegmentedIndexStore(tmp_path)
+    builder = _service(store, MOVIES)
+    builder.build()
+    builder.save()
+    service = _service(store, MOVIES)
+    service.load()
+    service.upsert([Movie(3, "Heat", "Heist heist"), Movie(5, "Thief", "Heist action")])
+    service.save()
+
+    index = InvertedIndex()
+    stored = store.load()
+    assert stored.segments is not None
+    index.import_segments(stored.segments, stored.average_document_length)
+    expected = _rebuilt(
+        [*MOVIES[:2], Movie(3, "Heat", "Heist heist"), Movie(5, "Thief", "Heist action")]
+    )
+
+    engine = BM25SearchEngine()
+    assert index.export_index() == expected.export_index()
+    assert index.export_docmap() == expected.export_docmap()
+    assert index.average_document_length() == expected.average_document_length()
+    assert engine.rank_index(index, ["heist", "action"], 10) == engine.rank_index(
+        expected, ["heist", "action"], 10
+    )
+
+
+def test_segmented_store_merges_by_policy_and_on_compact(tmp_path: Path) -> None:
+    store = SegmentedIndexStore(tmp_path, merge_policy=MergePolicy(max_segments=2))
+    service = _service(store, MOVIES)
+    service.build()
+    service.save()
+    for movie_id in (10, 11, 12):
+        service.upsert([Movie(movie_id, f"Movie {movie_id}", "Heist")])
+        service.save()
+
+    assert len(_manifest(tmp_path)["segments"]) == 2
+    assert service.lookup("heist") == [2, 3, 10, 11, 12]
+
+    assert store.load().statistics is None
+
+    assert service.compact() == 2
+    manifest = _manifest(tmp_path)
+    assert len(manifest["segments"]) == 1
+    assert manifest["segments"][0]["deleted"] == 0
+    assert service.lookup("heist") == [2, 3, 10, 11, 12]
+    assert sorted(path.suffix for path in (tmp_path / "segments").iterdir()) == [".bin", ".json"]
+    statistics = store.load().statistics
+    assert statistics is not None
+    assert statistics.document_count == 6
+    assert statistics.terms["heist"].idf > 0
+
+
+def test_segmented_store_recomputes_statistics_when_a_merge_leaves_one_segment(
+    tmp_path: Path,
+) -> None:
+    store = SegmentedIndexStore(tmp_path, merge_policy=MergePolicy(max_segments=1))
+    service = _service(store, MOVIES)
+    service.build(impact_ordered=True)
+    service.save()
+    service.upsert([Movie(4, "Tenet", "Time heist")])
+    service.delete([1])
+    service.save()
+
+    assert len(_manifest(tmp_path)["segments"]) == 1
+    statistics = store.load().statistics
+    assert statistics is not None
+    assert statistics.impacts is not None
+    rebuilt = _rebuilt([*MOVIES[1:], Movie(4, "Tenet", "Time heist")])
+    expected = BM25SearchEngine().compute_statistics(rebuilt, rebuilt.terms(), impacts=True)
+    assert statistics.document_count == expected.document_count == 3
+    assert statistics.average_document_length == expected.average_document_length
+    assert dict(statistics.terms) == dict(expected.terms)
+
+
+def test_merge_policy_selects_smallest_and_mostly_deleted_segments() -> None:
+    policy = MergePolicy(max_segments=2, max_deleted_ratio=0.5)
+
+    assert policy.select([SegmentInfo("a", 10), SegmentInfo("b", 1), SegmentInfo("c", 5)]) == [
+        "b",
+        "c",
+    ]
+    assert policy.select([SegmentInfo("a", 10, deleted=6), SegmentInfo("b", 4)]) == ["a"]
+
+
+def test_segmented_store_rejects_stale_segments(tmp_path: Path) -> None:
+    store = SegmentedIndexStore(tmp_path)
+    service = _service(store, MOVIES)
+    service.build()
+    service.save()
+    stale = _service(store, MOVIES)
+    stale.load()
+    service.build()
+    service.save()
+
+    stale.delete([1])
+    with pytest.raises(IndexStoreError, match="reload"):
+        stale.save()
+
+
+def test_segmented_store_load_retries_when_an_update_removes_its_segments(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = SegmentedIndexStore(tmp_path)
+    service = _service(store, MOVIES)
+    service.build()
+    service.save()
+    # The reader gets the manifest just before a rebuild replaces its segment.
+    stale = store._read_manifest()
+    service.build()
+    service.save()
+    assert not (tmp_path / "segments" / f"{stale.segments[0].name}.bin").exists()
+
+    reads = [stale]
+    read_manifest = store._read_manifest
+    monkeypatch.setattr(store, "_read_manifest", lambda: reads.pop() if reads else read_manifest())
+    assert store.load().segments[0].name == _manifest(tmp_path)["segments"][0]["name"]
+
+    (tmp_path / "segments" / f"{_manifest(tmp_path)['segments'][0]['name']}.bin").unlink()
+    with pytest.raises(IndexStoreError, match="missing"):
+        store.load()
+
+
+def test_segmented_store_reports_missing_and_corrupt_cache(tmp_path: Path) -> None:
+    store = SegmentedIndexStore(tmp_path)
+    with pytest.raises(IndexStoreError, match="not found"):
+        store.load()
+
+    (tmp_path / "segments").mkdir()
+    (tmp_path / "segments" / "manifest.json").write_text("{")
+    with pytest.raises(IndexStoreError, match="corrupt"):
+        store.load()
@@ -0,0 +1,316 @@
+import asyncio
+import threading
+import urllib.request
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from stubs import StubMovieRepository, StubStopwordsRepository
+
+from movie_search.application.index_service import IndexService
+from movie_search.application.result_cache import ResultCache
+from movie_search.application.search_service import SearchService
+from movie_search.client import SearchClient
+from movie_search.domain.exceptions import ServerError
+from movie_search.domain.models import Movie
+from movie_search.domain.query import Query
+from movie_search.infra.index_store import PickleIndexStore
+from movie_search.infra.segmented_index_store import SegmentedIndexStore
+from movie_search.server import QueryApi, QueryServer
+
+MOVIES = [
+    Movie(1, "The Matrix", "Action sci-fi"),
+    Movie(2, "Inception", "Dream action heist"),
+    Movie(3, "Heat", "Heist in LA"),
+]
+
+
+def _index_service(
+    tmp_path: Path, movie_repo: StubMovieRepository, build_index: bool = True
+) -> IndexService:
+    index_service = IndexService(
+        movie_repository=movie_repo,
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=PickleIndexStore(tmp_path),
+    )
+    if build_index:
+        index_service.build()
+        index_service.save()
+    return index_service
+
+
+def _api(tmp_path: Path, build_index: bool = True) -> tuple[QueryApi, StubMovieRepository]:
+    movie_repo = StubMovieRepository(MOVIES)
+    index_service = _index_service(tmp_path, movie_repo, build_index)
+    search_service = SearchService(
+        movie_repository=movie_repo, stopwords_repository=StubStopwordsRepository()
+    )
+    return QueryApi(search_service=search_service, index_service=index_service), movie_repo
+
+
+class BlockingSearchService:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.release = threading.Event()
+        self.stored_version = 0
+        self.reloads = 0
+        self.analyzed_in: set[threading.Thread] = set()
+
+    def analyze(self, query: str) -> Query:
+        self.analyzed_in.add(threading.current_thread())
+        return Query(tokens=tuple(query.lower().split()))
+
+    def search(self, query: str, limit: int = 5) -> list[Movie]:
+        self.calls.append(query)
+        self.release.wait(timeout=5)
+        return MOVIES[:limit]
+
+    def version(self) -> int:
+        return self.stored_version
+
+    def reload(self) -> None:
+        self.reloads += 1
+
+
+@contextmanager
+def _running(server: QueryServer) -> Iterator[None]:
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        yield
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_query_api_routes_requests(tmp_path: Path) -> None:
+    api, movie_repo = _api(tmp_path)
+    api.warm()
+
+    async def requests() -> list:
+        return [
+            await api.handle("/search", {"q": ["heist"], "limit": ["1"]}),
+            await api.handle("/lookup", {"term": ["action"]}),
+            await api.handle("/stats", {}),
+            await api.handle("/health", {}),
+        ]
+
+    search, lookup, stats, health = asyncio.run(requests())
+    assert search == (HTTPStatus.OK, {"query": "heist", "results": [MOVIES[1].to_dict()]})
+    assert lookup == (HTTPStatus.OK, {"term": "action", "doc_ids": [1, 2]})
+    assert stats[1]["document_count"] == 3
+    assert health[1]["status"] == "ok"
+    assert health[1]["requests"] == 4
+    assert movie_repo.load_count == 1
+
+
+def test_query_api_reloads_after_another_process_updates_the_index(tmp_path: Path) -> None:
+    movies = list(MOVIES)
+    movie_repo = StubMovieRepository(movies)
+    store = SegmentedIndexStore(tmp_path)
+    builder = IndexService(
+        movie_repository=movie_repo,
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=store,
+    )
+    builder.build()
+    builder.save()
+    search_service = SearchService(
+        movie_repository=movie_repo,
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=store,
+        result_cache=ResultCache(),
+    )
+    index_service = IndexService(
+        movie_repository=movie_repo,
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=store,
+    )
+    api = QueryApi(search_service=search_service, index_service=index_service)
+    api.warm()
+
+    async def requests() -> list:
+        return [
+            await api.handle("/search", {"q": ["heist"]}),
+            await api.handle("/lookup", {"term": ["heist"]}),
+            await api.handle("/stats", {}),
+        ]
+
+    asyncio.run(requests())
+    assert search_service.cache_stats()["misses"] == 1
+
+    # Stands in for ``index upsert`` run by another process against the same cache.
+    writer = IndexService(
+        movie_repository=movie_repo,
+        stopwords_repository=StubStopwordsRepository(),
+        index_store=SegmentedIndexStore(tmp_path),
+    )
+    movies.append(Movie(4, "Thief", "Heist at night"))
+    writer.load()
+    writer.upsert([movies[-1]])
+    writer.save()
+
+    search, lookup, stats = asyncio.run(requests())
+    assert search_service.cache_stats()["misses"] == 2
+    assert sorted(movie["id"] for movie in search[1]["results"]) == [2, 3, 4]
+    assert lookup[1]["doc_ids"] == [2, 3, 4]
+    assert stats[1]["document_count"] == 4
+
+
+def test_query_api_reports_bad_requests_and_missing_index(tmp_path: Path) -> None:
+    api, _ = _api(tmp_path, build_index=False)
+    api.warm()
+
+    async def statuses() -> list[HTTPStatus]:
+        return [
+            (await api.handle("/search", {}))[0],
+            (await api.handle("/search", {"q": ["x"], "limit": ["many"]}))[0],
+            (await api.handle("/stats", {}))[0],
+            (await api.handle("/missing", {}))[0],
+        ]
+
+    assert asyncio.run(statuses()) == [
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.NOT_FOUND,
+    ]
+
+
+def test_query_api_coalesces_identical_in_flight_searches(tmp_path: Path) -> None:
+    search_service = BlockingSearchService()
+    api = QueryApi(
+        search_service=search_service,
+        index_service=_index_service(tmp_path, StubMovieRepository(MOVIES)),
+    )
+
+    async def burst() -> list:
+        requests = [
+            asyncio.ensure_future(api.handle("/search", {"q": [query], "limit": ["2"]}))
+            for query in ("Matrix", "matrix", "  MATRIX ", "heat")
+        ]
+        while len(search_service.calls) < 2:
+            await asyncio.sleep(0.01)
+        search_service.release.set()
+        return await asyncio.gather(*requests)
+
+    responses = asyncio.run(burst())
+    api.close()
+
+    assert sorted(search_service.calls) == ["Matrix", "heat"]
+    assert [status for status, _ in responses] == [HTTPStatus.OK] * 4
+    assert responses[1][1]["query"] == "matrix"
+    assert api.counters["coalesced"] == 2
+    # Analysis may read files, so it runs in the executor rather than on the loop.
+    assert threading.current_thread() not in search_service.analyzed_in
+
+
+def test_query_api_does_not_join_searches_started_before_a_reload(tmp_path: Path) -> None:
+    search_service = BlockingSearchService()
+    api = QueryApi(
+        search_service=search_service,
+        index_service=_index_service(tmp_path, StubMovieRepository(MOVIES)),
+    )
+
+    async def search(query: str, calls: int) -> asyncio.Future:
+        request = asyncio.ensure_future(api.handle("/search", {"q": [query]}))
+        while len(search_service.calls) < calls:
+            await asyncio.sleep(0.01)
+        return request
+
+    async def reloaded() -> list:
+        requests = [await search("matrix", 1)]
+        search_service.stored_version += 1
+        requests.append(await search("heat", 2))
+        requests.append(await search("matrix", 3))
+        search_service.release.set()
+        return await asyncio.gather(*requests)
+
+    responses = asyncio.run(reloaded())
+    api.close()
+
+    assert search_service.calls == ["matrix", "heat", "matrix"]
+    assert search_service.reloads == 1
+    assert api.counters["coalesced"] == 0
+    assert [status for status, _ in responses] == [HTTPStatus.OK] * 3
+
+
+def test_query_api_rejects_requests_beyond_pending_limit(tmp_path: Path) -> None:
+    search_service = BlockingSearchService()
+    api = QueryApi(
+        search_service=search_service,
+        index_service=_index_service(tmp_path, StubMovieRepository(MOVIES)),
+        max_concurrency=1,
+        max_pending=1,
+    )
+
+    async def burst() -> list:
+        requests = [
+            asyncio.ensure_future(api.handle("/search", {"q": [query]}))
+            for query in ("one", "two", "three")
+        ]
+        while not search_service.calls:
+            await asyncio.sleep(0.01)
+        rejected = await requests[2]
+        search_service.release.set()
+        return [rejected, *await asyncio.gather(*requests[:2])]
+
+    rejected, first, second = asyncio.run(burst())
+    api.close()
+
+    assert rejected == (HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server is busy; retry later."})
+    assert first[0] == second[0] == HTTPStatus.OK
+    assert search_service.calls == ["one", "two"]
+    assert api.counters["rejected"] == 1
+
+
+@pytest.mark.parametrize("transport", ["tcp", "unix"])
+def test_search_client_talks_to_server(tmp_path: Path, transport: str) -> None:
+    api, _ = _api(tmp_path)
+    api.warm()
+    socket_path = tmp_path / "search.sock" if transport == "unix" else None
+    server = QueryServer(api, port=0, socket_path=socket_path)
+    with _running(server):
+        client = SearchClient(server.address)
+        try:
+            assert client.search("heist", limit=5) == [MOVIES[1], MOVIES[2]]
+            assert client.lookup("matrix") == [1]
+            assert client.stats()["token_count"] > 0
+            with pytest.raises(ServerError, match="Unknown endpoint"):
+                client._get("/missing", {})
+        finally:
+            client.close()
+    api.close()
+
+    if socket_path is not None:
+        assert not socket_path.exists()
+
+
+def test_server_exposes_prometheus_metrics(tmp_path: Path) -> None:
+    api, _ = _api(tmp_path)
+    api.warm()
+    server = QueryServer(api, port=0)
+    with _running(server):
+        SearchClient(server.address).search("heist")
+        with urllib.request.urlopen(f"{server.address}/metrics", timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            text = response.read().decode("utf-8")
+    api.close()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "# TYPE movie_search_query_duration_seconds histogram" in text
+    assert "movie_search_server_requests_total 2" in text
+    assert "movie_search_server_in_flight 0" in text
+
+
+def test_search_client_reports_unreachable_server(tmp_path: Path) -> None:
+    client = SearchClient(f"unix:{tmp_path / 'missing.sock'}")
+
+    with pytest.raises(ServerError, match="Unable to reach"):
+        client.search("matrix")
@@ -1,4 +1,24 @@
-from movie_search.domain.tokenization import tokenize
+import pickle
+import subprocess
+import sys
+
+from nltk.stem.porter import PorterStemmer
+
+from movie_search.benchmarks.corpus import SyntheticCorpus
+from movie_search.domain.models import Movie
+from movie_search.domain.query import parse_query
+from movie_search.domain.stemming import porter_stem
+from movie_search.domain.tokenization import (
+    STEM_CACHE_SIZE,
+    STEMMERS,
+    TokenizerPipeline,
+    clear_stem_cache,
+    normalize,
+    stem_cache_info,
+    tokenize,
+    tokenize_builtin,
+)
+from movie_search.search.inverted_index import InvertedIndex
 
 
 def test_tokenize_lowercase_punctuation_stopwords_and_stemming() -> None:
@@ -9,3 +29,104 @@ def test_tokenize_lowercase_punctuation_stopwords_and_stemming() -> None:
 
 def test_tokenize_empty_text() -> None:
     assert tokenize("", {"the"}) == []
+
+
+def test_tokenize_counts_stem_cache_hits_and_misses() -> None:
+    clear_stem_cache()
+
+    assert tokenize("running runs running", set()) == ["run", "run", "run"]
+    info = stem_cache_info()
+    assert info["misses"] == 2
+    assert info["hits"] == 1
+    assert info["size"] == 2
+    assert info["max_size"] == STEM_CACHE_SIZE
+
+    clear_stem_cache()
+    assert stem_cache_info()["size"] == 0
+
+
+def test_parse_query_splits_quoted_phrases() -> None:
+    query = parse_query('The "Lord of the Rings" return "the" "unmatched', {"the", "of"}, tokenize)
+
+    assert query.tokens == ("lord", "ring", "return", "unmatch")
+    assert query.phrases == (("lord", "ring"),)
+    assert query.needs_positions()
+    assert not parse_query('"matrix" reloaded', set(), tokenize).needs_positions()
+
+
+def test_builtin_stemmer_matches_nltk() -> None:
+    words = [
+        *SyntheticCorpus(seed=5, vocabulary_size=5_000).vocabulary,
+        *"skies dying news ties cried agreed feed hopping filing falling hissing fizzed".split(),
+        *"happy sky relational conditional rationally generalization oscillators".split(),
+        *"hopefulness goodness formality sensibility triplicate formalize electrical".split(),
+        *"adjustment dependent adoption controlling rolling generously analogically".split(),
+        *"yelling yyying bayyed playing syzygy archaeology biologi a by as is".split(),
+    ]
+    stemmer = PorterStemmer()
+
+    assert [porter_stem(word) for word in words] == [stemmer.stem(word) for word in words]
+
+
+def test_tokenizers_agree_and_share_the_cache_counters() -> None:
+    clear_stem_cache()
+    text = "The Runners were running, generously and happily!"
+
+    assert tokenize_builtin(text, {"the"}) == tokenize(text, {"the"})
+    assert stem_cache_info()["misses"] == 12
+
+
+def test_importing_the_cli_loads_neither_nltk_nor_asyncio() -> None:
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, movie_search.cli; print(sorted({'nltk', 'asyncio'} & set(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert loaded.stdout.strip() == "[]"
+
+
+def test_pipeline_matches_tokenize_on_ascii_text() -> None:
+    pipeline = TokenizerPipeline(STEMMERS["nltk"])
+    text = "The Runners' sci-fi RACE: 100% (re)running, and $5 <tickets>!"
+
+    assert pipeline(text, {"the", "and"}) == tokenize(text, {"the", "and"})
+    assert normalize(text) == text.lower().translate(str.maketrans("", "", "':%()$<>!,-"))
+
+
+def test_pipeline_case_folds_and_deletes_unicode_punctuation() -> None:
+    pipeline = TokenizerPipeline(stemmer=None)
+
+    assert pipeline("«STRASSE» — Straße’s ΟΔΟΣ… ¡Olé! 5€", set()) == [
+        "strasse",
+        "strasses",
+        "οδοσ",
+        "olé",
+        "5€",
+    ]
+
+
+def test_pipeline_drops_its_own_and_per_call_stopwords() -> None:
+    pipeline = TokenizerPipeline(STEMMERS["builtin"], stopwords=["of"])
+
+    assert pipeline("Lord of the Rings", set()) == ["lord", "the", "ring"]
+    assert pipeline("Lord of the Rings", {"the"}) == ["lord", "ring"]
+    assert TokenizerPipeline()("Lord of the Rings", {"the"}) == ["lord", "of", "ring"]
+
+
+def test_pipeline_pickles_for_parallel_builds() -> None:
+    pipeline = TokenizerPipeline(STEMMERS["builtin"], stopwords=["the"])
+    movies = [Movie(doc_id, f"The Matrix {doc_id}", "Hackers’ “truth”") for doc_id in range(6)]
+
+    assert pickle.loads(pickle.dumps(pipeline))("The Hackers", set()) == ["hacker"]
+    parallel = InvertedIndex()
+    parallel.build(movies=movies, stopwords=set(), tokenizer=pipeline, workers=2, shard_size=2)
+    serial = InvertedIndex()
+    serial.build(movies=movies, stopwords=set(), tokenizer=pipeline)
+    assert parallel.export_index() == serial.export_index()
+    assert parallel.lookup(["truth"]) == list(range(6))